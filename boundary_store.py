@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""
+boundary_store.py
+구역 경계 단일 저장소 (SQLite + R-tree)
+
+구역마다 {구역명}.geojson 파일을 따로 쓰던 방식을 대체한다.
+  - 구역명 단위 upsert (geometry 가 바뀔 때만 version +1)
+  - source / version / needs_position_check / updated_at 메타데이터
+  - R-tree 로 bbox 조회 (전체 파일 파싱 없음)
+  - Supabase zone_boundaries 동기화: 좌표 정리(소수 6자리, 중복·일직선 점 제거)
+    후 해시가 마지막 전송과 같으면 upsert 생략
+
+파일: db/zone_boundaries.sqlite (local_db.DB_DIR)
+
+Usage:
+  python boundary_store.py --list
+  python boundary_store.py --import-dir .            # 기존 *.geojson 일괄 가져오기
+  python boundary_store.py --export zones.geojson    # FeatureCollection 내보내기
+"""
+
+import json
+import time
+import hashlib
+import argparse
+from pathlib import Path
+
+import local_db
+
+STORE_FILE = "zone_boundaries.sqlite"
+SYNC_DIGITS = 6  # Supabase 전송 좌표 자릿수 (약 0.1m, 지도 표시 정밀도)
+
+
+def _bounds(geometry: dict) -> tuple[float, float, float, float]:
+    """GeoJSON geometry → (minx, miny, maxx, maxy) (shapely 없이 좌표 순회)"""
+    xs, ys = [], []
+
+    def walk(c):
+        if c and isinstance(c[0], (int, float)):
+            xs.append(c[0])
+            ys.append(c[1])
+        else:
+            for cc in c:
+                walk(cc)
+
+    walk(geometry["coordinates"])
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _dumps(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _compact_ring(ring: list, digits: int) -> list:
+    """좌표 반올림 + 연속 중복 점 / 일직선 중간 점 제거 (닫힌 링 유지)"""
+    scale = 10 ** digits
+    pts = []
+    for x, y, *_ in ring:
+        p = (round(x * scale), round(y * scale))
+        if not pts or pts[-1] != p:
+            pts.append(p)
+    if len(pts) > 1 and pts[0] == pts[-1]:
+        pts.pop()
+    out = []
+    for i, p in enumerate(pts):
+        a, b = pts[i - 1], pts[(i + 1) % len(pts)]
+        if (p[0] - a[0]) * (b[1] - a[1]) - (p[1] - a[1]) * (b[0] - a[0]) != 0:
+            out.append(p)
+    if len(out) < 3:  # 퇴화한 링은 정리하지 않음
+        out = pts
+    out.append(out[0])
+    return [[x / scale, y / scale] for x, y in out]
+
+
+def compact_geometry(geometry: dict, digits: int = SYNC_DIGITS) -> dict:
+    """(Multi)Polygon → 전송용 좌표 정리본. 그 외 타입은 반올림만"""
+    gtype, coords = geometry["type"], geometry["coordinates"]
+    if gtype == "Polygon":
+        coords = [_compact_ring(r, digits) for r in coords]
+    elif gtype == "MultiPolygon":
+        coords = [[_compact_ring(r, digits) for r in poly] for poly in coords]
+    else:
+        def rnd(c):
+            if c and isinstance(c[0], (int, float)):
+                return [round(v, digits) for v in c]
+            return [rnd(cc) for cc in c]
+        coords = rnd(coords)
+    return {"type": gtype, "coordinates": coords}
+
+
+def load_features(directory: Path) -> list[dict]:
+    """폴더의 *.geojson → Feature 목록 (같은 구역명은 나중 파일이 우선)"""
+    by_name = {}
+    for path in sorted(Path(directory).glob("*.geojson")):
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except Exception as e:
+            print(f"  ⚠️ GeoJSON 읽기 실패: {path.name} ({e})")
+            continue
+        feats = data.get("features", [data]) if data.get("type") == "FeatureCollection" else [data]
+        for ft in feats:
+            if not ft.get("geometry"):
+                continue
+            name = (ft.get("properties") or {}).get("name") or path.stem
+            by_name[name] = ft
+    return list(by_name.values())
+
+
+class BoundaryStore:
+    def __init__(self, filename: str = STORE_FILE):
+        self.conn = local_db.connect(filename)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS zones (
+                id         INTEGER PRIMARY KEY,
+                name       TEXT NOT NULL UNIQUE,
+                geometry   TEXT NOT NULL,
+                properties TEXT NOT NULL,
+                source     TEXT,
+                version    INTEGER NOT NULL,
+                needs_position_check INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS zones_rtree
+                USING rtree(id, minx, maxx, miny, maxy);
+        """)
+        cols = {r["name"] for r in self.conn.execute("PRAGMA table_info(zones)")}
+        if "synced_hash" not in cols:
+            self.conn.execute("ALTER TABLE zones ADD COLUMN synced_hash TEXT")
+        self.conn.commit()
+
+    def upsert(self, feature: dict, source: str = None) -> int:
+        """Feature 저장 (properties.name 기준). 반환: 저장 후 version"""
+        props = dict(feature.get("properties") or {})
+        props.pop("version", None)
+        name = props["name"]
+        source = source or props.get("source")
+        geometry = _dumps(feature["geometry"])
+        minx, miny, maxx, maxy = _bounds(feature["geometry"])
+
+        row = self.conn.execute("SELECT id, geometry, version FROM zones WHERE name=?",
+                                (name,)).fetchone()
+        if row is None:
+            version = 1
+        else:
+            version = row["version"] + (row["geometry"] != geometry)
+
+        with self.conn:
+            cur = self.conn.execute("""
+                INSERT INTO zones (name, geometry, properties, source, version,
+                                   needs_position_check, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    geometry=excluded.geometry, properties=excluded.properties,
+                    source=excluded.source, version=excluded.version,
+                    needs_position_check=excluded.needs_position_check,
+                    updated_at=excluded.updated_at
+            """, (name, geometry, _dumps(props), source, version,
+                  1 if props.get("needs_position_check") else 0, time.time()))
+            zone_id = row["id"] if row else cur.lastrowid
+            self.conn.execute("INSERT OR REPLACE INTO zones_rtree VALUES (?, ?, ?, ?, ?)",
+                              (zone_id, minx, maxx, miny, maxy))
+        return version
+
+    def delete(self, name: str) -> bool:
+        row = self.conn.execute("SELECT id FROM zones WHERE name=?", (name,)).fetchone()
+        if row is None:
+            return False
+        with self.conn:
+            self.conn.execute("DELETE FROM zones WHERE id=?", (row["id"],))
+            self.conn.execute("DELETE FROM zones_rtree WHERE id=?", (row["id"],))
+        return True
+
+    def _feature(self, row) -> dict:
+        props = json.loads(row["properties"])
+        props.update(name=row["name"], source=row["source"], version=row["version"])
+        return {"type": "Feature", "geometry": json.loads(row["geometry"]), "properties": props}
+
+    def get(self, name: str) -> dict | None:
+        row = self.conn.execute("SELECT * FROM zones WHERE name=?", (name,)).fetchone()
+        return self._feature(row) if row else None
+
+    def updated_at(self, name: str) -> float | None:
+        row = self.conn.execute("SELECT updated_at FROM zones WHERE name=?", (name,)).fetchone()
+        return row["updated_at"] if row else None
+
+    def names(self) -> list[str]:
+        return [r["name"] for r in self.conn.execute("SELECT name FROM zones ORDER BY name")]
+
+    def features(self, bbox: tuple = None) -> list[dict]:
+        """전체 또는 bbox(minx, miny, maxx, maxy)와 겹치는 Feature 목록 (R-tree)"""
+        if bbox is None:
+            rows = self.conn.execute("SELECT * FROM zones ORDER BY name")
+        else:
+            minx, miny, maxx, maxy = bbox
+            rows = self.conn.execute("""
+                SELECT z.* FROM zones z JOIN zones_rtree r ON r.id = z.id
+                WHERE r.maxx >= ? AND r.minx <= ? AND r.maxy >= ? AND r.miny <= ?
+                ORDER BY z.name
+            """, (minx, maxx, miny, maxy))
+        return [self._feature(r) for r in rows]
+
+    # ── Supabase zone_boundaries 동기화 ──────────
+    def sync_rows(self, names: list[str]) -> list[tuple[dict, str]]:
+        """zone_boundaries upsert 행 목록 [(row, hash)].
+        좌표 정리본 해시가 마지막 동기화(mark_synced)와 같은 구역은 제외"""
+        out = []
+        for name in dict.fromkeys(names):
+            row = self.conn.execute("SELECT * FROM zones WHERE name=?", (name,)).fetchone()
+            if row is None:
+                continue
+            ft = self._feature(row)
+            ft["geometry"] = compact_geometry(ft["geometry"])
+            sync_row = {
+                "project_name": name,
+                "geojson": ft,
+                "source": row["source"],
+                "needs_position_check": bool(row["needs_position_check"]),
+            }
+            digest = hashlib.sha1(
+                json.dumps(sync_row, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+            if digest != row["synced_hash"]:
+                out.append((sync_row, digest))
+        return out
+
+    def mark_synced(self, name: str, digest: str):
+        with self.conn:
+            self.conn.execute("UPDATE zones SET synced_hash=? WHERE name=?", (digest, name))
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM zones").fetchone()[0]
+
+    def import_dir(self, directory: Path, source: str = "geojson_import") -> int:
+        """기존 *.geojson 파일들을 저장소로 가져오기"""
+        feats = load_features(directory)
+        for ft in feats:
+            self.upsert(ft, source=(ft.get("properties") or {}).get("source") or source)
+        return len(feats)
+
+    def export(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(_dumps({"type": "FeatureCollection", "features": self.features()}))
+
+
+_store = None
+
+
+def get_store() -> BoundaryStore:
+    """프로세스 공용 저장소"""
+    global _store
+    if _store is None:
+        _store = BoundaryStore()
+    return _store
+
+
+def reset_store():
+    """공용 저장소 참조를 버린다 (닫지 않음). fork 로 생긴 작업 프로세스는 부모의 SQLite
+    연결을 함께 쓰면 안 되므로 처음에 호출하고, 다음 get_store() 가 새로 연다"""
+    global _store
+    _store = None
+
+
+# ══════════════════════════════════════════════════════════
+# 메인
+# ══════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--list", action="store_true", help="저장된 구역 목록")
+    parser.add_argument("--import-dir", default=None, help="*.geojson 폴더 가져오기")
+    parser.add_argument("--export", default=None, help="FeatureCollection 내보내기 경로")
+    args = parser.parse_args()
+
+    store = get_store()
+    if args.import_dir:
+        n = store.import_dir(Path(args.import_dir))
+        print(f"가져오기: {n}개 구역")
+    if args.export:
+        store.export(args.export)
+        print(f"내보내기: {args.export}")
+    if args.list:
+        for ft in store.features():
+            p = ft["properties"]
+            check = " (위치 보정 필요)" if p.get("needs_position_check") else ""
+            print(f"  {p['name']}  v{p['version']}  [{p.get('source')}]{check}")
+    print(f"구역 {len(store)}개")
+
+
+if __name__ == "__main__":
+    main()
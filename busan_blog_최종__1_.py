@@ -13,6 +13,7 @@ import re
 import csv
 import time
 import math
+import shutil
 import requests
 import urllib.parse
 from pathlib import Path
@@ -24,6 +25,13 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from geocode_cache import get_cache as get_geocode_cache
+from title_classifier import TitleClassifier
+from notice_extractor import extract as extract_notice_fields
+from notice_records import record_notice, file_sha256
+from notice_search import index_notice
+from page_index import get_index as get_page_index, page_key
+
 try:
     import pyperclip
 except:
@@ -33,6 +41,7 @@ except:
 BASE_URL = "https://www.busan.go.kr/news/gosiboard?articlNo=2"
 START_PAGE = 1
 END_PAGE = 3  # 1페이지 → 3페이지로 확대
+PAGES_FAILED = []  # 마지막 collect_posts 에서 로드 실패한 페이지 (상태 floor 판단용)
 KEYWORDS = ["재개발", "재건축"]
 
 # OS에 따라 경로 설정 (Windows/Linux 모두 지원)
@@ -93,58 +102,67 @@ def normalize_text(text):
 
 # ====== 네이버 API ======
 def naver_geocode(address):
-    """네이버: 주소 → 좌표"""
+    """네이버: 주소 → 좌표 (geocode_cache 경유)"""
+    # 부산이 없으면 추가
+    if "부산" not in address:
+        address = f"부산 {address}"
+    
+    print(f"        🔍 주소 검색: {address}")
+    
+    cache = get_geocode_cache()
+    misses = cache.misses
     try:
-        # 부산이 없으면 추가
-        if "부산" not in address:
-            address = f"부산 {address}"
-        
-        url = "https://naveropenapi.apigw.ntruss.com/map-geocode/v2/geocode"
-        headers = {
-            "X-NCP-APIGW-API-KEY-ID": NAVER_CLIENT_ID,
-            "X-NCP-APIGW-API-KEY": NAVER_CLIENT_SECRET
-        }
-        params = {"query": address}
-        
-        print(f"        🔍 주소 검색: {address}")
+        coords = cache.lookup("naver", address, _naver_geocode_request)
+        if cache.misses == misses:
+            print(f"        💾 캐시: {coords if coords else '(결과 없음)'}")
+        return coords
+    except Exception as e:
+        print(f"        ⚠️ Geocoding 오류: {e}")
+        return None
+
+def _naver_geocode_request(address):
+    """네이버 Geocoding 호출 → (lat, lng). 결과 없음은 None, API 오류는 예외 (캐시 제외)"""
+    url = "https://naveropenapi.apigw.ntruss.com/map-geocode/v2/geocode"
+    headers = {
+        "X-NCP-APIGW-API-KEY-ID": NAVER_CLIENT_ID,
+        "X-NCP-APIGW-API-KEY": NAVER_CLIENT_SECRET
+    }
+    params = {"query": address}
+    
+    resp = requests.get(url, headers=headers, params=params, timeout=10)
+    
+    if resp.status_code != 200:
+        raise RuntimeError(f"API 오류 (상태: {resp.status_code})")
+    
+    data = resp.json()
+    
+    if data.get('addresses') and len(data['addresses']) > 0:
+        addr = data['addresses'][0]
+        lat = float(addr['y'])
+        lng = float(addr['x'])
+        print(f"        ✅ 좌표: ({lat:.6f}, {lng:.6f})")
+        return (lat, lng)
+    
+    # 실패 시 번지수 제거하고 재시도
+    if "번지" in address:
+        addr_without_benji = re.sub(r'\d+(?:-\d+)?번지', '', address).strip()
+        print(f"        재시도: {addr_without_benji}")
         
+        params = {"query": addr_without_benji}
         resp = requests.get(url, headers=headers, params=params, timeout=10)
-        
         if resp.status_code != 200:
-            print(f"        ❌ API 오류 (상태: {resp.status_code})")
-            return None
-        
+            raise RuntimeError(f"API 오류 (상태: {resp.status_code})")
         data = resp.json()
         
         if data.get('addresses') and len(data['addresses']) > 0:
             addr = data['addresses'][0]
             lat = float(addr['y'])
             lng = float(addr['x'])
-            print(f"        ✅ 좌표: ({lat:.6f}, {lng:.6f})")
+            print(f"        ✅ 좌표 (재시도): ({lat:.6f}, {lng:.6f})")
             return (lat, lng)
-        
-        # 실패 시 번지수 제거하고 재시도
-        if "번지" in address:
-            addr_without_benji = re.sub(r'\d+(?:-\d+)?번지', '', address).strip()
-            print(f"        재시도: {addr_without_benji}")
-            
-            params = {"query": addr_without_benji}
-            resp = requests.get(url, headers=headers, params=params, timeout=10)
-            data = resp.json()
-            
-            if data.get('addresses') and len(data['addresses']) > 0:
-                addr = data['addresses'][0]
-                lat = float(addr['y'])
-                lng = float(addr['x'])
-                print(f"        ✅ 좌표 (재시도): ({lat:.6f}, {lng:.6f})")
-                return (lat, lng)
-        
-        print(f"        ❌ 좌표를 찾을 수 없습니다")
-        return None
-        
-    except Exception as e:
-        print(f"        ⚠️ Geocoding 오류: {e}")
-        return None
+    
+    print(f"        ❌ 좌표를 찾을 수 없습니다")
+    return None
 
 def naver_search_places(keyword, center_lat, center_lng, radius=2000):
     """네이버: 키워드로 장소 검색"""
@@ -274,7 +292,9 @@ def collect_pois_naver(address):
 # ====== 1. 목록 수집 ======
 def collect_posts(driver):
     urls = []
+    classifier = TitleClassifier(KEYWORDS)
     seen_datano = set()  # dataNo 기반 중복 체크 추가
+    PAGES_FAILED.clear()
     
     for page in range(START_PAGE, END_PAGE + 1):
         url = f"{BASE_URL}&curPage={page}"
@@ -288,12 +308,16 @@ def collect_posts(driver):
                 EC.presence_of_element_located((By.CSS_SELECTOR, "table tbody tr"))
             )
         except:
+            print(f"  ⚠️ 페이지 {page} 로드 실패")
+            PAGES_FAILED.append(page)
             continue
         
         rows = driver.find_elements(By.CSS_SELECTOR, "table tbody tr")
         print(f"  📋 전체 행 수: {len(rows)}")
         
-        for idx, row in enumerate(rows, 1):
+        # 페이지의 (제목, 링크) 를 먼저 모은 뒤 한 번에 분류
+        entries = []
+        for row in rows:
             try:
                 links = row.find_elements(By.TAG_NAME, "a")
                 title_link = None
@@ -304,14 +328,16 @@ def collect_posts(driver):
                         title_link = link
                         break
                 
-                if not title_link:
-                    continue
-                
-                title = safe_text(title_link)
-                norm = normalize_text(title)
-                
+                if title_link:
+                    entries.append((safe_text(title_link), title_link))
+            except:
+                continue
+        
+        results = classifier.classify_many([title for title, _ in entries])
+        for (title, title_link), cls in zip(entries, results):
+            try:
                 # 디버깅: 모든 공고 출력
-                has_keyword = any(kw in norm for kw in KEYWORDS)
+                has_keyword = cls["keyword"] is not None
                 status = "✅" if has_keyword else "⊘"
                 print(f"  {status} {title[:50]}")
                 
@@ -446,22 +472,39 @@ def pdf_to_images(pdf_path, title):
     img_dir = Path(OUT_DIR) / "pdf_images" / clean_filename(title)
     img_dir.mkdir(parents=True, exist_ok=True)
     
+    pages = get_page_index()
     saved = []
+    reused = 0
     for page_num in range(len(doc)):
         try:
             page = doc.load_page(page_num)
+            img_path = img_dir / f"page_{page_num + 1:03d}.png"
+            
+            # 이미 렌더링한 페이지(dHash 후보 + 내용 해시 일치)면 PNG 복사
+            # 같은 제목의 다른 고시가 그 경로를 덮어썼을 수 있어 파일 해시를 다시 확인
+            key = page_key(page)
+            known = pages.get(key)
+            if (known and known["image_path"] and known["image_sha256"]
+                    and Path(known["image_path"]).exists()
+                    and file_sha256(known["image_path"]) == known["image_sha256"]):
+                if Path(known["image_path"]) != img_path:
+                    shutil.copyfile(known["image_path"], img_path)
+                saved.append(str(img_path))
+                reused += 1
+                continue
+            
             # 200 DPI로 렌더링 (matrix로 스케일 조정)
             mat = fitz.Matrix(200/72, 200/72)  # 72 DPI → 200 DPI
             pix = page.get_pixmap(matrix=mat)
             
-            img_path = img_dir / f"page_{page_num + 1:03d}.png"
             pix.save(str(img_path))
+            pages.put(key, image_path=str(img_path), image_sha256=file_sha256(img_path))
             saved.append(str(img_path))
         except Exception as e:
             print(f"    ⚠️ 페이지 {page_num + 1} 변환 실패: {e}")
     
     doc.close()
-    print(f"    ✅ PDF 이미지: {len(saved)}장")
+    print(f"    ✅ PDF 이미지: {len(saved)}장" + (f" (재사용 {reused}장)" if reused else ""))
     return saved
 
 # ====== 5. OCR ======
@@ -481,11 +524,20 @@ def ocr_pdf(pdf_path):
         pytesseract.pytesseract.tesseract_cmd = TESSERACT_EXE
         doc = fitz.open(pdf_path)
         
+        pages = get_page_index()
         parts = []
         max_pages = min(5, len(doc))  # 최대 5페이지만 OCR
         
         for page_num in range(max_pages):
             page = doc.load_page(page_num)
+            
+            # 같은 페이지(dHash 후보 + 내용 해시 일치)의 이전 OCR 결과 재사용
+            key = page_key(page)
+            known = pages.get(key)
+            if known and known["ocr_text"] is not None:
+                parts.append(known["ocr_text"])
+                continue
+            
             # 150 DPI로 렌더링
             mat = fitz.Matrix(150/72, 150/72)
             pix = page.get_pixmap(matrix=mat)
@@ -496,6 +548,7 @@ def ocr_pdf(pdf_path):
             
             # OCR 실행
             txt = pytesseract.image_to_string(img, lang="kor+eng")
+            pages.put(key, ocr_text=txt)
             parts.append(txt)
         
         doc.close()
@@ -507,118 +560,15 @@ def ocr_pdf(pdf_path):
 
 # ====== 6. 분석 ======
 def analyze_text(text, title):
-    info = {"type": "재건축" if "재건축" in title else "재개발"}
-    
-    # OCR 텍스트 전처리 - 줄바꿈 정리
-    text_clean = re.sub(r'\s+', ' ', text)  # 모든 공백을 스페이스 하나로
-    
-    # 위치 - 다양한 패턴으로 추출
-    found_addr = None
-    
-    # 패턴 1: "위치" 키워드 이후 찾기
-    loc_after_label = re.search(r'위\s*치[:\s]*(.{5,80})', text_clean)
-    if loc_after_label:
-        after_text = loc_after_label.group(1)
-        # 이 텍스트에서 주소 추출
-        addr_patterns = [
-            r'(부산(?:광역시)?\s*[가-힣]+구\s+[가-힣]+동\s+\d+(?:-\d+)?(?:\s*번지)?(?:\s*일원)?)',
-            r'([가-힣]+구\s+[가-힣]+동\s+\d+(?:-\d+)?(?:\s*번지)?(?:\s*일원)?)',
-        ]
-        for p in addr_patterns:
-            m = re.search(p, after_text)
-            if m:
-                found_addr = m.group(1).strip()
-                print(f"    📍 주소 (위치 필드): {found_addr}")
-                break
-    
-    # 패턴 2: 전체 텍스트에서 "구 + 동 + 번지" 직접 찾기
-    if not found_addr:
-        direct_patterns = [
-            r'(부산(?:광역시)?\s*[가-힣]+구\s+[가-힣]+동\s+\d+(?:-\d+)?(?:\s*번지)?(?:\s*일원)?)',
-            r'([가-힣]+구\s+[가-힣]+동\s+\d+(?:-\d+)?(?:\s*번지)?(?:\s*일원)?)',
-        ]
-        for p in direct_patterns:
-            m = re.search(p, text_clean)
-            if m:
-                found_addr = m.group(1).strip()
-                print(f"    📍 주소 (본문): {found_addr}")
-                break
-    
-    # 패턴 3: 동 + 번지만 찾아서 조합
-    if not found_addr:
-        # 구 찾기
-        gu_match = re.search(r'부산(?:광역시)?\s*([가-힣]+구)', text_clean)
-        gu = gu_match.group(1) if gu_match else None
-        
-        # 동 + 번지 찾기
-        dong_benji = re.search(r'([가-힣]+동)\s+(\d+(?:-\d+)?)\s*번지', text_clean)
-        if dong_benji:
-            dong = dong_benji.group(1)
-            benji = dong_benji.group(2)
-            
-            if gu:
-                found_addr = f"부산 {gu} {dong} {benji}번지"
-            else:
-                found_addr = f"부산 {dong} {benji}번지"
-            
-            print(f"    📍 주소 (조합): {found_addr}")
-    
-    # 패턴 4: 제목에서 동 추출 + 본문에서 구/번지 찾기
-    if not found_addr:
-        title_dong = re.search(r'([가-힣]+동)', title)
-        if title_dong:
-            dong = title_dong.group(1)
-            
-            # 본문에서 구 찾기
-            gu_match = re.search(r'부산(?:광역시)?\s*([가-힣]+구)', text_clean)
-            gu = gu_match.group(1) if gu_match else None
-            
-            # 본문에서 번지 찾기 (동 이름 근처)
-            dong_idx = text_clean.find(dong)
-            benji = None
-            if dong_idx != -1:
-                nearby = text_clean[max(0, dong_idx-50):dong_idx+100]
-                benji_match = re.search(r'(\d+(?:-\d+)?)\s*번지', nearby)
-                if benji_match:
-                    benji = benji_match.group(1)
-            
-            # 조합
-            if gu and benji:
-                found_addr = f"부산 {gu} {dong} {benji}번지"
-            elif gu:
-                found_addr = f"부산 {gu} {dong}"
-            else:
-                found_addr = f"부산 {dong}"
-            
-            print(f"    📍 주소 (제목+본문): {found_addr}")
+    """notice_extractor.extract() 래퍼 — 표시 문자열 필드만 (type, 위치, 면적, 세대수, 동수, 층수)"""
+    fields = extract_notice_fields(text, title)
+    info = {k: f["text"] for k, f in fields.items()}
     
-    if found_addr:
-        # 최종 정리
-        found_addr = re.sub(r'\s+', ' ', found_addr).strip()
-        info["위치"] = found_addr
+    if "위치" in fields:
+        print(f"    📍 주소 ({fields['위치']['source']}): {info['위치']}")
     else:
         print(f"    ⚠️ 주소 추출 실패")
     
-    # 면적
-    area_m = re.search(r"(?:구역)?면적[:\s]*([0-9,]+\.?\d*)\s*㎡", text)
-    if area_m:
-        info["면적"] = f"{area_m.group(1)}㎡"
-    
-    # 세대수
-    house_m = re.search(r"(?:총\s*)?세대수[:\s]*([0-9,]+)", text)
-    if house_m:
-        info["세대수"] = f"{house_m.group(1)}세대"
-    
-    # 동수
-    dong_m = re.search(r"([0-9]+)\s*개?\s*동", text)
-    if dong_m:
-        info["동수"] = f"{dong_m.group(1)}개동"
-    
-    # 층수
-    floor_m = re.search(r"지하\s*(\d+).*지상\s*(\d+)", text)
-    if floor_m:
-        info["층수"] = f"지하{floor_m.group(1)}~지상{floor_m.group(2)}층"
-    
     return info
 
 # ====== 7. 네이버 지도 ======
@@ -875,6 +825,9 @@ def run_once(driver, detail_url, writer):
     with open(txt_dir / txt_name, "w", encoding="utf-8") as f:
         f.write(text)
     
+    # 전문 검색 색인 (db/notice_search.sqlite)
+    index_notice(detail_url, title, text)
+    
     # 분석
     print("\n  📊 분석")
     info = analyze_text(text, title)
@@ -912,6 +865,9 @@ def run_once(driver, detail_url, writer):
     
     print(f"\n  ✅ HTML: {html_name}")
     
+    # 고시 레코드 (월별 Parquet 데이터셋)
+    record_notice(detail_url, title, text, pdfs, html_name, Path(OUT_DIR) / "notices")
+    
     # 클립보드
     if pyperclip:
         try:
@@ -964,6 +920,7 @@ def main():
         print(f"   HTML: {Path(OUT_DIR) / 'blog_html'}")
         print(f"   PDF 이미지: {Path(OUT_DIR) / 'pdf_images'}")
         print(f"   지도: {Path(OUT_DIR) / 'maps'}")
+        print(f"   {get_geocode_cache().summary()}")
         print("="*80)
     
     finally:
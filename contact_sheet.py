@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+contact_sheet.py
+PDF 페이지 이미지 → 모바일용 모아보기(contact sheet) 이미지
+
+고시 한 건당 페이지 이미지를 최대 5장씩 따로 올리고 카톡 두 번에 나눠 보내던 것을
+축소한 페이지를 격자로 붙인 1~2장으로 줄인다 (imgbb 요청 수 / 전송 용량 감소).
+
+  시트 폭 SHEET_WIDTH(1080px, 휴대폰 화면 폭) · 2열 · 시트당 최대 4페이지
+  각 칸 왼쪽 위에 페이지 번호 라벨 ("p.3")
+  JPEG(quality 80) 로 저장 — 200DPI PNG 원본보다 훨씬 작다
+
+Pillow 가 없으면 빈 목록을 돌려주고 호출측은 페이지 이미지를 그대로 쓴다.
+
+Usage:
+  python contact_sheet.py downloaded_files/pdf_images/고시문/page_*.png --out sheets/
+"""
+
+import argparse
+from pathlib import Path
+
+SHEET_WIDTH = 1080
+COLUMNS = 2
+PAGES_PER_SHEET = 4
+GAP = 8
+LABEL_SIZE = 28
+JPEG_QUALITY = 80
+BACKGROUND = (235, 235, 235)
+
+
+def _font(size: int):
+    from PIL import ImageFont
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:  # Pillow < 10.1
+        return ImageFont.load_default()
+
+
+def _thumbnail(path: str, cell_w: int):
+    from PIL import Image
+    with Image.open(path) as img:
+        img = img.convert("RGB")
+        ratio = cell_w / img.width
+        return img.resize((cell_w, max(1, round(img.height * ratio))), Image.LANCZOS)
+
+
+def compose(image_paths: list[str], out_dir: Path, name: str = "sheet",
+            per_sheet: int = PAGES_PER_SHEET, width: int = SHEET_WIDTH,
+            columns: int = COLUMNS, first_page: int = 1) -> list[str]:
+    """페이지 이미지들 → 시트 이미지 경로 목록 ({out_dir}/{name}_1.jpg …)"""
+    try:
+        from PIL import Image, ImageDraw
+    except ImportError:
+        print("    ⚠️ Pillow 미설치 → 페이지 이미지 그대로 사용 (pip install Pillow)")
+        return []
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    cell_w = (width - GAP * (columns + 1)) // columns
+    font = _font(LABEL_SIZE)
+
+    sheets = []
+    for start in range(0, len(image_paths), per_sheet):
+        chunk = image_paths[start:start + per_sheet]
+        thumbs = [_thumbnail(p, cell_w) for p in chunk]
+        cols = min(columns, len(thumbs))
+        rows = [thumbs[i:i + cols] for i in range(0, len(thumbs), cols)]
+        row_heights = [max(t.height for t in row) for row in rows]
+        sheet_w = GAP * (cols + 1) + cell_w * cols
+        sheet = Image.new("RGB", (sheet_w, GAP * (len(rows) + 1) + sum(row_heights)), BACKGROUND)
+        draw = ImageDraw.Draw(sheet)
+
+        y = GAP
+        for r, row in enumerate(rows):
+            for c, thumb in enumerate(row):
+                x = GAP + c * (cell_w + GAP)
+                sheet.paste(thumb, (x, y))
+                label = f"p.{first_page + start + r * cols + c}"
+                box = draw.textbbox((0, 0), label, font=font)
+                draw.rectangle([x, y, x + box[2] + 16, y + box[3] + 12], fill=(30, 30, 30))
+                draw.text((x + 8, y + 6), label, fill=(255, 255, 255), font=font)
+            y += row_heights[r] + GAP
+
+        path = out_dir / f"{name}_{len(sheets) + 1}.jpg"
+        sheet.save(path, "JPEG", quality=JPEG_QUALITY, optimize=True)
+        sheets.append(str(path))
+    return sheets
+
+
+# ══════════════════════════════════════════════════════════
+# 메인
+# ══════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("images", nargs="+", help="페이지 이미지 (순서대로)")
+    parser.add_argument("--out", default="sheets", help="출력 폴더")
+    parser.add_argument("--per-sheet", type=int, default=PAGES_PER_SHEET)
+    parser.add_argument("--width", type=int, default=SHEET_WIDTH)
+    args = parser.parse_args()
+
+    sheets = compose(args.images, Path(args.out), per_sheet=args.per_sheet, width=args.width)
+    total = sum(Path(p).stat().st_size for p in args.images)
+    for path in sheets:
+        print(f"  {path}  {Path(path).stat().st_size / 1024:.0f}KB")
+    if sheets:
+        size = sum(Path(p).stat().st_size for p in sheets)
+        print(f"\n{len(args.images)}장 ({total / 1024:.0f}KB) → 시트 {len(sheets)}장 ({size / 1024:.0f}KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+geocode_cache.py
+V-World / 네이버 지오코딩 결과 영구 캐시 (SQLite)
+
+- 주소 정규화 키: 공백/표기("부산광역시" → "부산", "123 번지" → "123번지") 통일
+- TTL: 성공 결과 TTL_DAYS, 실패(결과 없음) 결과 NEGATIVE_TTL_DAYS
+- 네트워크/API 오류(예외)는 캐시하지 않음 → 다음 호출에서 재시도
+- hit / miss 카운터 (summary() 로 출력)
+
+사용:
+  from geocode_cache import get_cache
+  coord = get_cache().lookup("vworld", "부산광역시 동래구 사직동", fetch_fn)
+  coord = vworld_geocode("부산광역시 동래구 사직동 123")   # (lng, lat)
+"""
+
+import os
+import re
+import time
+import threading
+import unicodedata
+
+import requests
+
+import local_db
+
+VWORLD_API_KEY = os.environ.get("VWORLD_API_KEY", "7D47968C-0ADC-334F-86EA-233B5806D2BE")
+
+CACHE_FILE = "geocode_cache.sqlite"
+TTL_DAYS = 90
+NEGATIVE_TTL_DAYS = 3
+
+
+def normalize_address(address: str) -> str:
+    """주소 → 캐시 키"""
+    t = unicodedata.normalize("NFC", address or "")
+    t = re.sub(r"\s+", " ", t).strip()
+    t = re.sub(r"^부산(?:광역시|시)(?=\s|$)", "부산", t)
+    t = re.sub(r"(\d)\s+번지", r"\1번지", t)
+    t = re.sub(r"\s*일원$", "", t)
+    return t
+
+
+class GeocodeCache:
+    def __init__(self, filename: str = CACHE_FILE,
+                 ttl_days: float = TTL_DAYS, negative_ttl_days: float = NEGATIVE_TTL_DAYS):
+        self.ttl = ttl_days * 86400
+        self.negative_ttl = negative_ttl_days * 86400
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.conn = local_db.connect(filename)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS geocode (
+                provider   TEXT NOT NULL,
+                addr_key   TEXT NOT NULL,
+                v1         REAL,
+                v2         REAL,
+                found      INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (provider, addr_key)
+            )""")
+        self.conn.commit()
+
+    def get(self, provider: str, address: str):
+        """(캐시 존재 여부, 좌표 튜플 또는 None)"""
+        key = normalize_address(address)
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT v1, v2, found, fetched_at FROM geocode WHERE provider=? AND addr_key=?",
+                (provider, key)).fetchone()
+        if row is None:
+            return False, None
+        ttl = self.ttl if row["found"] else self.negative_ttl
+        if time.time() - row["fetched_at"] > ttl:
+            return False, None
+        if not row["found"]:
+            return True, None
+        return True, (row["v1"], row["v2"])
+
+    def put(self, provider: str, address: str, value):
+        key = normalize_address(address)
+        v1, v2 = value if value else (None, None)
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?, ?, ?)",
+                (provider, key, v1, v2, 1 if value else 0, time.time()))
+            self.conn.commit()
+
+    def lookup(self, provider: str, address: str, fetch):
+        """캐시 조회 → 없거나 만료면 fetch(address) 호출 후 저장.
+
+        fetch 는 좌표 튜플(찾음) / None(결과 없음)을 반환하고,
+        일시적 오류는 예외로 올린다 (예외는 캐시하지 않고 그대로 전파).
+        """
+        cached, value = self.get(provider, address)
+        if cached:
+            if value is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return value
+
+        self.misses += 1
+        value = fetch(address)
+        self.put(provider, address, value)
+        return value
+
+    def summary(self) -> str:
+        return (f"geocode 캐시: hit {self.hits} / 실패 hit {self.negative_hits} "
+                f"/ miss {self.misses}")
+
+
+_cache = None
+
+
+def get_cache() -> GeocodeCache:
+    """프로세스 공용 캐시 (V-World / 네이버 공유)"""
+    global _cache
+    if _cache is None:
+        _cache = GeocodeCache()
+    return _cache
+
+
+def reset_cache():
+    """공용 캐시 참조를 버린다 (닫지 않음). fork 로 생긴 작업 프로세스는 부모의 SQLite
+    연결을 함께 쓰면 안 되므로 처음에 호출하고, 다음 get_cache() 가 새로 연다"""
+    global _cache
+    _cache = None
+
+
+# ────────────────────────────────────────────
+# V-World 지오코딩 (캐시 경유)
+# ────────────────────────────────────────────
+def fetch_vworld(address: str) -> tuple | None:
+    """V-World 주소 → (lng, lat). 결과 없음은 None, API 오류는 예외 (캐시 제외)"""
+    r = requests.get("https://api.vworld.kr/req/address", params={
+        "service": "address", "request": "getcoord",
+        "version": "2.0", "crs": "epsg:4326",
+        "address": address,
+        "type": "parcel", "format": "json",
+        "key": VWORLD_API_KEY,
+    }, timeout=10)
+    data = r.json()
+    status = data.get("response", {}).get("status")
+    if status == "OK":
+        pt = data["response"]["result"]["point"]
+        return float(pt["x"]), float(pt["y"])
+    if status == "NOT_FOUND":
+        return None
+    raise RuntimeError(f"V-World 응답 오류: {status}")
+
+
+def vworld_geocode(address: str) -> tuple | None:
+    """V-World 지번 주소 → (lng, lat), 실패 시 None"""
+    try:
+        return get_cache().lookup("vworld", address.strip(), fetch_vworld)
+    except Exception:
+        return None
@@ -8,8 +8,6 @@
 import os
 import sys
 import json
-import base64
-import requests
 from pathlib import Path
 from datetime import datetime
 
@@ -26,9 +24,10 @@ from busan_blog_최종__1_ import (
     ensure_dirs,
     OUT_DIR
 )
+from notice_records import record_notice, file_sha256
+from notice_search import index_notice
 
 # ====== 설정 ======
-STATE_FILE = "gosi_state.json"
 LOG_FILE = "gosi_auto.log"
 
 # 환경 변수에서 읽기 (GitHub Secrets)
@@ -37,6 +36,13 @@ KAKAO_ACCESS_TOKEN = os.getenv("KAKAO_ACCESS_TOKEN")
 KAKAO_REFRESH_TOKEN = os.getenv("KAKAO_REFRESH_TOKEN")
 IMGBB_API_KEY = os.getenv("IMGBB_API_KEY")
 
+# 이미지 전송 방식: pages(페이지별 최대 5장) / sheet(모아보기 시트 1~2장)
+IMAGE_MODE = os.getenv("GOSI_IMAGE_MODE", "pages")
+
+# 새 고시가 이 건수 이상이면 고시별 메시지 대신 리스트 메시지로 묶어 전송 (0: 사용 안 함)
+KAKAO_DIGEST_MIN = int(os.getenv("GOSI_KAKAO_DIGEST", "0"))
+KAKAO_LIST_SIZE = 3  # 카카오 리스트 템플릿 최대 항목 수
+
 
 # ====== 로그 함수 ======
 def log(message):
@@ -52,90 +58,140 @@ def log(message):
 
 
 # ====== 상태 관리 ======
-def load_state():
-    if os.path.exists(STATE_FILE):
-        try:
-            with open(STATE_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            return {"processed": []}
-    return {"processed": []}
+# gosi_state_notify.sqlite (state_store, 소비자 "notify"). 이전 gosi_state.json 은 처음 열 때 이전
+STATE_CONSUMER = "notify"
 
 
-def save_state(state):
-    with open(STATE_FILE, 'w', encoding='utf-8') as f:
-        json.dump(state, f, ensure_ascii=False, indent=2)
+# ====== 주소 → 구역 ======
+def find_zone(address):
+    """추출 주소가 속한 구역명 (경계 GeoJSON 공간 인덱스). shapely 미설치/실패 시 None"""
+    if not address:
+        return None
+    try:
+        import zone_store
+        return zone_store.get_store().zone_for_address(address)
+    except Exception as e:
+        log(f"⚠️ 구역 조회 실패: {e}")
+        return None
 
 
-# ====== 카카오톡 토큰 갱신 ======
-def refresh_kakao_token():
-    """카카오 액세스 토큰 갱신"""
-    if not KAKAO_REST_API_KEY or not KAKAO_REFRESH_TOKEN:
-        log("❌ REST API 키 또는 리프레시 토큰 없음")
+# ====== 유사 고시 (정정/변경 재게시) ======
+def find_duplicate(url, title, text, info, pdfs):
+    """이미 처리한 고시 중 첨부 PDF 까지 같은 것 (notice_dedupe 지문 + PDF sha256).
+    반환: {"image_urls", "same"} 또는 None (PDF 가 다르거나 재사용할 이미지가 없으면 None).
+    same: 정정/변경 고시가 아니고 분석 결과도 같음 → 알림 생략 가능"""
+    try:
+        from notice_dedupe import get_fingerprints, diff_info, notice_key, is_correction
+        key, _ = notice_key(url)
+        match = get_fingerprints().find_similar(title, text, exclude=key)
+        if not match:
+            return None
+        digests = [file_sha256(p) for p in pdfs]
+    except Exception as e:
+        log(f"⚠️ 유사 고시 확인 실패: {e}")
         return None
     
-    token_url = "https://kauth.kakao.com/oauth/token"
-    data = {
-        "grant_type": "refresh_token",
-        "client_id": KAKAO_REST_API_KEY,
-        "refresh_token": KAKAO_REFRESH_TOKEN
-    }
-    
+    changes = diff_info(match["info"], info)
+    log(f"♻️ 유사 고시: {match['title'][:50]} (dataNo {match['data_no'] or '-'}, "
+        f"본문 {match['text_similarity']:.2f}, 제목 거리 {match['title_distance']})")
+    for field, (old, new) in changes.items():
+        log(f"  변경 {field}: {old or '-'} → {new or '-'}")
+    if not digests or digests != match["pdf_sha256"]:
+        log("  첨부 PDF 가 다름 → 이미지 새로 생성")
+        return None
+    if not match["image_urls"]:
+        return None
+    same = not is_correction(title) and not changes
+    return {"image_urls": match["image_urls"], "same": same}
+
+
+def remember_notice(url, title, text, info, image_urls, pdfs):
+    """처리 완료 고시 지문 등록 (다음 정정 고시 판별용)"""
     try:
-        response = requests.post(token_url, data=data)
-        response.raise_for_status()
-        tokens = response.json()
-        
-        new_access_token = tokens["access_token"]
-        log("✅ 카카오 토큰 갱신 성공")
-        return new_access_token
-        
+        from notice_dedupe import get_fingerprints, notice_key
+        from title_classifier import get_classifier
+        key, data_no = notice_key(url)
+        # PDF 가 하나라도 사라졌으면 해시 없이 등록 (이미지 재사용 대상에서 빠짐)
+        digests = [file_sha256(p) for p in pdfs] if all(Path(p).exists() for p in pdfs) else []
+        get_fingerprints().add(key, title, text, get_classifier().classify(title)["zones"],
+                               info, image_urls, data_no=data_no, pdf_sha256=digests)
     except Exception as e:
-        log(f"❌ 토큰 갱신 실패: {e}")
-        return None
+        log(f"⚠️ 지문 등록 실패: {e}")
+
+
+# ====== 카카오톡 토큰 갱신 ======
+def get_token_manager():
+    """카카오 토큰 관리자 (갱신 토큰 암호화 저장 · 만료 전 갱신)"""
+    from kakao_token import get_manager
+    return get_manager(log=log)
+
+
+def refresh_kakao_token(failed_token=None):
+    """카카오 액세스 토큰 갱신 (다른 전송이 이미 갱신했으면 그 토큰 반환)"""
+    return get_token_manager().refresh(failed=failed_token)
 
 
 # ====== imgbb 이미지 업로드 ======
+def upload_images(image_paths):
+    """이미지 목록을 imgbb에 병렬 업로드하고 URL 목록 반환 (순서 유지, 실패는 None).
+    내용(sha256)이 같은 이미지는 업로드 캐시의 URL 재사용"""
+    from imgbb_uploader import get_uploader
+    return get_uploader(IMGBB_API_KEY, log=log).upload_many(image_paths)
+
+
 def upload_to_imgbb(image_path):
     """이미지를 imgbb에 업로드하고 URL 반환"""
     try:
-        with open(image_path, 'rb') as f:
-            img_data = base64.b64encode(f.read()).decode('utf-8')
-        
-        url = "https://api.imgbb.com/1/upload"
-        payload = {
-            "key": IMGBB_API_KEY,
-            "image": img_data
-        }
-        
-        response = requests.post(url, data=payload, timeout=30)
-        response.raise_for_status()
-        result = response.json()
-        
-        if result.get("success"):
-            image_url = result["data"]["url"]
-            log(f"  ✅ 이미지 업로드: {Path(image_path).name}")
-            return image_url
-        else:
-            log(f"  ❌ 업로드 실패: {result}")
-            return None
-            
+        return upload_images([image_path])[0]
     except Exception as e:
         log(f"  ❌ imgbb 업로드 오류: {e}")
         return None
 
 
 # ====== 카카오톡 전송 ======
-def send_kakao_message(post_data, info, image_urls):
-    """카카오톡으로 이미지 포함 메시지 전송"""
-    access_token = KAKAO_ACCESS_TOKEN
-    
+KAKAO_SEND_URL = "https://kapi.kakao.com/v2/api/talk/memo/default/send"
+
+
+def post_kakao_template(template_object):
+    """나에게 보내기 한 건 (엔드포인트 속도 제한 · 429 재시도 · 401 시 토큰 갱신 후 재시도).
+    반환: 성공 여부"""
+    from rate_limit import request
+    access_token = get_token_manager().token()
     if not access_token:
         log("❌ 카카오 액세스 토큰 없음")
         return False
     
+    data = {
+        "template_object": json.dumps(template_object, ensure_ascii=False)
+    }
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "Content-Type": "application/x-www-form-urlencoded;charset=utf-8"
+    }
+    response = request("POST", KAKAO_SEND_URL, headers=headers, data=data)
+    
+    # 토큰 만료 시 갱신 후 재시도
+    if response.status_code == 401:
+        log("🔄 토큰 만료, 갱신 시도...")
+        access_token = refresh_kakao_token(access_token)
+        if access_token:
+            headers["Authorization"] = f"Bearer {access_token}"
+            response = request("POST", KAKAO_SEND_URL, headers=headers, data=data)
+    
+    response.raise_for_status()
+    result = response.json()
+    if result.get("result_code") == 0:
+        return True
+    log(f"❌ 메시지 전송 실패: {result}")
+    return False
+
+
+def send_kakao_message(post_data, info, image_urls):
+    """카카오톡으로 이미지 포함 메시지 전송"""
     title = post_data['title']
     location = info.get('위치', '부산')
+    if info.get('구역'):
+        location = f"{location} [{info['구역']}]"
     project_type = info.get('type', '재개발')
     url = post_data['url']
     date_str = datetime.now().strftime("%Y년 %m월 %d일")
@@ -146,13 +202,6 @@ def send_kakao_message(post_data, info, image_urls):
         log(f"⚠️ 잘못된 URL 감지: {url}")
         url = "https://www.busan.go.kr/news/gosiboard"
     
-    # API 설정
-    api_url = "https://kapi.kakao.com/v2/api/talk/memo/default/send"
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/x-www-form-urlencoded;charset=utf-8"
-    }
-    
     # 메시지 1: 대표 이미지 + 기본 정보
     if image_urls:
         message_text = f"""🚨 새 고시공고 발견!
@@ -191,26 +240,9 @@ def send_kakao_message(post_data, info, image_urls):
         }
     }
     
-    data = {
-        "template_object": json.dumps(template_object, ensure_ascii=False)
-    }
-    
     try:
         # 메시지 전송
-        response = requests.post(api_url, headers=headers, data=data)
-        
-        # 토큰 만료 시 갱신 후 재시도
-        if response.status_code == 401:
-            log("🔄 토큰 만료, 갱신 시도...")
-            access_token = refresh_kakao_token()
-            if access_token:
-                headers["Authorization"] = f"Bearer {access_token}"
-                response = requests.post(api_url, headers=headers, data=data)
-        
-        response.raise_for_status()
-        result = response.json()
-        
-        if result.get("result_code") == 0:
+        if post_kakao_template(template_object):
             log("✅ 카카오톡 메시지 전송 성공")
             
             # 메시지 2: 나머지 이미지들 (2~5번째)
@@ -233,16 +265,11 @@ def send_kakao_message(post_data, info, image_urls):
                     }
                 }
                 
-                data2 = {
-                    "template_object": json.dumps(template_object2, ensure_ascii=False)
-                }
-                
-                requests.post(api_url, headers=headers, data=data2)
-                log(f"✅ 추가 이미지 {min(len(image_urls)-1, 4)}장 전송")
+                if post_kakao_template(template_object2):
+                    log(f"✅ 추가 이미지 {min(len(image_urls)-1, 4)}장 전송")
             
             return True
         else:
-            log(f"❌ 메시지 전송 실패: {result}")
             return False
             
     except Exception as e:
@@ -250,11 +277,99 @@ def send_kakao_message(post_data, info, image_urls):
         return False
 
 
+def send_kakao_digest(items):
+    """여러 고시를 리스트 메시지로 묶어 전송 (메시지당 최대 3건, 1건 남으면 단건 메시지).
+    items: [{"post_data", "info", "image_urls"}] → 항목별 전송 성공 여부 목록"""
+    results = [False] * len(items)
+    date_str = datetime.now().strftime("%m/%d")
+    board_url = "https://www.busan.go.kr/news/gosiboard"
+    for start in range(0, len(items), KAKAO_LIST_SIZE):
+        chunk = items[start:start + KAKAO_LIST_SIZE]
+        try:
+            if len(chunk) == 1:
+                item = chunk[0]
+                ok = send_kakao_message(item["post_data"], item["info"], item["image_urls"])
+            else:
+                contents = []
+                for item in chunk:
+                    info = item["info"]
+                    url = item["post_data"]["url"]
+                    if not url or not url.startswith('http'):
+                        url = board_url
+                    location = info.get('위치', '부산')
+                    if info.get('구역'):
+                        location = f"{location} [{info['구역']}]"
+                    content = {
+                        "title": item["post_data"]["title"][:80],
+                        "description": f"{info.get('type', '재개발')} · {location}"[:80],
+                        "link": {"web_url": url, "mobile_web_url": url},
+                    }
+                    if item["image_urls"]:
+                        content["image_url"] = item["image_urls"][0]
+                    contents.append(content)
+                template_object = {
+                    "object_type": "list",
+                    "header_title": f"🚨 새 고시공고 {len(items)}건 ({date_str}) "
+                                    f"{start + 1}-{start + len(chunk)}",
+                    "header_link": {"web_url": board_url, "mobile_web_url": board_url},
+                    "contents": contents,
+                }
+                ok = post_kakao_template(template_object)
+                if ok:
+                    log(f"✅ 묶음 메시지 전송: {start + 1}-{start + len(chunk)}/{len(items)}")
+        except Exception as e:
+            log(f"❌ 묶음 메시지 전송 오류: {e}")
+            ok = False
+        for i in range(start, start + len(chunk)):
+            results[i] = ok
+    return results
+
+
+# ====== 알림 전송 단계 ======
+def deliver_notifications(force=False):
+    """알림 outbox 전송 (실패는 백오프 후 다음 전송 단계에서 재시도).
+    대기 알림이 KAKAO_DIGEST_MIN 건 이상이면 리스트 메시지로 묶어 보낸다"""
+    from notify_outbox import get_outbox
+    outbox = get_outbox()
+    from notice_ledger import get_ledger
+    ledger = get_ledger()
+    
+    from state_store import get_state
+    state = get_state(STATE_CONSUMER)
+    
+    def on_sent(row):
+        # 전송이 끝난 고시만 처리 상태 기록 + 지문 등록 — 전송이 실패한 고시는 다음 실행이
+        # 다시 처리하고, "이미 보낸 같은 고시" 로 건너뛰지도 않도록
+        # (outbox 가 있는 db/ 는 실행 사이에 남지 않을 수 있다)
+        state.mark(row["notice_id"], STATE_CONSUMER)
+        ledger.done(row["notice_id"], "sent")
+        p = row["payload"]
+        stages = ledger.stages(row["notice_id"])
+        text = (stages.get("ocr", {}).get("artifact") or {}).get("text", "")
+        pdfs = (stages.get("download", {}).get("artifact") or {}).get("pdfs", [])
+        remember_notice(p["post_data"]["url"], p["post_data"]["title"], text, p["info"],
+                        p["image_urls"], pdfs)
+    
+    sent, failed = outbox.dispatch(send_kakao_message, send_kakao_digest, KAKAO_DIGEST_MIN,
+                                   upload=upload_images, force=force, log=log, on_sent=on_sent)
+    if sent or failed:
+        log(f"📤 알림 전송: 성공 {sent}건 / 실패 {failed}건 (대기 {outbox.counts()['pending']}건)")
+    return sent, failed
+
+
 # ====== 메인 처리 함수 ======
 def process_new_gosi(post_data):
-    """새 고시공고 전체 처리"""
+    """새 고시공고 처리 (다운로드 → OCR → 분석 → 업로드 → 알림 outbox 등록).
+    단계마다 notice_ledger 에 결과물을 남기고, 재실행 때는 끝난 단계를 건너뛴다"""
+    from notice_ledger import get_ledger
+    ledger = get_ledger()
+    notice_id = post_data['id']
+    
     log(f"\n{'='*80}")
     log(f"📝 처리 시작: {post_data['title'][:60]}")
+    resume = ledger.resume_point(notice_id)
+    if resume not in (None, "detail", "download"):
+        log(f"♻️ 이전 실행 이어서: {resume} 단계부터")
     log(f"{'='*80}\n")
     
     # 폴더 생성
@@ -266,9 +381,6 @@ def process_new_gosi(post_data):
     driver = None
     
     try:
-        driver = make_driver(headless=True)
-        log("✅ Chrome 드라이버 생성 완료")
-        
         url = post_data['url']
         title = post_data['title']
         files = post_data['attachments']
@@ -280,82 +392,136 @@ def process_new_gosi(post_data):
             return False
         
         # 1. PDF 다운로드
-        log("📥 PDF 다운로드 중...")
-        try:
-            pdfs = download_pdf(driver, files, url, title)
-            if not pdfs:
-                log("❌ 다운로드 실패")
+        done = ledger.get(notice_id, "download")
+        if done:
+            pdfs = done["pdfs"]
+            log(f"♻️ 다운로드 재사용: {len(pdfs)}개")
+        else:
+            log("📥 PDF 다운로드 중...")
+            try:
+                driver = make_driver(headless=True)
+                log("✅ Chrome 드라이버 생성 완료")
+                pdfs = download_pdf(driver, files, url, title)
+                if not pdfs:
+                    log("❌ 다운로드 실패")
+                    return False
+                ledger.done(notice_id, "download", {"pdfs": pdfs})
+            except Exception as e:
+                log(f"❌ PDF 다운로드 오류: {e}")
                 return False
-            
-            pdf_path = pdfs[0]
-            log(f"✅ 다운로드 완료: {Path(pdf_path).name}")
-        except Exception as e:
-            log(f"❌ PDF 다운로드 오류: {e}")
-            return False
+        pdf_path = pdfs[0]
+        log(f"✅ 다운로드 완료: {Path(pdf_path).name}")
         
-        # 2. PDF → 이미지
-        log("📄 PDF → 이미지 변환 중...")
-        try:
-            pdf_images = pdf_to_images(pdf_path, title)
-            log(f"✅ {len(pdf_images)}장 변환 완료")
+        # 2. OCR (텍스트 분석용 · 유사 고시 판별을 위해 렌더링보다 먼저)
+        done = ledger.get(notice_id, "ocr")
+        if done:
+            text = done["text"]
+            log(f"♻️ OCR 재사용: {len(text)}자")
+        else:
+            log("🔍 OCR 처리 중...")
+            try:
+                text, meta = ocr_pdf(pdf_path)
+                ledger.done(notice_id, "ocr", {"text": text})
+            except Exception as e:
+                log(f"⚠️ OCR 실패 (계속 진행): {e}")
+                text = ""
+        
+        # 3. 텍스트 분석
+        done = ledger.get(notice_id, "analyze")
+        if done:
+            info = done["info"]
+            log(f"♻️ 분석 재사용: {info.get('위치', '(미추출)')}")
+        else:
+            log("📊 데이터 분석 중...")
+            try:
+                info = analyze_text(text, title)
+                log(f"✅ 유형: {info.get('type', '기타')}")
+                log(f"✅ 위치: {info.get('위치', '(미추출)')}")
+                zone = find_zone(info.get("위치"))
+                if zone:
+                    info["구역"] = zone
+                    log(f"✅ 구역: {zone}")
+            except Exception as e:
+                log(f"⚠️ 데이터 분석 실패 (기본값 사용): {e}")
+                info = {{"type": "재개발" if "재개발" in title else "재건축", "위치": "부산"}}
             
-            if not pdf_images:
-                log("❌ 이미지 변환 실패")
-                return False
-        except Exception as e:
-            log(f"❌ 이미지 변환 오류: {e}")
-            return False
+            # 고시 레코드 (월별 Parquet 데이터셋) — 분석 단계와 함께 한 번만
+            record_notice(url, title, text, pdfs, root=Path(OUT_DIR) / "notices")
+            index_notice(url, title, text)
+            ledger.done(notice_id, "analyze", {"info": info})
         
-        # 3. OCR (텍스트 분석용)
-        log("🔍 OCR 처리 중...")
-        try:
-            text, meta = ocr_pdf(pdf_path)
-        except Exception as e:
-            log(f"⚠️ OCR 실패 (계속 진행): {e}")
-            text = ""
+        # 4. 유사 고시 (첨부 PDF 가 같은 재게시) → 호스팅 이미지 재사용
+        image_urls = []
+        uploaded = ledger.get(notice_id, "upload")
+        duplicate = None if uploaded else find_duplicate(url, title, text, info, pdfs)
+        if duplicate:
+            if duplicate["same"]:
+                log("⏭️ 이미 처리한 고시와 첨부까지 동일 → 렌더링/업로드/알림 생략")
+                remember_notice(url, title, text, info, duplicate["image_urls"], pdfs)
+                ledger.done(notice_id, "queued", {"skipped": "duplicate"})
+                ledger.done(notice_id, "sent", {"skipped": "duplicate"})
+                return True
+            image_urls = duplicate["image_urls"]
+            log(f"♻️ 이미지 재사용: {len(image_urls)}장")
         
-        # 4. 텍스트 분석
-        log("📊 데이터 분석 중...")
-        try:
-            info = analyze_text(text, title)
-            log(f"✅ 유형: {info.get('type', '기타')}")
-            log(f"✅ 위치: {info.get('위치', '(미추출)')}")
-        except Exception as e:
-            log(f"⚠️ 데이터 분석 실패 (기본값 사용): {e}")
-            info = {{"type": "재개발" if "재개발" in title else "재건축", "위치": "부산"}}
+        # 5. PDF → 이미지
+        pdf_images = []
+        if not image_urls and not uploaded:
+            rendered = ledger.get(notice_id, "render")
+            if rendered:
+                pdf_images = rendered["images"]
+                log(f"♻️ 이미지 재사용: {len(pdf_images)}장")
+            else:
+                log("📄 PDF → 이미지 변환 중...")
+                try:
+                    pdf_images = pdf_to_images(pdf_path, title)
+                    log(f"✅ {len(pdf_images)}장 변환 완료")
+                    
+                    if not pdf_images:
+                        log("❌ 이미지 변환 실패")
+                        return False
+                    ledger.done(notice_id, "render", {"images": pdf_images})
+                except Exception as e:
+                    log(f"❌ 이미지 변환 오류: {e}")
+                    return False
         
-        # 5. 이미지 업로드 (최대 5장)
-        log(f"📤 {{len(pdf_images[:5])}}장 이미지 업로드 중...")
-        image_urls = []
-        for i, img_path in enumerate(pdf_images[:5], 1):
+        # 6. 이미지 업로드 (최대 5장, 병렬)
+        targets = []
+        if uploaded:
+            targets, image_urls = uploaded["targets"], uploaded["urls"]
+            log(f"♻️ 업로드 재사용: {len(image_urls)}장")
+        elif pdf_images:
+            targets = pdf_images[:5]
+            if IMAGE_MODE == "sheet":
+                try:
+                    from contact_sheet import compose
+                    sheets = compose(targets, Path(targets[0]).parent / "sheets")
+                    if sheets:
+                        log(f"🗂️ 모아보기 시트: {len(targets)}페이지 → {len(sheets)}장")
+                        targets = sheets
+                except Exception as e:
+                    log(f"⚠️ 시트 생성 실패 (페이지 이미지 사용): {e}")
+            log(f"📤 {len(targets)}장 이미지 업로드 중...")
             try:
-                img_url = upload_to_imgbb(img_path)
-                if img_url:
-                    image_urls.append(img_url)
-                    log(f"  [{{i}}/{{min(5, len(pdf_images))}}] 업로드 완료")
-                else:
-                    log(f"  [{{i}}/{{min(5, len(pdf_images))}}] 업로드 실패")
+                urls = upload_images(targets)
             except Exception as e:
-                log(f"  [{{i}}/{{min(5, len(pdf_images))}}] 업로드 오류: {{e}}")
+                log(f"❌ 이미지 업로드 오류: {e}")
+                urls = []
+            image_urls = [u for u in urls if u]
+            log(f"  {len(image_urls)}/{len(targets)}장 업로드 완료")
         
-        if not image_urls:
-            log("❌ 모든 이미지 업로드 실패")
-            return False
+        if image_urls:
+            ledger.done(notice_id, "upload", {"targets": targets, "urls": image_urls})
+        else:
+            log("⚠️ 이미지 업로드 실패 → 전송 단계에서 다시 시도")
         
-        # 6. 카카오톡 전송
-        log("📤 카카오톡 전송 중...")
-        try:
-            kakao_success = send_kakao_message(post_data, info, image_urls)
-            
-            if kakao_success:
-                log("✅ 전체 프로세스 완료!")
-                return True
-            else:
-                log("⚠️ 카톡 전송 실패")
-                return False
-        except Exception as e:
-            log(f"❌ 카톡 전송 오류: {e}")
-            return False
+        # 7. 알림 outbox 에 기록 (전송은 deliver_notifications 단계)
+        from notify_outbox import get_outbox
+        added = get_outbox().enqueue(notice_id, post_data, info, image_urls,
+                                     [] if image_urls else targets)
+        ledger.done(notice_id, "queued")
+        log("✅ 처리 완료, 알림 대기열 등록" if added else "✅ 처리 완료 (알림 이미 등록됨)")
+        return True
         
     except Exception as e:
         log(f"❌ 처리 실패: {e}")
@@ -373,6 +539,12 @@ def process_new_gosi(post_data):
 
 # ====== 메인 실행 ======
 def main():
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--send-only", action="store_true",
+                        help="수집/처리 없이 알림 outbox 전송만")
+    args = parser.parse_args()
+    
     log("\n" + "="*80)
     log("🚀 부산 고시공고 자동화 시스템 시작 (GitHub Actions)")
     log("="*80)
@@ -386,9 +558,14 @@ def main():
         log(f"  IMGBB_API_KEY: {'✅' if IMGBB_API_KEY else '❌'}")
         return
     
-    # 상태 파일 로드
-    state = load_state()
-    processed_ids = set(state.get("processed", []))
+    # 이전 실행에서 못 보낸 알림 먼저 (백오프 무시)
+    deliver_notifications(force=True)
+    if args.send_only:
+        return
+    
+    # 상태 저장소
+    from state_store import get_state
+    state = get_state(STATE_CONSUMER)
     
     log("\n" + "="*80)
     log(f"🔍 새 공고 확인 중...")
@@ -411,15 +588,27 @@ def main():
             return
         
         log(f"📌 총 {len(posts)}개 공고 발견")
+        # 목록 페이지를 모두 읽었을 때만 오래된 처리 기록을 상태 floor 로 접기
+        import busan_blog_최종__1_ as crawler_mod
+        if crawler_mod.PAGES_FAILED:
+            log(f"⚠️ 목록 페이지 {crawler_mod.PAGES_FAILED} 로드 실패 → 상태 정리 생략")
+        state.compact(STATE_CONSUMER, posts, complete=not crawler_mod.PAGES_FAILED)
         
         # 새 공고 필터링
         new_posts = []
         
+        from notice_ledger import get_ledger
+        ledger = get_ledger()
         for post_url in posts:
-            detail = extract_detail(driver, post_url)
             post_id = post_url.split("dataNo=")[1].split("&")[0] if "dataNo=" in post_url else post_url
             
-            if post_id not in processed_ids:
+            if not state.is_processed(post_id, STATE_CONSUMER):
+                # 이전 실행에서 받아 둔 상세는 다시 조회하지 않음
+                detail = ledger.get(post_id, "detail")
+                if not detail:
+                    detail = extract_detail(driver, post_url)
+                    if detail.get("title"):
+                        ledger.done(post_id, "detail", detail)
                 detail['url'] = post_url
                 detail['id'] = post_id
                 new_posts.append(detail)
@@ -438,7 +627,7 @@ def main():
     
     log(f"🆕 미처리 공고 {len(new_posts)}개 발견!")
     
-    # 새 공고 처리
+    # 새 공고 처리 (호출 간격은 rate_limit 의 엔드포인트별 토큰 버킷이 맞춘다)
     for idx, post_data in enumerate(new_posts, 1):
         try:
             log(f"\n[{idx}/{len(new_posts)}] {post_data['url']}")
@@ -447,20 +636,15 @@ def main():
             
             success = process_new_gosi(post_data)
             
-            # 성공한 경우에만 상태 저장
-            if success:
-                processed_ids.add(post_data['id'])
-                state["processed"] = list(processed_ids)
-                save_state(state)
-                log(f"✅ [{idx}/{len(new_posts)}] 처리 완료 및 상태 저장")
+            # 상태는 알림 전송이 끝난 뒤 (deliver_notifications) 저장한다.
+            # 알림 없이 끝난 고시 (첨부까지 같은 중복) 만 여기서 저장
+            if success and "sent" in ledger.stages(post_data['id']):
+                state.mark(post_data['id'], STATE_CONSUMER)
+                log(f"✅ [{idx}/{len(new_posts)}] 처리 완료 및 상태 저장 (알림 생략)")
+            elif success:
+                log(f"✅ [{idx}/{len(new_posts)}] 처리 완료, 알림 전송 후 상태 저장")
             else:
                 log(f"⚠️ [{idx}/{len(new_posts)}] 처리 실패, 상태 저장 안 함")
-            
-            # 여러 공고 처리 시 대기 (API 제한 방지)
-            if idx < len(new_posts):
-                import time
-                log(f"⏳ 다음 공고 대기 중... (3초)")
-                time.sleep(3)
                 
         except Exception as e:
             log(f"❌ [{idx}/{len(new_posts)}] 공고 처리 중 예외 발생: {e}")
@@ -469,6 +653,10 @@ def main():
             log(f"⏭️ 다음 공고로 계속...")
             continue
     
+    # 알림 전송 단계
+    log("\n📤 알림 전송 중...")
+    deliver_notifications()
+    
     log("\n" + "="*80)
     log("✅ 전체 처리 완료")
     log("="*80)
@@ -476,4 +664,9 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        # 상태 DB 의 WAL 을 본 파일로 합쳐 둔다 (커밋 대상은 gosi_state_notify.sqlite 하나)
+        from state_store import close_state
+        close_state()
@@ -6,8 +6,12 @@ gosi_to_stage.py
 파이프라인:
   1. busan_blog_최종__1_.py 로 고시문 수집 (제목 + PDF)
   2. 고시 제목 파싱 → 구역명 + 단계 추출
+     (구역명은 projects 구역명 사전(zone_gazetteer) 한 번 스캔 + 정규식 후보 보정)
   3. Supabase projects 테이블 stage 갱신 + stage_changes 기록
+     (projects 를 실행당 1회 메모리 인덱스로 로드 → 전이 계산 → outbox 에 기록
+      → 백그라운드 스레드가 묶어서 전송, 실패분은 다음 실행 시작 시 재전송)
   4. 구역지정/변경 고시면 → PDF → 이미지 → img_to_zone.py 폴리곤 추출
+     → 경계 저장소(boundary_store) + Supabase zone_boundaries
 
 Usage:
   python gosi_to_stage.py              # 최근 1페이지 확인
@@ -16,122 +20,173 @@ Usage:
 """
 
 import os
-import re
 import sys
-import json
 import argparse
 from datetime import datetime
 from pathlib import Path
 
+from title_classifier import get_classifier
+from notice_search import index_notice
+
 # ── Supabase ──────────────────────────────────────────────
 SUPABASE_URL = os.environ.get("SUPABASE_URL", "https://winlesksavenrohjymzl.supabase.co")
 SUPABASE_KEY = os.environ.get("SUPABASE_SERVICE_KEY", "")
 
-# ── 상태 파일 (중복 처리 방지) ──────────────────────────────
-STATE_FILE = Path(__file__).parent / "gosi_stage_state.json"
-
 
 # ══════════════════════════════════════════════════════════
 # 1. 단계 파싱
 # ══════════════════════════════════════════════════════════
 
-# 고시 제목 키워드 → stage 값 (우선순위 순)
-STAGE_PATTERNS = [
-    (r"준공|사용검사|완공",                         "준공완료"),
-    (r"착공",                                        "착공"),
-    (r"관리처분계획.*인가|관리처분.*인가",            "관리처분"),
-    (r"사업시행.*인가|시행인가",                      "시행인가"),
-    (r"조합설립.*인가|조합.*설립인가",               "조합설립"),
-    (r"추진위원회.*승인|추진위.*구성",               "추진위원회구성"),
-    (r"정비구역.*지정|구역.*지정|구역.*변경|정비계획.*결정", "구역지정"),
-]
-
-# 구역명 추출 패턴 (고시 제목에서)
-ZONE_NAME_PATTERNS = [
-    # "광안5구역", "사직4 재개발", "남천2 재건축"
-    r"([가-힣]+\d+(?:-\d+)?)\s*(?:구역|재개발|재건축)",
-    # "제X호 광안5구역"
-    r"제\S+호[^,]*?([가-힣]+\d+(?:-\d+)?)\s*(?:구역|재개발|재건축)",
-    # 괄호 안 구역명
-    r"[（(]([가-힣]+\d+(?:-\d+)?(?:구역)?)[）)]",
-]
+# 패턴(STAGE_PATTERNS / ZONE_NAME_PATTERNS)과 분류기는 title_classifier 에 있다.
+# 아래 함수들은 제목 하나용 래퍼 (여러 제목은 get_classifier().classify_many())
 
 
 def parse_stage(title: str) -> str | None:
     """고시 제목 → stage 값"""
-    for pattern, stage in STAGE_PATTERNS:
-        if re.search(pattern, title):
-            return stage
-    return None
+    return get_classifier().classify(title)["stage"]
 
 
-def parse_zone_names(title: str) -> list[str]:
-    """고시 제목 → 구역명 목록 (복수 구역 고시 대응)"""
-    names = []
-    for pattern in ZONE_NAME_PATTERNS:
-        for m in re.finditer(pattern, title):
-            name = m.group(1).strip()
-            # "재개발", "재건축" 접미 제거
-            name = re.sub(r"\s*(재개발|재건축|정비구역|구역)$", "", name).strip()
-            if name and name not in names:
-                names.append(name)
-    return names
+def parse_zone_names(title: str, gazetteer=None) -> list[str]:
+    """고시 제목 → 구역명 목록 (복수 구역 고시 대응)
+
+    gazetteer(zone_gazetteer.Gazetteer) 가 있으면 사전 스캔 결과를 DB 구역명으로 먼저 넣고,
+    정규식 후보는 사전으로 보정 (보정 안 되는 후보는 그대로 남김)"""
+    return get_classifier().classify(title, gazetteer)["zones"]
 
 
 def is_zone_designation(title: str) -> bool:
     """구역지정/변경 고시 여부 (→ 폴리곤 추출 대상)"""
-    return bool(re.search(r"정비구역.*지정|구역.*지정|구역.*변경|정비계획.*결정", title))
+    return get_classifier().classify(title)["is_designation"]
 
 
 # ══════════════════════════════════════════════════════════
 # 2. Supabase 갱신
 # ══════════════════════════════════════════════════════════
 
+_client = None
+
+
 def get_supabase():
+    """Supabase 클라이언트 (실행당 1개 재사용)"""
+    global _client
     if not SUPABASE_KEY:
         raise RuntimeError("SUPABASE_SERVICE_KEY 환경변수 없음")
-    from supabase import create_client
-    return create_client(SUPABASE_URL, SUPABASE_KEY)
-
-
-def update_stage(client, zone_name: str, new_stage: str, gosi_title: str, dry_run: bool) -> bool:
-    """projects 테이블 stage 갱신 + stage_changes 기록"""
-    # 현재 stage 조회
-    res = client.table("projects").select("id,stage,project_type").eq("name", zone_name).execute()
-    if not res.data:
-        print(f"    ⚠️  DB에 없음: {zone_name}")
-        return False
-
-    row = res.data[0]
-    old_stage = row["stage"]
-
-    if old_stage == new_stage:
-        print(f"    ↔  변경 없음: {zone_name} ({new_stage})")
-        return False
-
-    print(f"    ✅ {zone_name}: {old_stage} → {new_stage}")
-
-    if dry_run:
+    if _client is None:
+        from supabase import create_client
+        _client = create_client(SUPABASE_URL, SUPABASE_KEY)
+    return _client
+
+
+class ProjectIndex:
+    """projects 테이블 메모리 인덱스 (name → id, stage, project_type). 실행당 1회 로드"""
+
+    PAGE_SIZE = 1000
+
+    def __init__(self, rows: list[dict]):
+        self.by_name = {r["name"]: dict(r) for r in rows if r.get("name")}
+        self._gazetteer = None
+
+    @property
+    def gazetteer(self):
+        """구역명 사전 (Aho-Corasick + 별칭, 처음 쓸 때 1회 생성)"""
+        if self._gazetteer is None:
+            from zone_gazetteer import Gazetteer
+            self._gazetteer = Gazetteer.from_names(list(self.by_name))
+        return self._gazetteer
+
+    @classmethod
+    def load(cls, client) -> "ProjectIndex":
+        rows, start = [], 0
+        while True:
+            res = (client.table("projects").select("id,name,stage,project_type")
+                   .range(start, start + cls.PAGE_SIZE - 1).execute())
+            rows.extend(res.data)
+            if len(res.data) < cls.PAGE_SIZE:
+                break
+            start += cls.PAGE_SIZE
+        print(f"projects 인덱스: {len(rows)}개 구역 로드")
+        return cls(rows)
+
+    def get(self, name: str) -> dict | None:
+        return self.by_name.get(name)
+
+    def resolve(self, name: str) -> str | None:
+        """구역명 변형 ("광안제5구역", "광안5") → DB 구역명"""
+        if name in self.by_name:
+            return name
+        return self.gazetteer.resolve(name)
+
+    def __contains__(self, name: str):
+        return name in self.by_name
+
+    def __len__(self):
+        return len(self.by_name)
+
+
+class StageSync:
+    """단계 전이를 로컬에서 계산해 모아 두었다가 flush() 에서 outbox 로 넘김"""
+
+    def __init__(self, index: ProjectIndex):
+        self.index = index
+        self.updates = {}   # project id → new stage (마지막 값)
+        self.changes = []   # stage_changes 행
+
+    def apply(self, zone_name: str, new_stage: str, gosi_title: str) -> bool:
+        """인덱스 기준 단계 비교 → 변경이면 대기열에 추가 (DB 호출 없음)"""
+        name = self.index.resolve(zone_name)
+        if name is None:
+            print(f"    ⚠️  DB에 없음: {zone_name}")
+            return False
+        if name != zone_name:
+            print(f"    ≈  {zone_name} → {name}")
+        zone_name, row = name, self.index.get(name)
+
+        old_stage = row["stage"]
+        if old_stage == new_stage:
+            print(f"    ↔  변경 없음: {zone_name} ({new_stage})")
+            return False
+
+        print(f"    ✅ {zone_name}: {old_stage} → {new_stage}")
+        row["stage"] = new_stage  # 같은 실행의 다음 고시는 갱신된 단계와 비교
+        self.updates[row["id"]] = new_stage
+        self.changes.append({
+            "name": zone_name,
+            "project_type": row["project_type"],
+            "old_stage": old_stage,
+            "new_stage": new_stage,
+            "changed_at": datetime.now().isoformat(),
+            "source": "gosi_auto",
+            "gosi_title": gosi_title[:200],
+        })
         return True
 
-    # projects 갱신
-    client.table("projects").update({
-        "stage": new_stage,
-        "updated_at": datetime.now().isoformat(),
-    }).eq("id", row["id"]).execute()
-
-    # stage_changes 기록
-    client.table("stage_changes").insert({
-        "name": zone_name,
-        "project_type": row["project_type"],
-        "old_stage": old_stage,
-        "new_stage": new_stage,
-        "changed_at": datetime.now().isoformat(),
-        "source": "gosi_auto",
-        "gosi_title": gosi_title[:200],
-    }).execute()
-
-    return True
+    def flush(self, outbox, dry_run: bool = False) -> int:
+        """대기 중인 전이를 outbox 에 기록 (전송은 OutboxFlusher 가 묶어서).
+        projects 는 목표 stage 별 update ... in(id), stage_changes 는 insert 로 합쳐진다.
+        반환: 기록한 stage 변경 건수"""
+        if not self.changes:
+            return 0
+        n = len(self.changes)
+        if dry_run:
+            print(f"  (dry-run) 단계 변경 {n}건 반영 생략")
+            self.updates, self.changes = {}, []
+            return n
+
+        by_stage = {}
+        for pid, stage in self.updates.items():
+            by_stage.setdefault(stage, []).append(pid)
+        for stage, ids in by_stage.items():
+            outbox.enqueue("projects", "update", {
+                "set": {"stage": stage},
+                "column": "id",
+                "ids": ids,
+                "touch": "updated_at",
+            })
+        for change in self.changes:
+            outbox.enqueue("stage_changes", "insert", change)
+
+        self.updates, self.changes = {}, []
+        return n
 
 
 # ══════════════════════════════════════════════════════════
@@ -150,13 +205,27 @@ def extract_polygon_from_pdf(pdf_path: str, zone_name: str, dong: str = None, dr
     from img_to_zone import detect_boundary, extract_largest_contour, simple_transform
     from shapely.geometry import Polygon, mapping
 
+    from page_index import get_index as get_page_index, page_key, NO_POLYGON
+
     doc = fitz.open(pdf_path)
     print(f"    PDF {len(doc)}페이지")
 
+    pages = get_page_index()
     best_result = None  # (zone_name, coords, page_num)
 
     for page_num in range(len(doc)):
         page = doc.load_page(page_num)
+
+        # 같은 페이지(dHash 후보 + 내용 해시 일치)의 이전 경계 감지 결과 재사용
+        key = page_key(page)
+        known = pages.polygon(key)
+        if known == NO_POLYGON:
+            continue
+        if known:
+            print(f"    ♻️  페이지{page_num+1} 경계 재사용: {len(known['points'])}점")
+            best_result = (page_num + 1, np.array(known["points"]), tuple(known["shape"]))
+            break
+
         mat = fitz.Matrix(200 / 72, 200 / 72)  # 200 DPI
         pix = page.get_pixmap(matrix=mat)
         img_bytes = pix.tobytes("png")
@@ -177,8 +246,10 @@ def extract_polygon_from_pdf(pdf_path: str, zone_name: str, dong: str = None, dr
 
         if px_polygon is not None and len(px_polygon) >= 4:
             print(f"    ✅ 페이지{page_num+1} 경계 감지: {len(px_polygon)}점")
+            pages.put(key, polygon={"points": px_polygon.tolist(), "shape": list(img_bgr.shape)})
             best_result = (page_num + 1, px_polygon, img_bgr.shape)
             break  # 첫 번째 성공 페이지 사용
+        pages.put(key, polygon=NO_POLYGON)
 
     doc.close()
 
@@ -216,40 +287,42 @@ def extract_polygon_from_pdf(pdf_path: str, zone_name: str, dong: str = None, dr
         },
     }
 
-    # GeoJSON 로컬 저장
-    out_path = Path(__file__).parent / f"{zone_name}.geojson"
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump({"type": "FeatureCollection", "features": [geojson_feature]}, f,
-                  ensure_ascii=False, indent=2)
-    print(f"    GeoJSON: {out_path}")
+    # 기존 구역과 중첩 확인 (STRtree 인덱스)
+    import zone_store
+    overlapping = zone_store.get_store().overlaps(poly, exclude=zone_name)
+    if overlapping:
+        print("    ⚠️  기존 구역과 중첩: " + ", ".join(f"{n} {r:.0%}" for n, r in overlapping))
+        geojson_feature["properties"]["overlaps"] = [n for n, _ in overlapping]
+
+    # 경계 저장소 (db/zone_boundaries.sqlite)
+    from boundary_store import get_store as get_boundary_store
+    store = get_boundary_store()
+    version = store.upsert(geojson_feature, source="gosi_auto")
+    print(f"    경계 저장소: {zone_name} v{version}")
+    zone_store.invalidate()
 
     if dry_run:
         return
 
-    # Supabase 저장
+    # Supabase 저장 (outbox 경유, 마지막 전송과 같으면 생략)
     if SUPABASE_KEY:
-        client = get_supabase()
-        client.table("zone_boundaries").upsert({
-            "project_name": zone_name,
-            "geojson": geojson_feature,
-            "source": "gosi_auto",
-            "needs_position_check": center is None,
-        }, on_conflict="project_name").execute()
-        print(f"    Supabase 저장 완료")
+        from supabase_outbox import get_outbox
+        rows = store.sync_rows([zone_name])
+        if not rows:
+            print(f"    Supabase 경계 변경 없음 (생략)")
+        for row, digest in rows:
+            # outbox 는 영속 큐라 기록 시점에 동기화된 것으로 본다
+            get_outbox().enqueue("zone_boundaries", "upsert", row, on_conflict="project_name")
+            store.mark_synced(zone_name, digest)
+            print(f"    Supabase 저장 대기열 기록")
 
 
 # ══════════════════════════════════════════════════════════
 # 4. 상태 관리 (중복 처리 방지)
 # ══════════════════════════════════════════════════════════
+# gosi_state_stage.sqlite (state_store, 소비자 "stage"). 이전 gosi_stage_state.json 은 처음 열 때 이전
 
-def load_state() -> dict:
-    if STATE_FILE.exists():
-        return json.loads(STATE_FILE.read_text(encoding="utf-8"))
-    return {"processed_urls": []}
-
-
-def save_state(state: dict):
-    STATE_FILE.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
+STATE_CONSUMER = "stage"
 
 
 # ══════════════════════════════════════════════════════════
@@ -282,18 +355,36 @@ def main():
     crawler_mod.START_PAGE = 1
     crawler_mod.END_PAGE = args.pages
 
-    state = load_state()
-    processed = set(state["processed_urls"])
+    from state_store import get_state, close_state
+    state = get_state(STATE_CONSUMER)
 
-    client = None
-    if not dry_run and SUPABASE_KEY:
+    client, sync, flusher = None, None, None
+    if SUPABASE_KEY:
+        from supabase_outbox import get_outbox, OutboxFlusher
         client = get_supabase()
+        outbox = get_outbox()
+        if not dry_run:
+            # 지난 실행에서 못 보낸 변경부터 비우고, 이후는 백그라운드 전송
+            flusher = OutboxFlusher(outbox, client)
+            if outbox.pending():
+                print(f"outbox 미전송 {outbox.pending()}건 재전송")
+                flusher.flush(force=True)
+            flusher.start()
+        try:
+            sync = StageSync(ProjectIndex.load(client))
+        except Exception as e:
+            print(f"⚠️ projects 인덱스 로드 실패 (단계 고시는 다음 실행에서 재처리): {e}")
 
     driver = make_driver(headless=HEADLESS_LIST)
 
     try:
         urls = collect_posts(driver)
-        new_urls = [u for u in urls if u not in processed]
+        # 목록 페이지를 모두 읽었을 때만 오래된 처리 기록을 상태 floor 로 접기 (dry-run 제외)
+        if crawler_mod.PAGES_FAILED:
+            print(f"⚠️ 목록 페이지 {crawler_mod.PAGES_FAILED} 로드 실패 → 상태 정리 생략")
+        if not dry_run:
+            state.compact(STATE_CONSUMER, urls, complete=not crawler_mod.PAGES_FAILED)
+        new_urls = [u for u in urls if not state.is_processed(u, STATE_CONSUMER)]
         print(f"\n신규 고시: {len(new_urls)}건 / 전체: {len(urls)}건\n")
 
         for url in new_urls:
@@ -301,20 +392,22 @@ def main():
             title = detail["title"]
             print(f"\n[고시] {title}")
 
-            # 단계 파싱
-            stage = parse_stage(title)
-            zone_names = parse_zone_names(title)
+            # 단계 / 구역명 / 구역지정 여부 (분류 1회)
+            cls = get_classifier().classify(title, sync.index.gazetteer if sync else None)
+            stage, zone_names = cls["stage"], cls["zones"]
 
             print(f"  단계: {stage or '(파싱 불가)'}")
             print(f"  구역명: {zone_names or '(파싱 불가)'}")
+            index_notice(url, title, zones=zone_names)
 
-            # 단계 갱신
-            if stage and zone_names and client:
+            # 단계 전이 계산 → outbox 기록 (전송은 백그라운드)
+            if stage and zone_names and sync:
                 for zn in zone_names:
-                    update_stage(client, zn, stage, title, dry_run)
+                    sync.apply(zn, stage, title)
+                sync.flush(outbox, dry_run)
 
             # 구역지정 → 폴리곤 추출
-            if is_zone_designation(title) and detail["attachments"]:
+            if cls["is_designation"] and detail["attachments"]:
                 print(f"  → 구역지정 고시: 폴리곤 추출 시도")
                 pdf_paths = download_pdf(driver, detail["attachments"], url, title)
                 for pdf_path in pdf_paths:
@@ -325,15 +418,19 @@ def main():
                     for zn in (zone_names or ["unknown"]):
                         extract_polygon_from_pdf(pdf_path, zn, dong=dong, dry_run=dry_run)
 
-            # 처리 완료 기록
-            processed.add(url)
-
-        state["processed_urls"] = list(processed)
-        save_state(state)
+            # 처리 완료 기록 (인덱스 없이 단계 반영을 못 한 고시는 남겨 둠)
+            if stage and zone_names and client and not sync:
+                continue
+            state.mark(url, STATE_CONSUMER)
 
     finally:
         driver.quit()
+        if flusher:
+            flusher.stop()
+        close_state()
 
+    from geocode_cache import get_cache
+    print(f"\n{get_cache().summary()}")
     print("\n완료.")
 
 
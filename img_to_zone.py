@@ -7,10 +7,12 @@ img_to_zone.py
   2. 경계 폴리곤 윤곽선 추출
   3. OCR로 지번 번호 추출 → V-World 지번 좌표 조회 → GCP(기준점) 생성
   4. 기준점으로 이미지 좌표 → WGS84 어파인 변환
-  5. GeoJSON 저장 + Folium 지도 미리보기 + Supabase upsert
+  5. 경계 저장소(boundary_store) 저장 + Folium 지도 미리보기 + Supabase upsert
 
 사용법:
   python img_to_zone.py --img 구역경계.jpg --name 사직4구역 --scale 1200 --preview
+  python img_to_zone.py --dir 경계이미지/ --dong "부산광역시 동래구 사직동"   # 폴더 일괄 처리
+  python img_to_zone.py --manifest zones.csv --workers 4                      # CSV 목록 일괄 처리
 
 환경변수 (--save 옵션):
   SUPABASE_URL, SUPABASE_SERVICE_KEY, VWORLD_API_KEY
@@ -18,18 +20,18 @@ img_to_zone.py
 
 import os
 import re
+import csv
 import json
 import argparse
 import numpy as np
 import cv2
 from PIL import Image
 import pytesseract
-import requests
 import folium
 from shapely.geometry import Polygon, mapping
 from shapely.ops import unary_union
 
-VWORLD_API_KEY = os.environ.get("VWORLD_API_KEY", "7D47968C-0ADC-334F-86EA-233B5806D2BE")
+from geocode_cache import vworld_geocode
 
 
 # ────────────────────────────────────────────
@@ -127,22 +129,8 @@ def ocr_jibun(img_bgr: np.ndarray) -> list[str]:
 # 3. V-World로 지번 좌표 조회
 # ────────────────────────────────────────────
 def geocode_jibun(dong: str, jibun: str) -> tuple | None:
-    """V-World 지번 검색 → (lng, lat)"""
-    try:
-        r = requests.get("https://api.vworld.kr/req/address", params={
-            "service": "address", "request": "getcoord",
-            "version": "2.0", "crs": "epsg:4326",
-            "address": f"{dong} {jibun}",
-            "type": "parcel", "format": "json",
-            "key": VWORLD_API_KEY,
-        }, timeout=10)
-        data = r.json()
-        if data.get("response", {}).get("status") == "OK":
-            pt = data["response"]["result"]["point"]
-            return float(pt["x"]), float(pt["y"])
-    except Exception:
-        pass
-    return None
+    """V-World 지번 검색 → (lng, lat) (geocode_cache 경유)"""
+    return vworld_geocode(f"{dong} {jibun}")
 
 
 # ────────────────────────────────────────────
@@ -221,69 +209,68 @@ def preview_map(coords_wgs84: list[tuple], name: str, img_path: str,
 
 
 # ────────────────────────────────────────────
-# 메인
+# 7. 이미지 1장 처리
 # ────────────────────────────────────────────
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--img",    required=True, help="JPG/PNG 파일 경로")
-    parser.add_argument("--name",   default=None,  help="사업명")
-    parser.add_argument("--dong",   default=None,
-                        help="법정동 주소 (예: '부산광역시 동래구 사직동') — GCP 자동 생성용")
-    parser.add_argument("--scale",  type=int, default=1200, help="축척 분모 (기본 1200)")
-    parser.add_argument("--center", default=None,
-                        help="중심 좌표 lng,lat (예: 129.065,35.188)")
-    parser.add_argument("--color",  default="auto", choices=["auto","red","green","blue","black","yellow"],
-                        help="경계선 색상 (기본: auto). black=흑백 도면 Canny 엣지 감지, yellow=노란 구역 감지")
-    parser.add_argument("--preview", action="store_true")
-    parser.add_argument("--save",    action="store_true")
-    parser.add_argument("--out",    default=None)
-    args = parser.parse_args()
+def process_image(img_path: str, name: str = None, dong: str = None, center: str = None,
+                  scale: int = 1200, color: str = "auto", out: str = None,
+                  out_dir: str = ".", preview: bool = False) -> dict:
+    """
+    경계 이미지 1장 → GeoJSON Feature.
+    반환: {"img", "name", "status": ok|fail, "points", "out", "error", "feature"}
+    out 을 지정하면 GeoJSON 파일도 함께 쓴다.
+    """
+    name = name or os.path.splitext(os.path.basename(img_path))[0]
+    result = {"img": img_path, "name": name, "status": "fail",
+              "points": 0, "out": "", "error": "", "feature": None}
 
-    name = args.name or os.path.splitext(os.path.basename(args.img))[0]
-    img_bgr = cv2.imread(args.img)
+    img_bgr = cv2.imread(img_path)
     if img_bgr is None:
-        print(f"이미지 로드 실패: {args.img}")
-        return
+        print(f"이미지 로드 실패: {img_path}")
+        result["error"] = "이미지 로드 실패"
+        return result
 
     h, w = img_bgr.shape[:2]
-    print(f"이미지 크기: {w}×{h}px  축척: 1:{args.scale}")
+    print(f"이미지 크기: {w}×{h}px  축척: 1:{scale}")
 
     # 1. 경계 감지
-    color = args.color
     mask = detect_boundary(img_bgr, color)
     # black 모드: 가장 큰 윤곽선은 이미지 테두리 → 2위가 경계
     nth = 1 if color == "black" else 0
     px_polygon = extract_largest_contour(mask, nth=nth)
     if px_polygon is None:
         print("경계선 감지 실패")
-        return
+        result["error"] = "경계선 감지 실패"
+        return result
     print(f"  경계 포인트: {len(px_polygon)}개")
+    result["points"] = len(px_polygon)
 
     # 2. 좌표 변환
-    if args.center:
-        center_lng, center_lat = map(float, args.center.split(","))
-    elif args.dong:
+    if center:
+        center_lng, center_lat = map(float, center.split(","))
+    elif dong:
         # 법정동 중심 좌표를 V-World로 조회
-        res = geocode_jibun(args.dong, "")
+        res = geocode_jibun(dong, "")
         if res:
             center_lng, center_lat = res
             print(f"  중심 좌표: {center_lat:.5f}, {center_lng:.5f}")
         else:
             print("  V-World 중심 좌표 조회 실패")
-            return
+            result["error"] = "V-World 중심 좌표 조회 실패"
+            return result
     else:
         print("--dong 또는 --center 옵션이 필요합니다.")
-        return
+        result["error"] = "dong/center 없음"
+        return result
 
     # GCP 기반 어파인 변환 시도 (OCR 지번 활용)
     M = None
-    if args.dong:
+    if dong:
         print("  OCR로 지번 추출 중...")
         jibuns = ocr_jibun(img_bgr)
         print(f"  추출된 지번: {jibuns[:10]}")
         gcps = []
         for jb in jibuns[:15]:
-            coord = geocode_jibun(args.dong, jb)
+            coord = geocode_jibun(dong, jb)
             if coord:
                 # 이미지에서 해당 숫자 텍스트 위치 찾기 (근사)
                 # 실제로는 pytesseract bounding box 필요 — 여기선 스킵
@@ -291,48 +278,237 @@ def main():
 
     # GCP 실패 시 스케일 기반 단순 변환
     wgs84_coords = simple_transform(px_polygon, img_bgr.shape,
-                                    center_lng, center_lat, args.scale)
+                                    center_lng, center_lat, scale)
 
     # GeoJSON 생성
     poly_shp = Polygon(wgs84_coords)
     if not poly_shp.is_valid:
         poly_shp = poly_shp.buffer(0)
 
-    geojson = {
-        "type": "FeatureCollection",
-        "features": [{
-            "type": "Feature",
-            "geometry": mapping(poly_shp),
-            "properties": {"name": name, "scale": args.scale}
-        }]
+    feature = {
+        "type": "Feature",
+        "geometry": mapping(poly_shp),
+        "properties": {"name": name, "scale": scale, "source": "img_extract"}
     }
 
-    out_path = args.out or f"{name}.geojson"
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(geojson, f, ensure_ascii=False, indent=2)
-    print(f"\nGeoJSON 저장: {out_path}")
+    # 경계 저장소 기록은 호출측에서 (일괄 처리 시 부모 프로세스가 모아서 upsert)
+    out_path = ""
+    if out:
+        out_path = out
+        with open(out_path, "w", encoding="utf-8") as f:
+            json.dump({"type": "FeatureCollection", "features": [feature]}, f, ensure_ascii=False)
+        print(f"\nGeoJSON 저장: {out_path}")
 
     # 디버그 이미지 (감지된 경계 표시)
     debug_img = img_bgr.copy()
     cv2.drawContours(debug_img, [px_polygon.reshape(-1, 1, 2)], -1, (0, 255, 0), 3)
-    debug_path = f"{name}_debug.jpg"
+    debug_path = os.path.join(out_dir, f"{name}_debug.jpg")
     cv2.imwrite(debug_path, debug_img)
     print(f"경계 확인 이미지: {debug_path}")
 
-    if args.preview:
-        preview_map(wgs84_coords, name, args.img, img_bgr,
-                    f"{name}_map.html")
+    if preview:
+        preview_map(wgs84_coords, name, img_path, img_bgr,
+                    os.path.join(out_dir, f"{name}_map.html"))
+
+    result.update(status="ok", out=out_path, feature=feature)
+    return result
+
+
+def save_to_supabase(features: list[dict]):
+    """zone_boundaries upsert (경계 저장소 기준, 바뀐 구역만 한 번에)"""
+    if not features:
+        return
+    from boundary_store import get_store as get_boundary_store
+    store = get_boundary_store()
+    rows = store.sync_rows([ft["properties"]["name"] for ft in features])
+    if not rows:
+        print("Supabase 저장 생략: 변경된 구역 없음")
+        return
+    from supabase import create_client
+    client = create_client(os.environ["SUPABASE_URL"],
+                           os.environ["SUPABASE_SERVICE_KEY"])
+    client.table("zone_boundaries").upsert([row for row, _ in rows],
+                                           on_conflict="project_name").execute()
+    for row, digest in rows:
+        store.mark_synced(row["project_name"], digest)
+    print(f"Supabase 저장 완료 ({len(rows)}/{len(features)}개 변경): "
+          f"{', '.join(row['project_name'] for row, _ in rows)}")
+
+
+# ────────────────────────────────────────────
+# 8. 일괄 처리 (--dir / --manifest)
+# ────────────────────────────────────────────
+IMG_EXTS = (".jpg", ".jpeg", ".png")
+BATCH_STATUS_FIELDS = ["img", "name", "status", "points", "out", "error"]
+
+
+def load_batch_jobs(args) -> list[dict]:
+    """--dir 또는 --manifest(CSV: img,name,dong,center,scale,color) → 작업 목록.
+    manifest 에서 비어 있는 칸은 명령행 값으로 채운다."""
+    defaults = {"dong": args.dong, "center": args.center,
+                "scale": args.scale, "color": args.color}
+    jobs = []
+    if args.manifest:
+        base = os.path.dirname(os.path.abspath(args.manifest))
+        with open(args.manifest, encoding="utf-8-sig", newline="") as f:
+            for row in csv.DictReader(f):
+                img = (row.get("img") or "").strip()
+                if not img:
+                    continue
+                job = {"img": img if os.path.isabs(img) else os.path.join(base, img),
+                       "name": (row.get("name") or "").strip() or None}
+                for k, v in defaults.items():
+                    job[k] = (row.get(k) or "").strip() or v
+                job["scale"] = int(job["scale"])
+                jobs.append(job)
+    else:
+        for fn in sorted(os.listdir(args.dir)):
+            if fn.lower().endswith(IMG_EXTS) and not fn.endswith("_debug.jpg"):
+                jobs.append({"img": os.path.join(args.dir, fn), "name": None, **defaults})
+    return jobs
+
+
+def _is_up_to_date(store, img_path: str, name: str) -> bool:
+    """경계 저장소의 해당 구역이 이미지보다 나중에 갱신됐으면 최신"""
+    updated = store.updated_at(name)
+    return updated is not None and updated >= os.path.getmtime(img_path)
+
+
+def _init_worker():
+    """fork 로 물려받은 부모의 SQLite 연결을 버린다 (작업 프로세스는 처음 쓸 때 새로 연다)"""
+    from geocode_cache import reset_cache
+    from boundary_store import reset_store
+    reset_cache()
+    reset_store()
+
+
+def _batch_worker(job: dict) -> dict:
+    """프로세스 풀 작업 함수 (예외도 상태로 반환)"""
+    try:
+        return process_image(job["img"], job["name"], job["dong"], job["center"],
+                             job["scale"], job["color"], out_dir=job["out_dir"],
+                             preview=job["preview"])
+    except Exception as e:
+        return {"img": job["img"], "name": job["name"], "status": "fail",
+                "points": 0, "out": "", "error": str(e), "feature": None}
+
+
+def run_batch(jobs: list[dict], out_dir: str, combined_out: str, workers: int = None,
+              preview: bool = False, force: bool = False) -> list[dict]:
+    """여러 이미지를 프로세스 풀로 처리 → 경계 저장소 upsert
+    + 통합 FeatureCollection + 이미지별 상태 CSV"""
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from boundary_store import get_store as get_boundary_store
+
+    os.makedirs(out_dir, exist_ok=True)
+    store = get_boundary_store()
+
+    # 같은 dong 의 중심 좌표는 부모에서 한 번만 조회해 작업에 넣어 둔다
+    for dong in {j["dong"] for j in jobs if j["dong"] and not j["center"]}:
+        res = geocode_jibun(dong, "")
+        for j in jobs:
+            if j["dong"] == dong and not j["center"] and res:
+                j["center"] = f"{res[0]},{res[1]}"
+
+    results, pending = [], []
+    for job in jobs:
+        job["name"] = job["name"] or os.path.splitext(os.path.basename(job["img"]))[0]
+        job["out_dir"], job["preview"] = out_dir, False
+        if not force and _is_up_to_date(store, job["img"], job["name"]):
+            results.append({"img": job["img"], "name": job["name"], "status": "skipped",
+                            "points": 0, "out": "", "error": "",
+                            "feature": store.get(job["name"])})
+        else:
+            pending.append(job)
+
+    print(f"일괄 처리: {len(pending)}장 처리 / {len(results)}장 최신 (건너뜀)")
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = [pool.submit(_batch_worker, job) for job in pending]
+            for i, fut in enumerate(as_completed(futures), 1):
+                res = fut.result()
+                if res["feature"]:
+                    version = store.upsert(res["feature"], source="img_extract")
+                    res["out"] = f"zone_boundaries v{version}"
+                mark = "✅" if res["status"] == "ok" else "❌"
+                print(f"  [{i}/{len(pending)}] {mark} {res['name']} {res['error']}")
+                results.append(res)
+
+    results.sort(key=lambda r: r["img"])
+    features = [r["feature"] for r in results if r["feature"]]
+    with open(combined_out, "w", encoding="utf-8") as f:
+        json.dump({"type": "FeatureCollection", "features": features}, f, ensure_ascii=False)
+    print(f"\n통합 GeoJSON 저장: {combined_out} ({len(features)}개 구역)")
+
+    # 미리보기: 이미지마다 HTML 대신 일괄 결과 전체를 아틀라스 한 장으로
+    if preview and features:
+        from zone_atlas import build_atlas
+        build_atlas(features, os.path.join(out_dir, "zones_batch_atlas.html"))
+
+    # 같은 구역을 두 번 추출한 경우 등 중복 의심 쌍 경고
+    from zone_store import ZoneStore
+    for a, b, ratio in ZoneStore(features).duplicates():
+        print(f"  ⚠️ 중복 의심: {a} ↔ {b}  겹침 {ratio:.0%}")
+
+    status_path = os.path.join(out_dir, "batch_status.csv")
+    with open(status_path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=BATCH_STATUS_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(results)
+    print(f"이미지별 상태: {status_path}")
+    return results
+
+
+# ────────────────────────────────────────────
+# 메인
+# ────────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser()
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--img",      help="JPG/PNG 파일 경로")
+    src.add_argument("--dir",      help="일괄 처리: 이미지 폴더 (jpg/png 전체)")
+    src.add_argument("--manifest", help="일괄 처리: CSV (img,name,dong,center,scale,color)")
+    parser.add_argument("--name",   default=None,  help="사업명")
+    parser.add_argument("--dong",   default=None,
+                        help="법정동 주소 (예: '부산광역시 동래구 사직동') — GCP 자동 생성용")
+    parser.add_argument("--scale",  type=int, default=1200, help="축척 분모 (기본 1200)")
+    parser.add_argument("--center", default=None,
+                        help="중심 좌표 lng,lat (예: 129.065,35.188)")
+    parser.add_argument("--color",  default="auto", choices=["auto","red","green","blue","black","yellow"],
+                        help="경계선 색상 (기본: auto). black=흑백 도면 Canny 엣지 감지, yellow=노란 구역 감지")
+    parser.add_argument("--preview", action="store_true")
+    parser.add_argument("--save",    action="store_true")
+    parser.add_argument("--out",    default=None,
+                        help="GeoJSON 파일로도 저장 (일괄 처리 시 통합 FeatureCollection 경로)")
+    parser.add_argument("--out-dir", default=None, help="일괄 처리 출력 폴더 (기본: 이미지 폴더)")
+    parser.add_argument("--workers", type=int, default=None, help="일괄 처리 프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--force",   action="store_true", help="일괄 처리 시 최신 출력도 다시 처리")
+    args = parser.parse_args()
+
+    if args.img:
+        result = process_image(args.img, args.name, args.dong, args.center,
+                               args.scale, args.color, out=args.out, preview=args.preview)
+        if result["feature"]:
+            from boundary_store import get_store as get_boundary_store
+            version = get_boundary_store().upsert(result["feature"], source="img_extract")
+            print(f"경계 저장소: {result['name']} v{version}")
+        if args.save and result["feature"]:
+            save_to_supabase([result["feature"]])
+        return
+
+    jobs = load_batch_jobs(args)
+    if not jobs:
+        print("처리할 이미지가 없습니다.")
+        return
+    out_dir = args.out_dir or (os.path.dirname(os.path.abspath(args.manifest))
+                               if args.manifest else args.dir)
+    combined_out = args.out or os.path.join(out_dir, "zones_batch.geojson")
+    results = run_batch(jobs, out_dir, combined_out, workers=args.workers,
+                        preview=args.preview, force=args.force)
 
     if args.save:
-        from supabase import create_client
-        client = create_client(os.environ["SUPABASE_URL"],
-                               os.environ["SUPABASE_SERVICE_KEY"])
-        client.table("zone_boundaries").upsert({
-            "project_name": name,
-            "geojson": geojson["features"][0],
-            "source": "img_extract",
-        }, on_conflict="project_name").execute()
-        print(f"Supabase 저장 완료: {name}")
+        save_to_supabase([r["feature"] for r in results if r["status"] == "ok"])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+imgbb_uploader.py
+imgbb 병렬 업로드 + 업로드 결과 캐시 (이미지 sha256 → 호스팅 URL)
+
+고시 한 건의 페이지 이미지(최대 5장)를 스레드 풀로 동시에 올린다.
+  - 연결은 HTTPAdapter 연결 풀을 가진 Session 하나를 공유 (TLS 재협상 없음)
+  - 파일은 base64 문자열로 메모리에 올리지 않고 multipart 로 그대로 보낸다
+  - 올린 적 있는 이미지(내용 sha256 기준)는 요청 없이 이전 URL 을 돌려준다
+    → 재시도 / 재전송 / 다른 고시의 같은 이미지가 모두 캐시로 끝난다
+캐시 조회·기록은 호출 스레드에서만 하고 작업 스레드는 HTTP 요청만 한다.
+
+파일: db/imgbb_uploads.sqlite (local_db.DB_DIR)
+
+Usage:
+  python imgbb_uploader.py page_001.png page_002.png    # IMGBB_API_KEY 환경변수
+"""
+
+import os
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import local_db
+import rate_limit
+from notice_records import file_sha256
+
+UPLOAD_CACHE_FILE = "imgbb_uploads.sqlite"
+UPLOAD_URL = "https://api.imgbb.com/1/upload"
+WORKERS = 4
+TIMEOUT = 30
+
+
+class UploadCache:
+    def __init__(self, filename: str = UPLOAD_CACHE_FILE):
+        self.conn = local_db.connect(filename)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS uploads (
+                sha256      TEXT PRIMARY KEY,
+                url         TEXT NOT NULL,
+                name        TEXT,
+                uploaded_at REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def get(self, digest: str) -> str | None:
+        row = self.conn.execute("SELECT url FROM uploads WHERE sha256=?", (digest,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, digest: str, url: str, name: str = None):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO uploads (sha256, url, name, uploaded_at) "
+                              "VALUES (?, ?, ?, ?)", (digest, url, name, time.time()))
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM uploads").fetchone()[0]
+
+
+class ImgbbUploader:
+    def __init__(self, api_key: str, workers: int = WORKERS, cache: UploadCache = None, log=print):
+        self.api_key = api_key
+        self.workers = workers
+        self.cache = cache or UploadCache()
+        self.log = log
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount("https://", adapter)
+
+    def _post(self, path: str) -> str:
+        """업로드 요청 하나 (작업 스레드). 반환: URL, 실패 시 예외"""
+        with open(path, "rb") as f:
+            response = rate_limit.request("POST", UPLOAD_URL, session=self.session,
+                                          data={"key": self.api_key},
+                                          files={"image": (Path(path).name, f)}, timeout=TIMEOUT)
+        response.raise_for_status()
+        result = response.json()
+        if not result.get("success"):
+            raise RuntimeError(f"업로드 실패: {result}")
+        return result["data"]["url"]
+
+    def upload_many(self, paths: list[str]) -> list[str | None]:
+        """이미지 목록 → URL 목록 (입력 순서 유지, 실패는 None)"""
+        results = [None] * len(paths)
+        todo = []
+        for i, path in enumerate(paths):
+            digest = file_sha256(path)
+            url = self.cache.get(digest)
+            if url:
+                results[i] = url
+                self.log(f"  ♻️ 업로드 캐시: {Path(path).name}")
+            else:
+                todo.append((i, path, digest))
+        if not todo:
+            return results
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(todo))) as pool:
+            futures = {pool.submit(self._post, path): (i, path, digest) for i, path, digest in todo}
+            for future in as_completed(futures):
+                i, path, digest = futures[future]
+                try:
+                    url = future.result()
+                except Exception as e:
+                    self.log(f"  ❌ imgbb 업로드 오류: {Path(path).name}: {e}")
+                    continue
+                self.cache.put(digest, url, Path(path).name)
+                results[i] = url
+                self.log(f"  ✅ 이미지 업로드: {Path(path).name}")
+        return results
+
+    def upload(self, path: str) -> str | None:
+        return self.upload_many([path])[0]
+
+
+_uploader = None
+
+
+def get_uploader(api_key: str = None, log=print) -> ImgbbUploader:
+    """프로세스 공용 업로더 (첫 호출의 키 / 로그 함수 사용)"""
+    global _uploader
+    if _uploader is None:
+        _uploader = ImgbbUploader(api_key or os.getenv("IMGBB_API_KEY"), log=log)
+    return _uploader
+
+
+# ══════════════════════════════════════════════════════════
+# 메인
+# ══════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("images", nargs="+", help="업로드할 이미지")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args()
+
+    if not os.getenv("IMGBB_API_KEY"):
+        print("❌ IMGBB_API_KEY 환경변수 필요")
+        return
+    uploader = ImgbbUploader(os.getenv("IMGBB_API_KEY"), workers=args.workers)
+    t0 = time.perf_counter()
+    urls = uploader.upload_many(args.images)
+    for path, url in zip(args.images, urls):
+        print(f"  {Path(path).name}: {url or '실패'}")
+    print(f"\n{sum(1 for u in urls if u)}/{len(urls)}장 ({time.perf_counter() - t0:.1f}s, "
+          f"캐시 {len(uploader.cache)}건)")
+
+
+if __name__ == "__main__":
+    main()
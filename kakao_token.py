@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+kakao_token.py
+카카오 액세스 토큰 관리 (암호화 저장 · 만료 전 갱신 · 갱신 직렬화)
+
+지금까지는 환경변수 토큰으로 보내 보고 401 이 나면 갱신한 뒤 새 토큰을 버려서,
+같은 실행 안의 다음 고시도 매번 401 → 갱신을 반복했다.
+KakaoTokenManager 는 갱신한 액세스 토큰과 (회전된) 리프레시 토큰을 만료 시각과
+함께 저장해 두고 다음 호출·다음 실행에서 그대로 쓴다.
+
+  token()      만료 REFRESH_MARGIN 전이면 미리 갱신, 아니면 저장된 토큰
+  refresh(failed=…)
+               401 을 받은 토큰을 넘기면, 다른 스레드/프로세스가 이미 바꿔 놓았을 때
+               갱신 없이 새 토큰만 돌려준다 (스레드 Lock + SQLite BEGIN IMMEDIATE)
+
+저장: db/kakao_token.sqlite (local_db.DB_DIR) 에 토큰 JSON 을 Fernet 으로 암호화해서 둔다.
+  KAKAO_TOKEN_KEY   암호화 키 (Fernet 키 또는 임의 문자열 → SHA-256 으로 키 유도)
+  cryptography 미설치 / 키 없음 → 디스크에 쓰지 않고 프로세스 메모리에만 유지
+                                   (pip install cryptography)
+"""
+
+import os
+import json
+import time
+import base64
+import hashlib
+import argparse
+import threading
+
+import local_db
+
+TOKEN_FILE = "kakao_token.sqlite"
+TOKEN_URL = "https://kauth.kakao.com/oauth/token"
+REFRESH_MARGIN = 600        # 만료 10분 전부터 미리 갱신
+DEFAULT_EXPIRES_IN = 21599  # 카카오 액세스 토큰 기본 유효기간 (6시간)
+
+
+def _fernet(secret: str):
+    """KAKAO_TOKEN_KEY → Fernet (없으면 None)"""
+    if not secret:
+        print("    ⚠️ KAKAO_TOKEN_KEY 없음 → 토큰을 메모리에만 유지 "
+              "(갱신·회전된 토큰은 실행이 끝나면 사라짐)")
+        return None
+    try:
+        from cryptography.fernet import Fernet
+    except ImportError:
+        print("    ⚠️ cryptography 미설치 → 토큰을 메모리에만 유지 (pip install cryptography)")
+        return None
+    try:
+        return Fernet(secret.encode())
+    except ValueError:
+        return Fernet(base64.urlsafe_b64encode(hashlib.sha256(secret.encode()).digest()))
+
+
+class TokenStore:
+    """암호화된 토큰 한 건 (키가 없으면 저장하지 않음)"""
+
+    def __init__(self, secret: str = None, filename: str = TOKEN_FILE):
+        self.fernet = _fernet(secret)
+        self.conn = None
+        if self.fernet:
+            self.conn = local_db.connect(filename)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS token (
+                    id         INTEGER PRIMARY KEY CHECK (id = 1),
+                    blob       BLOB NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            self.conn.commit()
+
+    def load(self) -> dict | None:
+        if not self.conn:
+            return None
+        row = self.conn.execute("SELECT blob FROM token WHERE id=1").fetchone()
+        if row is None:
+            return None
+        try:
+            return json.loads(self.fernet.decrypt(row[0]))
+        except Exception:
+            print("    ⚠️ 저장된 카카오 토큰 복호화 실패 (키 변경?) → 무시")
+            return None
+
+    def save(self, data: dict):
+        if not self.conn:
+            return
+        blob = self.fernet.encrypt(json.dumps(data).encode())
+        self.conn.execute("INSERT OR REPLACE INTO token (id, blob, updated_at) VALUES (1, ?, ?)",
+                          (blob, time.time()))
+
+    def begin(self):
+        """프로세스 간 갱신 직렬화 (쓰기 잠금)"""
+        if self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+
+    def commit(self):
+        if self.conn:
+            self.conn.commit()
+
+    def rollback(self):
+        if self.conn:
+            self.conn.rollback()
+
+
+class KakaoTokenManager:
+    def __init__(self, rest_api_key: str, access_token: str = None, refresh_token: str = None,
+                 store: TokenStore = None, log=print):
+        self.rest_api_key = rest_api_key
+        self.store = store or TokenStore(os.getenv("KAKAO_TOKEN_KEY"))
+        self.log = log
+        self._lock = threading.Lock()
+        # 환경변수 토큰은 만료 시각을 모른다 (401 을 받으면 갱신)
+        self.data = {"access_token": access_token, "refresh_token": refresh_token,
+                     "expires_at": None}
+        self._merge(self.store.load())
+
+    def _merge(self, stored: dict | None):
+        """저장된 토큰이 있으면 그쪽을 쓴다 (환경변수 리프레시 토큰은 회전 전 값일 수 있음)"""
+        if stored and stored.get("access_token"):
+            self.data.update({k: v for k, v in stored.items() if v})
+
+    def _expiring(self) -> bool:
+        exp = self.data.get("expires_at")
+        return exp is not None and exp - time.time() < REFRESH_MARGIN
+
+    def token(self) -> str | None:
+        """사용할 액세스 토큰 (만료 임박이면 미리 갱신)"""
+        if self.data.get("access_token") and not self._expiring():
+            return self.data["access_token"]
+        return self.refresh(failed=self.data.get("access_token"))
+
+    def refresh(self, failed: str = None) -> str | None:
+        """토큰 갱신. failed(401 받은 토큰)와 현재 토큰이 다르면 이미 갱신된 것으로 보고 그대로 반환"""
+        with self._lock:
+            if failed is not None and self.data.get("access_token") not in (None, failed) \
+                    and not self._expiring():
+                return self.data["access_token"]
+            self.store.begin()
+            try:
+                # 다른 프로세스가 먼저 갱신했는지 잠금 안에서 다시 확인
+                self._merge(self.store.load())
+                if failed is not None and self.data.get("access_token") not in (None, failed) \
+                        and not self._expiring():
+                    self.store.commit()
+                    return self.data["access_token"]
+                token = self._request()
+                self.store.commit()
+                return token
+            except Exception:
+                self.store.rollback()
+                raise
+
+    def _request(self) -> str | None:
+        if not self.rest_api_key or not self.data.get("refresh_token"):
+            self.log("❌ REST API 키 또는 리프레시 토큰 없음")
+            return None
+        from rate_limit import request
+        try:
+            response = request("POST", TOKEN_URL, data={
+                "grant_type": "refresh_token",
+                "client_id": self.rest_api_key,
+                "refresh_token": self.data["refresh_token"],
+            }, timeout=15)
+            response.raise_for_status()
+            tokens = response.json()
+        except Exception as e:
+            self.log(f"❌ 토큰 갱신 실패: {e}")
+            return None
+
+        now = time.time()
+        self.data["access_token"] = tokens["access_token"]
+        self.data["expires_at"] = now + tokens.get("expires_in", DEFAULT_EXPIRES_IN)
+        if tokens.get("refresh_token"):
+            # 리프레시 토큰은 만료 1개월 전부터 갱신 응답에 새 값이 온다
+            self.data["refresh_token"] = tokens["refresh_token"]
+            self.data["refresh_expires_at"] = now + tokens.get("refresh_token_expires_in", 0)
+            self.log("🔁 카카오 리프레시 토큰 회전")
+        self.store.save(self.data)
+        self.log("✅ 카카오 토큰 갱신 성공")
+        return self.data["access_token"]
+
+    def status(self) -> dict:
+        exp = self.data.get("expires_at")
+        return {
+            "has_access": bool(self.data.get("access_token")),
+            "has_refresh": bool(self.data.get("refresh_token")),
+            "expires_in": round(exp - time.time()) if exp else None,
+            "persisted": self.store.conn is not None,
+        }
+
+
+_manager = None
+
+
+def get_manager(log=print) -> KakaoTokenManager:
+    """프로세스 공용 토큰 관리자 (환경변수 KAKAO_* 사용)"""
+    global _manager
+    if _manager is None:
+        _manager = KakaoTokenManager(os.getenv("KAKAO_REST_API_KEY"),
+                                     os.getenv("KAKAO_ACCESS_TOKEN"),
+                                     os.getenv("KAKAO_REFRESH_TOKEN"), log=log)
+    return _manager
+
+
+# ══════════════════════════════════════════════════════════
+# 메인
+# ══════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--refresh", action="store_true", help="지금 갱신")
+    args = parser.parse_args()
+
+    manager = get_manager()
+    if args.refresh:
+        manager.refresh()
+    s = manager.status()
+    print(f"액세스 토큰: {'있음' if s['has_access'] else '없음'}"
+          f" (남은 시간 {s['expires_in']}s)" if s["expires_in"] is not None else
+          f"액세스 토큰: {'있음' if s['has_access'] else '없음'} (만료 시각 모름)")
+    print(f"리프레시 토큰: {'있음' if s['has_refresh'] else '없음'} / "
+          f"저장: {'암호화 저장' if s['persisted'] else '메모리만'}")
+
+
+if __name__ == "__main__":
+    main()
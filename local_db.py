@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+local_db.py
+로컬 SQLite 파일 공통 연결 (캐시 / 인덱스)
+
+모든 로컬 DB는 DB_DIR(기본: 스크립트 옆 db/) 아래에 용도별 파일 하나씩 둔다.
+GitHub Actions에서는 actions/cache 로 db/ 디렉터리를 실행 간 유지한다.
+
+환경변수:
+  GOSI_DB_DIR  로컬 DB 디렉터리 (기본: ./db)
+"""
+
+import os
+import sqlite3
+from pathlib import Path
+
+DB_DIR = Path(os.environ.get("GOSI_DB_DIR", Path(__file__).parent / "db"))
+
+
+def connect(filename: str) -> sqlite3.Connection:
+    """DB_DIR/filename 연결 (WAL, Row 팩토리). 스레드 간 공유 시 호출측에서 Lock 사용.
+    filename 이 절대 경로면 DB_DIR 대신 그 경로 (저장소에 커밋하는 상태 DB 등)."""
+    DB_DIR.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(DB_DIR / filename), timeout=30, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+notice_dedupe.py
+유사 고시 판별 (제목 SimHash + OCR 텍스트 MinHash)
+
+부산시는 같은 고시를 정정/변경 고시로 dataNo 만 바꿔 다시 올리는 일이 잦다.
+처리가 끝난 고시마다 지문을 남겨 두고, 새 고시의 OCR 직후 지문을 비교해
+이미 처리한 고시와 거의 같은 고시를 찾는다.
+
+  제목  SimHash 64bit (공백 제거, 글자 2-gram) → 해밍 거리
+  본문  MinHash 64개 (공백 제거, 글자 5-gram) → Jaccard 추정
+        16밴드 × 4행 LSH 버킷으로 후보만 골라 비교 (전체 스캔 없음)
+
+판정: Jaccard ≥ TEXT_THRESHOLD 이고 제목 거리 ≤ TITLE_LOOSE.
+본문(OCR)이 없으면 후보가 없다 (제목만으로는 "광안5구역/광안6구역 …인가" 를 가를 수 없음).
+
+비슷하다는 것만으로는 아무것도 재사용하지 않는다. 변경 고시는 본문이 거의 같아도
+지도가 다시 그려져 있을 수 있다. 호스팅 이미지 재사용과 알림 생략은 첨부 PDF 의
+sha256 이 정확히 같을 때만 하고, 정정/변경 고시(is_correction)는 항상 알린다.
+
+파일: db/notice_fingerprints.sqlite (local_db.DB_DIR)
+
+Usage:
+  python notice_dedupe.py --import-txt downloaded_files/txt   # 과거 OCR 텍스트 지문 등록
+  python notice_dedupe.py --check downloaded_files/txt/고시문.txt
+"""
+
+import re
+import json
+import time
+import zlib
+import hashlib
+import argparse
+from pathlib import Path
+
+import local_db
+
+FINGERPRINT_FILE = "notice_fingerprints.sqlite"
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE = 5
+
+TEXT_THRESHOLD = 0.85   # 본문 Jaccard 추정치
+TITLE_LOOSE = 24        # 본문이 비슷할 때 허용하는 제목 해밍 거리
+
+_SPACE_RE = re.compile(r"\s+")
+_CORRECTION_RE = re.compile(r"정정|변경")
+_DATANO_RE = re.compile(r"dataNo=(\d+)")
+_PRIME = (1 << 61) - 1
+_MASK64 = (1 << 64) - 1
+
+# 순열 계수는 고정 시드로 만든다 (실행 간 지문 호환)
+_PERMS = []
+for _i in range(NUM_PERM):
+    _d = hashlib.blake2b(f"minhash-{_i}".encode(), digest_size=16).digest()
+    _PERMS.append((int.from_bytes(_d[:8], "big") % (_PRIME - 1) + 1,
+                   int.from_bytes(_d[8:], "big") % _PRIME))
+
+
+def _compact(text: str) -> str:
+    return _SPACE_RE.sub("", text or "")
+
+
+def simhash(title: str) -> int:
+    """제목 → 64bit SimHash (글자 2-gram)"""
+    s = _compact(title)
+    grams = [s[i:i + 2] for i in range(max(1, len(s) - 1))]
+    weights = [0] * 64
+    for g in grams:
+        h = int.from_bytes(hashlib.blake2b(g.encode(), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def hamming(a: int, b: int) -> int:
+    return bin((a ^ b) & _MASK64).count("1")
+
+
+def minhash(text: str) -> list[int] | None:
+    """OCR 텍스트 → MinHash 서명 (NUM_PERM 개). 너무 짧으면 None"""
+    s = _compact(text)
+    if len(s) < SHINGLE * 4:
+        return None
+    shingles = {zlib.crc32(s[i:i + SHINGLE].encode()) for i in range(len(s) - SHINGLE + 1)}
+    return [min((a * x + b) % _PRIME for x in shingles) for a, b in _PERMS]
+
+
+def is_correction(title: str) -> bool:
+    """정정/변경 고시 (내용이 같아 보여도 항상 알림)"""
+    return bool(_CORRECTION_RE.search(_compact(title)))
+
+
+def jaccard(sig_a: list[int], sig_b: list[int]) -> float:
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+
+def _bands(sig: list[int]) -> list[str]:
+    return [hashlib.blake2b(repr(sig[i * ROWS:(i + 1) * ROWS]).encode(),
+                            digest_size=8).hexdigest() for i in range(BANDS)]
+
+
+class NoticeFingerprints:
+    def __init__(self, filename: str = FINGERPRINT_FILE):
+        self.conn = local_db.connect(filename)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                key        TEXT PRIMARY KEY,
+                data_no    INTEGER,
+                title      TEXT NOT NULL,
+                zones      TEXT,
+                simhash    TEXT NOT NULL,
+                minhash    TEXT,
+                info       TEXT,
+                image_urls TEXT,
+                pdf_sha256 TEXT,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS bands (
+                band   INTEGER NOT NULL,
+                bucket TEXT NOT NULL,
+                key    TEXT NOT NULL,
+                PRIMARY KEY (band, bucket, key)
+            );
+        """)
+        cols = [r[1] for r in self.conn.execute("PRAGMA table_info(fingerprints)")]
+        if "pdf_sha256" not in cols:
+            self.conn.execute("ALTER TABLE fingerprints ADD COLUMN pdf_sha256 TEXT")
+        self.conn.commit()
+
+    def add(self, key: str, title: str, text: str = "", zones: list[str] = (),
+            info: dict = None, image_urls: list[str] = None, data_no: int = None,
+            pdf_sha256: list[str] = ()):
+        """처리 완료 고시 지문 등록/교체"""
+        sig = minhash(text)
+        with self.conn:
+            self.conn.execute("""
+                INSERT OR REPLACE INTO fingerprints
+                    (key, data_no, title, zones, simhash, minhash, info, image_urls,
+                     pdf_sha256, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (key, data_no, title, ",".join(zones), f"{simhash(title):016x}",
+                  json.dumps(sig) if sig else None,
+                  json.dumps(info or {}, ensure_ascii=False),
+                  json.dumps(image_urls or []), json.dumps(list(pdf_sha256)), time.time()))
+            self.conn.execute("DELETE FROM bands WHERE key=?", (key,))
+            if sig:
+                self.conn.executemany("INSERT INTO bands (band, bucket, key) VALUES (?, ?, ?)",
+                                      [(i, b, key) for i, b in enumerate(_bands(sig))])
+
+    def _candidates(self, sig: list[int] | None) -> list:
+        if sig is None:
+            return []
+        clauses = " OR ".join("(band=? AND bucket=?)" for _ in range(BANDS))
+        params = [v for i, b in enumerate(_bands(sig)) for v in (i, b)]
+        return self.conn.execute(f"""
+            SELECT * FROM fingerprints WHERE key IN (SELECT key FROM bands WHERE {clauses})
+        """, params).fetchall()
+
+    def find_similar(self, title: str, text: str = "", exclude: str = None) -> dict | None:
+        """가장 비슷한 기존 고시 → {key, data_no, title, title_distance, text_similarity,
+        info, image_urls, pdf_sha256}. 기준 미달이거나 본문이 없으면 None"""
+        sig = minhash(text)
+        title_hash = simhash(title)
+        best = None
+        for row in self._candidates(sig):
+            if row["key"] == exclude or not row["minhash"]:
+                continue
+            dist = hamming(title_hash, int(row["simhash"], 16))
+            sim = jaccard(sig, json.loads(row["minhash"]))
+            if sim < TEXT_THRESHOLD or dist > TITLE_LOOSE:
+                continue
+            score = (sim, -dist)
+            if best is None or score > best[0]:
+                best = (score, row, dist, sim)
+        if best is None:
+            return None
+        _, row, dist, sim = best
+        return {
+            "key": row["key"],
+            "data_no": row["data_no"],
+            "title": row["title"],
+            "title_distance": dist,
+            "text_similarity": sim,
+            "info": json.loads(row["info"] or "{}"),
+            "image_urls": json.loads(row["image_urls"] or "[]"),
+            "pdf_sha256": json.loads(row["pdf_sha256"] or "[]"),
+        }
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM fingerprints").fetchone()[0]
+
+
+def diff_info(old: dict, new: dict) -> dict:
+    """분석 결과(analyze_text) 필드 차이 → {필드: (이전, 이후)}"""
+    return {k: (old.get(k), new.get(k)) for k in sorted(set(old) | set(new))
+            if old.get(k) != new.get(k)}
+
+
+def notice_key(url: str) -> tuple[str, int | None]:
+    """URL → (지문 key, dataNo)"""
+    m = _DATANO_RE.search(url or "")
+    data_no = int(m.group(1)) if m else None
+    return (f"dataNo:{data_no}" if data_no else f"url:{url}"), data_no
+
+
+_fingerprints = None
+
+
+def get_fingerprints() -> NoticeFingerprints:
+    """프로세스 공용 지문 저장소"""
+    global _fingerprints
+    if _fingerprints is None:
+        _fingerprints = NoticeFingerprints()
+    return _fingerprints
+
+
+# ══════════════════════════════════════════════════════════
+# 메인
+# ══════════════════════════════════════════════════════════
+
+def _txt_title(path: Path) -> str:
+    date, _, title = path.stem.partition("_")
+    return title if date.isdigit() and len(date) == 8 else path.stem
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--import-txt", default=None, help="OCR 텍스트 폴더 지문 일괄 등록")
+    parser.add_argument("--check", nargs="*", default=[], help="유사 고시 확인할 txt 파일")
+    args = parser.parse_args()
+
+    from title_classifier import get_classifier
+    fps = get_fingerprints()
+    if args.import_txt:
+        n = 0
+        for path in sorted(Path(args.import_txt).glob("*.txt")):
+            title = _txt_title(path)
+            fps.add(f"txt:{path.name}", title, path.read_text(encoding="utf-8", errors="ignore"),
+                    get_classifier().classify(title)["zones"])
+            n += 1
+        print(f"지문 등록: {n}건 (전체 {len(fps)}건)")
+
+    for src in args.check:
+        path = Path(src)
+        title = _txt_title(path)
+        t0 = time.perf_counter()
+        match = fps.find_similar(title, path.read_text(encoding="utf-8", errors="ignore"),
+                                 exclude=f"txt:{path.name}")
+        ms = (time.perf_counter() - t0) * 1000
+        if match:
+            print(f"  ≈ {title[:40]}  →  {match['title'][:40]}  "
+                  f"(본문 {match['text_similarity']:.2f}, 제목 거리 {match['title_distance']}, "
+                  f"{ms:.1f}ms)")
+        else:
+            print(f"  - {title[:40]}  (유사 고시 없음, {ms:.1f}ms)")
+
+
+if __name__ == "__main__":
+    main()
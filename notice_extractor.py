@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+notice_extractor.py
+고시문 OCR 텍스트 → 구조화 필드 (타입 있는 값 + 신뢰도)
+
+공백 정리는 한 번만 하고, 패턴은 모두 모듈 로드 시 컴파일해 둔다.
+필드별 검색은 리터럴 게이트("구", "번지", "㎡", "세대수", "지상")로 해당 글자가 없는
+텍스트에서는 건너뛰고, 3·4단계가 같이 쓰는 "부산 ○○구" 는 한 번만 찾는다.
+우선순위와 결과 문자열은 기존 analyze_text 와 같다:
+  위치  1) "위치" 라벨 뒤 80자 안의 주소   2) 본문 주소 (부산 포함 → 구 동 번지)
+        3) 부산 ○○구 + ○○동 N번지 조합   4) 제목의 ○○동 + 본문 구/번지
+  면적 / 세대수 / 동수 / 층수  — 첫 번째 값
+
+결과: {필드: {"value": 타입 값, "text": 표시 문자열, "confidence": 0~1, "source": 근거}}
+  type   str     "재개발" / "재건축"
+  위치   dict    {"gu", "dong", "benji"} (없는 항목은 None)
+  면적   float   ㎡
+  세대수 int
+  동수   int
+  층수   dict    {"below", "above"}
+
+busan_blog_최종__1_.analyze_text() 는 이 결과의 "text" 만 남기는 래퍼.
+
+Usage:
+  python notice_extractor.py downloaded_files/txt/고시문.txt [--title "…"]
+"""
+
+import re
+import json
+import argparse
+from pathlib import Path
+
+_SPACE_RE = re.compile(r"\s+")
+
+_ADDR = r"([가-힣]+구)\s+([가-힣]+동)\s+(\d+(?:-\d+)?)(?:\s*번지)?(?:\s*일원)?"
+FULL_ADDR_RE = re.compile(r"부산(?:광역시)?\s*" + _ADDR)
+ADDR_RE = re.compile(_ADDR)
+LABEL_RE = re.compile(r"위\s*치[:\s]*(.{5,80})")
+BUSAN_GU_RE = re.compile(r"부산(?:광역시)?\s*([가-힣]+구)")
+DONG_BENJI_RE = re.compile(r"([가-힣]+동)\s+(\d+(?:-\d+)?)\s*번지")
+TITLE_DONG_RE = re.compile(r"([가-힣]+동)")
+BENJI_RE = re.compile(r"(\d+(?:-\d+)?)\s*번지")
+
+AREA_RE = re.compile(r"(?:구역)?면적[:\s]*([0-9,]+\.?\d*)\s*㎡")
+HOUSE_RE = re.compile(r"(?:총\s*)?세대수[:\s]*([0-9,]+)")
+DONG_COUNT_RE = re.compile(r"([0-9]+)\s*(개?)\s*동")
+# 층수는 원문 한 줄 안에서 "지하 N … 지상 M" (마지막 지상 값)
+FLOOR_RE = re.compile(r"지하\s*(\d+).*지상\s*(\d+)")
+
+# 주소 근거별 신뢰도
+LOCATION_CONFIDENCE = {
+    "위치 필드": 0.95,
+    "본문": 0.8,
+    "조합": 0.6,
+    "제목+본문": 0.4,
+}
+
+
+def _to_number(s: str, cast=float):
+    try:
+        return cast(s.replace(",", ""))
+    except ValueError:
+        return None
+
+
+def _address(m) -> dict:
+    """주소 match (전체, 구, 동, 번지) → dict"""
+    return {"gu": m.group(1), "dong": m.group(2), "benji": m.group(3),
+            "text": _SPACE_RE.sub(" ", m.group(0)).strip()}
+
+
+def _location(clean: str, title: str) -> tuple[dict, str] | None:
+    """(주소 dict, 근거) — analyze_text 의 4단계 우선순위"""
+    has_gu = "구" in clean
+    label = LABEL_RE.search(clean) if "치" in clean else None
+    if label and has_gu:
+        for pattern in (FULL_ADDR_RE, ADDR_RE):
+            m = pattern.search(label.group(1))
+            if m:
+                return _address(m), "위치 필드"
+
+    if has_gu:
+        for pattern in (FULL_ADDR_RE, ADDR_RE):
+            m = pattern.search(clean)
+            if m:
+                return _address(m), "본문"
+
+    # 3·4단계가 같이 쓰는 구는 한 번만 찾는다
+    gu_m = BUSAN_GU_RE.search(clean) if has_gu and "부산" in clean else None
+    gu = gu_m.group(1) if gu_m else None
+    has_benji = "번지" in clean
+    db = DONG_BENJI_RE.search(clean) if has_benji else None
+    if db:
+        dong, benji = db.group(1), db.group(2)
+        text = f"부산 {gu} {dong} {benji}번지" if gu else f"부산 {dong} {benji}번지"
+        return {"gu": gu, "dong": dong, "benji": benji, "text": text}, "조합"
+
+    m = TITLE_DONG_RE.search(title)
+    if m:
+        dong, benji = m.group(1), None
+        idx = clean.find(dong)
+        if idx != -1 and has_benji:
+            bm = BENJI_RE.search(clean, max(0, idx - 50), idx + 100)
+            benji = bm.group(1) if bm else None
+        if gu and benji:
+            text = f"부산 {gu} {dong} {benji}번지"
+        elif gu:
+            text = f"부산 {gu} {dong}"
+        else:
+            text = f"부산 {dong}"
+        return {"gu": gu, "dong": dong, "benji": benji if gu else None, "text": text}, "제목+본문"
+    return None
+
+
+def extract(text: str, title: str) -> dict:
+    """OCR 텍스트 + 제목 → {필드: {"value", "text", "confidence", "source"}}"""
+    text = text or ""
+    title = title or ""
+    clean = _SPACE_RE.sub(" ", text)
+    fields = {}
+
+    kind = "재건축" if "재건축" in title else "재개발"
+    fields["type"] = {"value": kind, "text": kind,
+                      "confidence": 0.9 if kind in title else 0.5, "source": "제목"}
+
+    loc = _location(clean, title)
+    if loc:
+        addr, source = loc
+        conf = LOCATION_CONFIDENCE[source]
+        if source == "제목+본문":
+            conf -= 0.1 * ((addr["gu"] is None) + (addr["benji"] is None))
+        fields["위치"] = {"value": {k: addr[k] for k in ("gu", "dong", "benji")},
+                          "text": addr["text"], "confidence": round(conf, 2), "source": source}
+
+    m = AREA_RE.search(clean) if "㎡" in clean else None
+    if m:
+        fields["면적"] = {"value": _to_number(m.group(1)), "text": f"{m.group(1)}㎡",
+                          "confidence": 0.9 if m.group(0).startswith("구역") else 0.75,
+                          "source": "면적"}
+    m = HOUSE_RE.search(clean) if "세대수" in clean else None
+    if m:
+        fields["세대수"] = {"value": _to_number(m.group(1), int), "text": f"{m.group(1)}세대",
+                            "confidence": 0.85, "source": "세대수"}
+    m = DONG_COUNT_RE.search(clean)
+    if m:
+        fields["동수"] = {"value": int(m.group(1)), "text": f"{m.group(1)}개동",
+                          "confidence": 0.7 if m.group(2) else 0.4, "source": "동수"}
+    m = FLOOR_RE.search(text) if "지상" in text else None
+    if m:
+        fields["층수"] = {"value": {"below": int(m.group(1)), "above": int(m.group(2))},
+                          "text": f"지하{m.group(1)}~지상{m.group(2)}층",
+                          "confidence": 0.8, "source": "층수"}
+    return fields
+
+
+# ══════════════════════════════════════════════════════════
+# 메인
+# ══════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("txt", help="OCR 텍스트 파일")
+    parser.add_argument("--title", default=None, help="고시 제목 (기본: 파일명)")
+    args = parser.parse_args()
+
+    path = Path(args.txt)
+    fields = extract(path.read_text(encoding="utf-8", errors="ignore"), args.title or path.stem)
+    print(json.dumps(fields, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+notice_ledger.py
+고시별 처리 단계 장부 (중간 실패 후 재실행 시 끝난 단계는 건너뜀)
+
+process_new_gosi 는 마지막까지 성공해야만 상태에 "처리됨" 을 남겨서, 업로드나 전송에서
+실패하면 다음 실행이 상세 조회 · 다운로드 · OCR 부터 다시 했다.
+단계가 끝날 때마다 결과물(파일 경로 / 텍스트 / 분석 결과 / URL)을 고시 id 별로 적어 두고
+재실행 때는 결과물이 아직 유효한 단계를 그대로 쓴다.
+
+  detail    상세 페이지 (title, attachments)
+  download  PDF 경로 목록                  (파일이 모두 있어야 유효)
+  ocr       OCR 텍스트
+  analyze   분석 결과 info
+  render    페이지 이미지 경로 목록        (파일이 모두 있어야 유효)
+  upload    업로드 대상 경로 / 호스팅 URL
+  queued    알림 outbox 등록 (중복 고시로 생략한 경우 포함)
+  sent      카카오 전송 완료
+
+파일: db/notice_ledger.sqlite (local_db.DB_DIR)
+
+Usage:
+  python notice_ledger.py              # 미완료 고시와 멈춘 단계
+  python notice_ledger.py 5123         # 고시 하나의 단계별 기록
+"""
+
+import json
+import time
+import argparse
+from pathlib import Path
+
+import local_db
+
+LEDGER_FILE = "notice_ledger.sqlite"
+
+STAGES = ["detail", "download", "ocr", "analyze", "render", "upload", "queued", "sent"]
+
+# 결과물 중 파일 경로 목록 (재사용 전 존재 확인)
+_PATH_KEYS = {"download": "pdfs", "render": "images"}
+
+
+class NoticeLedger:
+    def __init__(self, filename: str = LEDGER_FILE):
+        self.conn = local_db.connect(filename)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS stages (
+                notice_id TEXT NOT NULL,
+                stage     TEXT NOT NULL,
+                artifact  TEXT,
+                done_at   REAL NOT NULL,
+                PRIMARY KEY (notice_id, stage)
+            )""")
+        self.conn.commit()
+
+    def done(self, notice_id: str, stage: str, artifact=None):
+        """단계 완료 기록 (결과물은 JSON 으로 저장)"""
+        if stage not in STAGES:
+            raise ValueError(f"알 수 없는 단계: {stage}")
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO stages (notice_id, stage, artifact, done_at) VALUES (?, ?, ?, ?)",
+                (str(notice_id), stage, json.dumps(artifact, ensure_ascii=False, default=str),
+                 time.time()))
+
+    def get(self, notice_id: str, stage: str):
+        """완료된 단계의 결과물 (없거나 파일이 사라졌으면 None)"""
+        row = self.conn.execute("SELECT artifact FROM stages WHERE notice_id=? AND stage=?",
+                                (str(notice_id), stage)).fetchone()
+        if row is None:
+            return None
+        artifact = json.loads(row[0])
+        key = _PATH_KEYS.get(stage)
+        if key and not all(Path(p).exists() for p in (artifact or {}).get(key, [])):
+            return None
+        return artifact
+
+    def stages(self, notice_id: str) -> dict:
+        rows = self.conn.execute("SELECT stage, artifact, done_at FROM stages WHERE notice_id=?",
+                                 (str(notice_id),)).fetchall()
+        return {r["stage"]: {"artifact": json.loads(r["artifact"]), "done_at": r["done_at"]}
+                for r in rows}
+
+    def resume_point(self, notice_id: str) -> str | None:
+        """처음으로 끝나지 않은 (또는 결과물 파일이 사라진) 단계. 모두 끝났으면 None"""
+        done = self.stages(notice_id)
+        return next((s for s in STAGES if s not in done or self.get(notice_id, s) is None), None)
+
+    def incomplete(self) -> list[tuple[str, str]]:
+        """기록은 있지만 전송까지 끝나지 않은 고시 [(id, 멈춘 단계)]"""
+        ids = [r[0] for r in self.conn.execute(
+            "SELECT notice_id FROM stages GROUP BY notice_id "
+            "HAVING SUM(stage = 'sent') = 0 ORDER BY MIN(done_at)")]
+        return [(i, self.resume_point(i)) for i in ids]
+
+    def forget(self, notice_id: str, from_stage: str = None):
+        """기록 삭제 (from_stage 이후 단계만 지우면 그 단계부터 다시 처리)"""
+        stages = STAGES[STAGES.index(from_stage):] if from_stage else STAGES
+        with self.conn:
+            self.conn.executemany("DELETE FROM stages WHERE notice_id=? AND stage=?",
+                                  [(str(notice_id), s) for s in stages])
+
+
+_ledger = None
+
+
+def get_ledger() -> NoticeLedger:
+    """프로세스 공용 단계 장부"""
+    global _ledger
+    if _ledger is None:
+        _ledger = NoticeLedger()
+    return _ledger
+
+
+# ══════════════════════════════════════════════════════════
+# 메인
+# ══════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("notice_id", nargs="?", help="고시 id (dataNo)")
+    parser.add_argument("--redo", default=None, choices=STAGES,
+                        help="이 단계부터 기록을 지워 다시 처리")
+    args = parser.parse_args()
+
+    ledger = get_ledger()
+    if not args.notice_id:
+        rows = ledger.incomplete()
+        for notice_id, stage in rows:
+            print(f"  {notice_id:>10}  → {stage}")
+        print(f"\n미완료 {len(rows)}건")
+        return
+
+    if args.redo:
+        ledger.forget(args.notice_id, args.redo)
+        print(f"{args.notice_id}: {args.redo} 단계부터 다시 처리")
+    done = ledger.stages(args.notice_id)
+    for stage in STAGES:
+        if stage in done:
+            at = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(done[stage]["done_at"]))
+            summary = json.dumps(done[stage]["artifact"], ensure_ascii=False)
+            print(f"  ✅ {stage:<9} {at}  {summary[:80]}")
+        else:
+            print(f"  ·  {stage}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+notice_records.py
+고시 레코드 (NoticeRecord) → 월별 파티션 Parquet 데이터셋
+
+analyze_text 의 표시 문자열("1,234㎡", "500세대"), download_manifest.csv, Supabase 단계로
+흩어져 있던 정보를 타입 있는 레코드 하나로 모아 월 단위 파티션에 추가한다.
+
+  {OUT_DIR}/notices/month=2024-05/part-<시각>-<uuid>.parquet
+
+pyarrow 가 없으면 같은 위치에 part-<시각>-<uuid>.jsonl 로 남긴다 (pip install pyarrow).
+
+재실행하면 같은 dataNo 레코드가 다시 추가되므로 읽을 때 dataNo 별로 recorded_at 이
+가장 늦은 레코드만 남긴다. 파티션의 파일이 COMPACT_PARTS 개를 넘으면 중복을 걷어 낸
+파일 하나로 다시 쓴다 (고시 한 건마다 작은 파일이 쌓이지 않도록).
+
+Usage:
+  python notice_records.py                      # 월별 건수
+  python notice_records.py --month 2024-05      # 해당 월 레코드 출력
+  python notice_records.py --compact            # 모든 월 파티션 정리
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import hashlib
+import argparse
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+
+DATASET_DIR = Path(os.getcwd()) / "downloaded_files" / "notices"
+COMPACT_PARTS = 32      # 파티션 파일이 이보다 많으면 한 파일로 정리
+
+_DATANO_RE = re.compile(r"dataNo=(\d+)")
+
+
+@dataclass
+class NoticeRecord:
+    data_no: int | None
+    date: str                       # YYYY-MM-DD (처리일)
+    url: str
+    title: str
+    stage: str | None = None
+    is_designation: bool = False
+    zones: list[str] = field(default_factory=list)
+    type: str | None = None
+    location: str | None = None
+    gu: str | None = None
+    dong: str | None = None
+    benji: str | None = None
+    area_m2: float | None = None
+    households: int | None = None
+    buildings: int | None = None
+    floors_below: int | None = None
+    floors_above: int | None = None
+    attachment_names: list[str] = field(default_factory=list)
+    attachment_sha256: list[str] = field(default_factory=list)
+    html: str | None = None
+    recorded_at: float = field(default_factory=time.time)   # 같은 dataNo 중 최신 판별
+
+    @property
+    def month(self) -> str:
+        return self.date[:7]
+
+    @classmethod
+    def build(cls, url: str, title: str, text: str = "", attachments: list[str] = (),
+              html: str = None, date: str = None) -> "NoticeRecord":
+        """제목 분류 + OCR 텍스트 추출 + 첨부 해시 → 레코드"""
+        from notice_extractor import extract
+        from title_classifier import get_classifier
+
+        m = _DATANO_RE.search(url or "")
+        cls_ = get_classifier().classify(title)
+        fields = extract(text, title)
+        loc = fields.get("위치", {})
+        addr = loc.get("value") or {}
+        floors = fields.get("층수", {}).get("value") or {}
+        return cls(
+            data_no=int(m.group(1)) if m else None,
+            date=date or datetime.now().strftime("%Y-%m-%d"),
+            url=url,
+            title=title,
+            stage=cls_["stage"],
+            is_designation=cls_["is_designation"],
+            zones=cls_["zones"],
+            type=fields["type"]["value"],
+            location=loc.get("text"),
+            gu=addr.get("gu"),
+            dong=addr.get("dong"),
+            benji=addr.get("benji"),
+            area_m2=fields.get("면적", {}).get("value"),
+            households=fields.get("세대수", {}).get("value"),
+            buildings=fields.get("동수", {}).get("value"),
+            floors_below=floors.get("below"),
+            floors_above=floors.get("above"),
+            attachment_names=[Path(p).name for p in attachments],
+            attachment_sha256=[file_sha256(p) for p in attachments],
+            html=html,
+        )
+
+
+def file_sha256(path: str) -> str:
+    """파일 내용 sha256 (1MB 단위로 읽음). 첨부 해시 · 업로드 캐시 · 유사 고시 판별 공용"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _schema(pa):
+    return pa.schema([
+        ("data_no", pa.int64()), ("date", pa.string()), ("url", pa.string()),
+        ("title", pa.string()), ("stage", pa.string()), ("is_designation", pa.bool_()),
+        ("zones", pa.list_(pa.string())), ("type", pa.string()), ("location", pa.string()),
+        ("gu", pa.string()), ("dong", pa.string()), ("benji", pa.string()),
+        ("area_m2", pa.float64()), ("households", pa.int64()), ("buildings", pa.int64()),
+        ("floors_below", pa.int64()), ("floors_above", pa.int64()),
+        ("attachment_names", pa.list_(pa.string())),
+        ("attachment_sha256", pa.list_(pa.string())), ("html", pa.string()),
+        ("recorded_at", pa.float64()),
+    ])
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        return None
+
+
+def _part_name(suffix: str) -> str:
+    """같은 초에 여러 번 써도 겹치지 않는 파일 이름 (시각 순으로 정렬됨)"""
+    return f"part-{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:12]}{suffix}"
+
+
+def _write_part(part: Path, rows: list[dict], pa) -> Path:
+    if pa:
+        path = part / _part_name(".parquet")
+        pa.parquet.write_table(pa.Table.from_pylist(rows, schema=_schema(pa)), path)
+    else:
+        path = part / _part_name(".jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    return path
+
+
+def append_records(records: list[NoticeRecord], root: Path = DATASET_DIR) -> list[Path]:
+    """월별 파티션에 새 파일로 추가 (기존 파일은 건드리지 않음). 반환: 쓴 파일 목록"""
+    by_month = {}
+    for r in records:
+        by_month.setdefault(r.month, []).append(asdict(r))
+
+    pa = _pyarrow()
+    if not pa:
+        print("    ⚠️  pyarrow 미설치 → JSONL 로 저장 (pip install pyarrow)")
+    written = []
+    for month, rows in by_month.items():
+        part = Path(root) / f"month={month}"
+        part.mkdir(parents=True, exist_ok=True)
+        written.append(_write_part(part, rows, pa))
+        if len(list(part.glob("part-*"))) > COMPACT_PARTS:
+            compact_month(month, root)
+    return written
+
+
+def record_notice(url: str, title: str, text: str = "", attachments: list[str] = (),
+                  html: str = None, root: Path = DATASET_DIR) -> NoticeRecord | None:
+    """레코드 생성 + 추가 (수집 파이프라인용, 실패해도 예외를 올리지 않음)"""
+    try:
+        record = NoticeRecord.build(url, title, text, attachments, html)
+        append_records([record], root)
+        return record
+    except Exception as e:
+        print(f"    ⚠️ 고시 레코드 저장 실패: {e}")
+        return None
+
+
+def _read_parts(paths: list[Path], pa) -> list[dict]:
+    rows = []
+    for path in paths:
+        if path.suffix == ".parquet" and pa:
+            rows.extend(pa.parquet.read_table(path).to_pylist())
+        elif path.suffix == ".jsonl":
+            with open(path, encoding="utf-8") as f:
+                rows.extend(json.loads(line) for line in f if line.strip())
+    return rows
+
+
+def _latest(rows: list[dict]) -> list[dict]:
+    """dataNo (없으면 URL) 별로 recorded_at 이 가장 늦은 레코드만. 같으면 나중 파일 우선"""
+    latest = {}
+    for row in rows:
+        key = row.get("data_no") or row.get("url")
+        kept = latest.get(key)
+        if kept is None or (row.get("recorded_at") or 0) >= (kept.get("recorded_at") or 0):
+            latest[key] = row
+    return list(latest.values())
+
+
+def read_month(month: str, root: Path = DATASET_DIR) -> list[dict]:
+    """월 파티션 레코드 (dataNo 별 최신만)"""
+    part = Path(root) / f"month={month}"
+    return _latest(_read_parts(sorted(part.glob("part-*")), _pyarrow()))
+
+
+def compact_month(month: str, root: Path = DATASET_DIR) -> int:
+    """월 파티션을 중복 없는 파일 하나로 다시 쓰기. 반환: 남은 레코드 수"""
+    part = Path(root) / f"month={month}"
+    pa = _pyarrow()
+    paths = sorted(part.glob("part-*"))
+    if not pa:
+        # parquet 파일은 pyarrow 없이 읽을 수 없으므로 JSONL 만 정리
+        paths = [p for p in paths if p.suffix == ".jsonl"]
+    if len(paths) <= 1:
+        return len(_latest(_read_parts(paths, pa)))
+    rows = _latest(_read_parts(paths, pa))
+    rows.sort(key=lambda r: (r.get("recorded_at") or 0, r.get("data_no") or 0))
+    _write_part(part, rows, pa)
+    for path in paths:
+        path.unlink()
+    return len(rows)
+
+
+# ══════════════════════════════════════════════════════════
+# 메인
+# ══════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--root", default=str(DATASET_DIR), help="데이터셋 폴더")
+    parser.add_argument("--month", default=None, help="YYYY-MM 레코드 출력")
+    parser.add_argument("--compact", action="store_true", help="월 파티션마다 파일 하나로 정리")
+    args = parser.parse_args()
+
+    root = Path(args.root)
+    if args.compact:
+        for part in sorted(root.glob("month=*")):
+            n = compact_month(part.name.split("=", 1)[1], root)
+            print(f"  {part.name}: {n}건 → {len(list(part.glob('part-*')))}개 파일")
+        return
+    if args.month:
+        for row in read_month(args.month, root):
+            print(f"  {row['data_no']}  {row['stage'] or '-'}  {row['zones']}  {row['title'][:50]}")
+        return
+    for part in sorted(root.glob("month=*")):
+        n = len(read_month(part.name.split("=", 1)[1], root))
+        print(f"  {part.name}: {n}건")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+notice_search.py
+고시문 전문 검색 (SQLite FTS5 trigram)
+
+고시 제목 / 구역명 / OCR 텍스트를 FTS5 trigram 토크나이저로 색인한다.
+한국어는 형태소 분석 없이 3글자 n-gram 으로 부분 문자열 검색이 된다
+("사직4" → "사직4구역", "사직4재개발" 모두 일치).
+2글자 이하 검색어는 trigram 이 없으므로 LIKE 로 대신 찾는다 (전체 스캔).
+
+색인은 수집 파이프라인(run_once / process_new_gosi)이 OCR 직후, gosi_to_stage 가
+제목 분류 직후 index_notice() 로 한 건씩 추가하고 (dataNo 기준 교체),
+기존 downloaded_files/txt 는 --import-txt 로 한 번에 가져온다. txt 파일은 옆의
+notices/ 데이터셋(notice_records)에서 같은 이름의 HTML 레코드로 dataNo 를 찾아 같은
+dataNo 키로 넣고, 못 찾은 파일은 같은 제목이 이미 색인돼 있으면 건너뛴다
+(같은 고시가 두 번 검색되지 않도록).
+
+파일: db/notice_search.sqlite (local_db.DB_DIR)
+
+Usage:
+  python notice_search.py 사직4
+  python notice_search.py "관리처분 인가" --limit 50
+  python notice_search.py --import-txt downloaded_files/txt
+"""
+
+import re
+import time
+import argparse
+from pathlib import Path
+
+import local_db
+
+SEARCH_FILE = "notice_search.sqlite"
+SNIPPET_TOKENS = 16
+
+_DATANO_RE = re.compile(r"dataNo=(\d+)")
+
+
+class NoticeSearch:
+    def __init__(self, filename: str = SEARCH_FILE):
+        self.conn = local_db.connect(filename)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS docs (
+                id         INTEGER PRIMARY KEY,
+                key        TEXT NOT NULL UNIQUE,
+                data_no    INTEGER,
+                url        TEXT,
+                title      TEXT NOT NULL,
+                zones      TEXT,
+                indexed_at REAL NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts
+                USING fts5(title, zones, body, tokenize='trigram');
+        """)
+        self.conn.commit()
+
+    def add(self, key: str, title: str, body: str = "", zones: list[str] = (),
+            url: str = None, data_no: int = None) -> int:
+        """문서 추가/교체 (key 기준). body 가 비어 있으면 기존 본문 유지
+        (제목만 아는 단계 갱신 경로가 OCR 본문을 지우지 않도록). 반환: 문서 id"""
+        zones_text = ",".join(zones)
+        if not body:
+            row = self.conn.execute("""
+                SELECT f.body FROM docs d JOIN docs_fts f ON f.rowid = d.id WHERE d.key=?
+            """, (key,)).fetchone()
+            body = row[0] if row else ""
+        with self.conn:
+            self.conn.execute("""
+                INSERT INTO docs (key, data_no, url, title, zones, indexed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    data_no=excluded.data_no, url=excluded.url, title=excluded.title,
+                    zones=excluded.zones, indexed_at=excluded.indexed_at
+            """, (key, data_no, url, title, zones_text, time.time()))
+            doc_id = self.conn.execute("SELECT id FROM docs WHERE key=?", (key,)).fetchone()[0]
+            self.conn.execute("DELETE FROM docs_fts WHERE rowid=?", (doc_id,))
+            self.conn.execute("INSERT INTO docs_fts (rowid, title, zones, body) VALUES (?, ?, ?, ?)",
+                              (doc_id, title, zones_text, body))
+            if data_no:
+                # 같은 고시를 --import-txt 가 파일명 키로 먼저 넣어 둔 경우 정리
+                for (old_id,) in self.conn.execute(
+                        "SELECT id FROM docs WHERE key LIKE 'txt:%' AND title=?", (title,)).fetchall():
+                    self.conn.execute("DELETE FROM docs_fts WHERE rowid=?", (old_id,))
+                    self.conn.execute("DELETE FROM docs WHERE id=?", (old_id,))
+        return doc_id
+
+    def search(self, query: str, limit: int = 20) -> list[dict]:
+        """검색어(공백 구분, 모두 포함) → [{data_no, title, zones, url, snippet}]"""
+        terms = [t for t in query.split() if t]
+        if not terms:
+            return []
+        long_terms = [t for t in terms if len(t) >= 3]
+        short_terms = [t for t in terms if len(t) < 3]
+
+        where, params = [], []
+        if long_terms:
+            where.append("docs_fts MATCH ?")
+            params.append(" AND ".join('"' + t.replace('"', '""') + '"' for t in long_terms))
+        for t in short_terms:
+            where.append("(docs_fts.title LIKE ? OR docs_fts.zones LIKE ? OR docs_fts.body LIKE ?)")
+            params.extend([f"%{t}%"] * 3)
+        order = "ORDER BY rank" if long_terms else "ORDER BY d.id DESC"
+        rows = self.conn.execute(f"""
+            SELECT d.data_no, d.title, d.zones, d.url,
+                   snippet(docs_fts, -1, '[', ']', '…', {SNIPPET_TOKENS}) AS snippet
+            FROM docs_fts JOIN docs d ON d.id = docs_fts.rowid
+            WHERE {" AND ".join(where)}
+            {order} LIMIT ?
+        """, (*params, limit)).fetchall()
+        return [dict(r) for r in rows]
+
+    def remove(self, key: str):
+        """문서 삭제 (없으면 무시)"""
+        with self.conn:
+            row = self.conn.execute("SELECT id FROM docs WHERE key=?", (key,)).fetchone()
+            if row:
+                self.conn.execute("DELETE FROM docs_fts WHERE rowid=?", (row[0],))
+                self.conn.execute("DELETE FROM docs WHERE id=?", (row[0],))
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def import_txt(self, txt_dir: Path) -> int:
+        """downloaded_files/txt/{YYYYMMDD}_{제목}.txt 일괄 색인.
+        dataNo 를 찾으면 key = dataNo:N (수집 파이프라인과 같은 문서), 못 찾으면
+        같은 제목이 이미 색인돼 있을 때 건너뛰고 아니면 key = txt:파일명. 반환: 색인 건수"""
+        from title_classifier import get_classifier
+        records = _txt_records(Path(txt_dir).parent / "notices")
+        indexed = {r[0] for r in self.conn.execute(
+            "SELECT title FROM docs WHERE data_no IS NOT NULL")}
+        n = 0
+        for path in sorted(Path(txt_dir).glob("*.txt")):
+            date, _, title = path.stem.partition("_")
+            if not (date.isdigit() and len(date) == 8):
+                title = path.stem
+            rec = records.get(path.name)
+            if rec is None and title in indexed:
+                continue
+            body = path.read_text(encoding="utf-8", errors="ignore")
+            zones = get_classifier().classify(title)["zones"]
+            if rec is None:
+                self.add(f"txt:{path.name}", title, body, zones)
+            else:
+                self.remove(f"txt:{path.name}")     # 이전 --import-txt 가 남긴 문서
+                self.add(f"dataNo:{rec['data_no']}", rec["title"] or title, body, zones,
+                         url=rec["url"], data_no=rec["data_no"])
+            n += 1
+        return n
+
+
+def _txt_records(root: Path) -> dict[str, dict]:
+    """notice_records 데이터셋 → {txt 파일명: 레코드}.
+    run_once 는 txt 와 HTML 을 같은 {날짜}_{제목} 이름으로 저장하므로 레코드의 html 로 찾는다"""
+    from notice_records import read_month
+    found = {}
+    for part in sorted(Path(root).glob("month=*")):
+        for row in read_month(part.name.split("=", 1)[1], root):
+            if row.get("html") and row.get("data_no"):
+                found[Path(row["html"]).with_suffix(".txt").name] = row
+    return found
+
+
+_index = None
+
+
+def get_index() -> NoticeSearch:
+    """프로세스 공용 색인"""
+    global _index
+    if _index is None:
+        _index = NoticeSearch()
+    return _index
+
+
+def index_notice(url: str, title: str, text: str = "", zones: list[str] = None):
+    """수집 파이프라인용 색인 추가 (dataNo 기준, 실패해도 예외를 올리지 않음)"""
+    try:
+        m = _DATANO_RE.search(url or "")
+        data_no = int(m.group(1)) if m else None
+        if zones is None:
+            from title_classifier import get_classifier
+            zones = get_classifier().classify(title)["zones"]
+        key = f"dataNo:{data_no}" if data_no else f"url:{url}"
+        get_index().add(key, title, text, zones, url=url, data_no=data_no)
+    except Exception as e:
+        print(f"    ⚠️ 검색 색인 실패: {e}")
+
+
+# ══════════════════════════════════════════════════════════
+# 메인
+# ══════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("query", nargs="*", help="검색어 (공백 구분, 모두 포함)")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--import-txt", default=None, help="OCR 텍스트 폴더 일괄 색인")
+    args = parser.parse_args()
+
+    index = get_index()
+    if args.import_txt:
+        n = index.import_txt(Path(args.import_txt))
+        print(f"색인: {n}건 추가 (전체 {len(index)}건)")
+    if not args.query:
+        return
+
+    t0 = time.perf_counter()
+    rows = index.search(" ".join(args.query), args.limit)
+    ms = (time.perf_counter() - t0) * 1000
+    for r in rows:
+        print(f"  {r['data_no'] or '-':>8}  {r['title'][:50]}  [{r['zones'] or '-'}]")
+        print(f"            {r['snippet']}")
+    print(f"\n{len(rows)}건 ({ms:.1f}ms, 전체 {len(index)}건)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+notify_outbox.py
+카카오 알림 outbox (처리 단계와 전송 단계 분리)
+
+process_new_gosi 는 다운로드 → OCR → 분석 → 이미지 업로드까지만 하고 알림 한 건을
+outbox 에 적은 뒤 성공으로 끝난다. 전송은 별도 단계(dispatch)가 맡아 실패하면
+지수 백오프로 다음 전송 시점까지 미뤄 둔다.
+카카오/imgbb 가 잠깐 실패해도 고시를 다시 다운로드·렌더링·OCR 하지 않고 전송만 재시도한다.
+
+  알림 한 건 = {notice_id, post_data(title/url), info, image_urls, image_paths}
+  image_urls 가 비어 있고 image_paths 가 있으면 (업로드 실패) 전송 단계에서 다시 올려 보고,
+  UPLOAD_ATTEMPTS 번 실패하면 이미지 없이 보낸다.
+
+notice_id 는 고유 (같은 고시를 다시 적어도 중복 알림 없음). 보낸 알림은 sent_at 을 채워 남겨 둔다.
+
+파일: db/notify_outbox.sqlite (local_db.DB_DIR)
+
+Usage:
+  python notify_outbox.py              # 대기 / 실패 현황
+"""
+
+import json
+import time
+import argparse
+import threading
+
+import local_db
+
+NOTIFY_FILE = "notify_outbox.sqlite"
+BACKOFF_BASE = 30          # 30초, 60초, 120초 …
+MAX_BACKOFF = 6 * 3600     # 재시도 간격 상한
+UPLOAD_ATTEMPTS = 3        # 이미지 재업로드 시도 후에는 이미지 없이 전송
+
+
+class NotificationOutbox:
+    def __init__(self, filename: str = NOTIFY_FILE):
+        self._lock = threading.Lock()
+        self.conn = local_db.connect(filename)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS notifications (
+                id           INTEGER PRIMARY KEY AUTOINCREMENT,
+                notice_id    TEXT NOT NULL UNIQUE,
+                payload      TEXT NOT NULL,
+                attempts     INTEGER NOT NULL DEFAULT 0,
+                next_attempt REAL NOT NULL DEFAULT 0,
+                last_error   TEXT,
+                created_at   REAL NOT NULL,
+                sent_at      REAL
+            )""")
+        self.conn.commit()
+
+    def enqueue(self, notice_id: str, post_data: dict, info: dict,
+                image_urls: list[str] = (), image_paths: list[str] = ()) -> bool:
+        """알림 추가. 이미 있는 notice_id 면 무시. 반환: 새로 추가됐는지"""
+        payload = {
+            "post_data": {"title": post_data["title"], "url": post_data["url"]},
+            "info": info,
+            "image_urls": list(image_urls),
+            "image_paths": list(image_paths),
+        }
+        with self._lock:
+            cur = self.conn.execute(
+                "INSERT OR IGNORE INTO notifications (notice_id, payload, created_at) VALUES (?, ?, ?)",
+                (notice_id, json.dumps(payload, ensure_ascii=False), time.time()))
+            self.conn.commit()
+            return cur.rowcount == 1
+
+    def due(self, force: bool = False) -> list[dict]:
+        """보낼 알림 (오래된 순). force=True 면 백오프 무시"""
+        sql = "SELECT * FROM notifications WHERE sent_at IS NULL"
+        params = ()
+        if not force:
+            sql += " AND next_attempt <= ?"
+            params = (time.time(),)
+        with self._lock:
+            rows = self.conn.execute(sql + " ORDER BY id", params).fetchall()
+        return [dict(r, payload=json.loads(r["payload"])) for r in rows]
+
+    def update_payload(self, row: dict):
+        with self._lock:
+            self.conn.execute("UPDATE notifications SET payload=? WHERE id=?",
+                              (json.dumps(row["payload"], ensure_ascii=False), row["id"]))
+            self.conn.commit()
+
+    def mark_sent(self, row: dict):
+        with self._lock:
+            self.conn.execute("UPDATE notifications SET sent_at=?, last_error=NULL WHERE id=?",
+                              (time.time(), row["id"]))
+            self.conn.commit()
+
+    def mark_failed(self, row: dict, error: str):
+        attempts = row["attempts"] + 1
+        delay = min(MAX_BACKOFF, BACKOFF_BASE * 2 ** (attempts - 1))
+        with self._lock:
+            self.conn.execute(
+                "UPDATE notifications SET attempts=?, next_attempt=?, last_error=? WHERE id=?",
+                (attempts, time.time() + delay, str(error)[:500], row["id"]))
+            self.conn.commit()
+        row["attempts"] = attempts
+
+    def counts(self) -> dict:
+        with self._lock:
+            row = self.conn.execute("""
+                SELECT COUNT(*) FILTER (WHERE sent_at IS NULL),
+                       COUNT(*) FILTER (WHERE sent_at IS NULL AND attempts > 0),
+                       COUNT(*) FILTER (WHERE sent_at IS NOT NULL)
+                FROM notifications
+            """).fetchone()
+        return {"pending": row[0], "retrying": row[1], "sent": row[2]}
+
+    def dispatch(self, send_one, send_many=None, many_min: int = 0, upload=None,
+                 force: bool = False, log=print, on_sent=None) -> tuple[int, int]:
+        """전송 단계. 반환: (성공, 실패)
+          send_one(post_data, info, image_urls) → bool
+          send_many([{post_data, info, image_urls}]) → [bool]   (보낼 알림이 many_min 건 이상일 때)
+          upload(image_paths) → [url | None]                     (업로드 못 한 이미지 재시도)
+          on_sent(row)                                           (전송 완료 알림마다)"""
+        rows = self.due(force)
+        if not rows:
+            return 0, 0
+
+        for row in rows:
+            p = row["payload"]
+            if p["image_urls"] or not p["image_paths"] or upload is None:
+                continue
+            if row["attempts"] >= UPLOAD_ATTEMPTS:
+                log(f"  ⚠️ 이미지 업로드 {row['attempts']}회 실패 → 이미지 없이 전송: {row['notice_id']}")
+                continue
+            try:
+                p["image_urls"] = [u for u in upload(p["image_paths"]) if u]
+            except Exception as e:
+                log(f"  ⚠️ 이미지 재업로드 오류: {e}")
+            if p["image_urls"]:
+                self.update_payload(row)
+
+        # 업로드를 다시 시도해야 하는 알림은 이번 전송에서 빼고 백오프
+        ready = []
+        for row in rows:
+            p = row["payload"]
+            if not p["image_urls"] and p["image_paths"] and upload is not None \
+                    and row["attempts"] < UPLOAD_ATTEMPTS:
+                self.mark_failed(row, "이미지 업로드 실패")
+            else:
+                ready.append(row)
+
+        items = [r["payload"] for r in ready]
+        if send_many and many_min and len(items) >= many_min:
+            try:
+                results = send_many(items)
+            except Exception as e:
+                log(f"  ❌ 묶음 전송 오류: {e}")
+                results = [False] * len(items)
+        else:
+            results = []
+            for item in items:
+                try:
+                    results.append(send_one(item["post_data"], item["info"], item["image_urls"]))
+                except Exception as e:
+                    log(f"  ❌ 전송 오류: {e}")
+                    results.append(False)
+
+        sent = 0
+        for row, ok in zip(ready, results):
+            if ok:
+                self.mark_sent(row)
+                sent += 1
+                if on_sent:
+                    on_sent(row)
+            else:
+                self.mark_failed(row, "전송 실패")
+        return sent, len(rows) - sent
+
+
+_outbox = None
+
+
+def get_outbox() -> NotificationOutbox:
+    """프로세스 공용 알림 outbox"""
+    global _outbox
+    if _outbox is None:
+        _outbox = NotificationOutbox()
+    return _outbox
+
+
+# ══════════════════════════════════════════════════════════
+# 메인
+# ══════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.parse_args()
+
+    outbox = get_outbox()
+    c = outbox.counts()
+    print(f"대기 {c['pending']}건 (재시도 중 {c['retrying']}건) / 전송 완료 {c['sent']}건")
+    for row in outbox.due(force=True):
+        wait = max(0, row["next_attempt"] - time.time())
+        print(f"  {row['notice_id']:>10}  시도 {row['attempts']}회  "
+              f"{f'{wait:.0f}초 후' if wait else '지금'}  {row['last_error'] or ''}  "
+              f"{row['payload']['post_data']['title'][:40]}")
+
+
+if __name__ == "__main__":
+    main()
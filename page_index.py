@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+page_index.py
+PDF 페이지 지각 해시(dHash) 인덱스 — 반복 첨부되는 위치도/구역도 재처리 방지
+
+같은 구역의 단계별 고시마다 같은 위치도 페이지가 붙어 오는데, 지금까지는 매번
+200DPI 렌더링 → 경계 감지 → imgbb 업로드를 반복했다.
+페이지를 저해상도 회색조로 한 번만 그려 dHash(256bit) 를 구하고, 페이지별로
+이전 결과를 남겨 둔다:
+
+  image_path   pdf_to_images 가 저장한 200DPI PNG  (있으면 렌더링 대신 복사)
+  image_sha256 저장 당시 PNG 의 sha256 — 같은 제목의 다음 고시가 같은 경로
+               (pdf_images/<제목>/page_NNN.png) 를 덮어쓸 수 있으므로, 복사 전에
+               파일을 다시 해시해 같을 때만 재사용한다
+  ocr_text     ocr_pdf 의 페이지 OCR 결과
+  polygon      extract_polygon_from_pdf 의 픽셀 경계 + 이미지 크기 (감지 실패도 기록)
+
+dHash 는 후보를 고르는 데만 쓴다. 24DPI 썸네일이라 면적/세대수 숫자만 바뀐 본문이나
+경계 꼭짓점이 몇 pt 옮겨진 위치도도 같은 dHash 가 나온다 (정정/구역 변경 고시).
+재사용 전에 반드시 내용 해시(content_hash: 페이지 내용 스트림 + 참조하는 이미지 /
+폼 / 글꼴 객체의 sha256)가 같은지 확인하고, 다르면 새 페이지로 처리한다.
+업로드 URL 은 여기서 재사용하지 않는다 — imgbb_uploader 의 업로드 캐시가 PNG
+파일 내용(sha256) 으로 정확히 같은 이미지만 재사용한다.
+
+파일: db/page_index.sqlite (local_db.DB_DIR)
+
+Usage:
+  python page_index.py                 # 통계
+  python page_index.py 고시문.pdf      # 페이지별 해시 / 기록 여부
+"""
+
+import json
+import time
+import hashlib
+import argparse
+
+import local_db
+
+PAGE_INDEX_FILE = "page_index.sqlite"
+
+HASH_SIZE = 16          # dHash 격자 (HASH_SIZE² bit)
+THUMB_DPI = 24          # dHash 용 렌더링 해상도 (후보 선택용, 식별 키 아님)
+
+# 경계 감지 실패 기록 (다시 감지하지 않음)
+NO_POLYGON = "none"
+
+
+def dhash_gray(samples: bytes, width: int, height: int, size: int = HASH_SIZE) -> str:
+    """회색조 픽셀(행 우선, 1byte/px) → dHash 16진 문자열.
+    (size+1)×size 칸 평균으로 줄인 뒤 가로로 이웃한 칸의 밝기 대소를 비트로 쓴다"""
+    cols, rows = size + 1, size
+    sums = [0] * (cols * rows)
+    counts = [0] * (cols * rows)
+    col_of = [min(x * cols // width, cols - 1) for x in range(width)]
+    for y in range(height):
+        r = min(y * rows // height, rows - 1) * cols
+        line = samples[y * width:(y + 1) * width]
+        for x, v in enumerate(line):
+            sums[r + col_of[x]] += v
+            counts[r + col_of[x]] += 1
+    cells = [s / c if c else 0 for s, c in zip(sums, counts)]
+    bits = 0
+    for y in range(rows):
+        for x in range(size):
+            bits = bits << 1 | (cells[y * cols + x] > cells[y * cols + x + 1])
+    return f"{bits:0{size * size // 4}x}"
+
+
+def page_hash(page) -> str:
+    """fitz Page → dHash (THUMB_DPI 회색조 렌더링 한 번)"""
+    import fitz
+    pix = page.get_pixmap(matrix=fitz.Matrix(THUMB_DPI / 72, THUMB_DPI / 72),
+                          colorspace=fitz.csGRAY, alpha=False)
+    samples = pix.samples
+    if pix.stride != pix.width:
+        samples = b"".join(samples[y * pix.stride:y * pix.stride + pix.width]
+                           for y in range(pix.height))
+    return dhash_gray(samples, pix.width, pix.height)
+
+
+def content_hash(page) -> str:
+    """fitz Page → 내용 sha256 (렌더링 없음).
+    페이지 크기/회전 + 내용 스트림 + 참조하는 이미지 · 폼 XObject 스트림 + 글꼴 객체"""
+    doc = page.parent
+    h = hashlib.sha256(f"{tuple(page.rect)}/{page.rotation}".encode())
+    h.update(page.read_contents())
+    xrefs = {img[0] for img in page.get_images(full=True)}
+    xrefs |= {xobj[0] for xobj in page.get_xobjects()}
+    for xref in sorted(x for x in xrefs if x > 0):
+        h.update(doc.xref_stream_raw(xref) or b"")
+    for font in page.get_fonts(full=True):
+        if font[0] > 0:
+            h.update(doc.xref_object(font[0], compressed=True).encode())
+    return h.hexdigest()
+
+
+def page_key(page) -> tuple[str, str]:
+    """fitz Page → (dHash, 내용 sha256). PageIndex 조회 키"""
+    return page_hash(page), content_hash(page)
+
+
+class PageIndex:
+    def __init__(self, filename: str = PAGE_INDEX_FILE):
+        self.conn = local_db.connect(filename)
+        cols = [r[1] for r in self.conn.execute("PRAGMA table_info(pages)")]
+        if cols and "chash" not in cols:
+            # dHash 만으로 키를 잡던 이전 형식 → 버리고 다시 쌓음 (캐시)
+            self.conn.executescript("DROP TABLE pages; DROP TABLE IF EXISTS files;")
+        elif cols and "image_sha256" not in cols:
+            # 해시 없는 기존 image_path 는 검증이 안 되므로 다시 렌더링하게 됨
+            self.conn.execute("ALTER TABLE pages ADD COLUMN image_sha256 TEXT")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                chash      TEXT PRIMARY KEY,
+                phash      TEXT NOT NULL,
+                image_path TEXT,
+                image_sha256 TEXT,
+                ocr_text   TEXT,
+                polygon    TEXT,
+                hits       INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS pages_phash ON pages (phash);
+        """)
+        self.conn.commit()
+
+    def _find(self, key: tuple[str, str]):
+        """dHash 로 후보를 고르고 내용 해시가 같은 기록만 반환"""
+        phash, chash = key
+        for row in self.conn.execute("SELECT * FROM pages WHERE phash=?", (phash,)):
+            if row["chash"] == chash:
+                return row
+        return None
+
+    def get(self, key: tuple[str, str]) -> dict | None:
+        row = self._find(key)
+        if row is None:
+            return None
+        with self.conn:
+            self.conn.execute("UPDATE pages SET hits = hits + 1 WHERE chash=?", (row["chash"],))
+        return dict(row)
+
+    def put(self, key: tuple[str, str], image_path: str = None, ocr_text: str = None,
+            polygon=None, image_sha256: str = None):
+        """페이지 기록 추가/갱신 (None 인 항목은 기존 값 유지)"""
+        phash, chash = key
+        poly = None
+        if polygon is not None:
+            poly = polygon if polygon == NO_POLYGON else json.dumps(polygon)
+        with self.conn:
+            self.conn.execute("""
+                INSERT INTO pages (chash, phash, image_path, image_sha256, ocr_text, polygon,
+                                   updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(chash) DO UPDATE SET
+                    image_path   = COALESCE(excluded.image_path, image_path),
+                    image_sha256 = CASE WHEN excluded.image_path IS NULL THEN image_sha256
+                                        ELSE excluded.image_sha256 END,
+                    ocr_text   = COALESCE(excluded.ocr_text, ocr_text),
+                    polygon    = COALESCE(excluded.polygon, polygon),
+                    updated_at = excluded.updated_at
+            """, (chash, phash, image_path, image_sha256, ocr_text, poly, time.time()))
+
+    def polygon(self, key: tuple[str, str]):
+        """기록된 경계 → ({"points", "shape"} | NO_POLYGON | None(미기록))"""
+        row = self._find(key)
+        if row is None or row["polygon"] is None:
+            return None
+        return NO_POLYGON if row["polygon"] == NO_POLYGON else json.loads(row["polygon"])
+
+    def stats(self) -> dict:
+        row = self.conn.execute("""
+            SELECT COUNT(*), COALESCE(SUM(hits), 0), COUNT(ocr_text), COUNT(polygon),
+                   COUNT(DISTINCT phash)
+            FROM pages
+        """).fetchone()
+        return {"pages": row[0], "hits": row[1], "ocr": row[2], "polygon": row[3],
+                "dhashes": row[4]}
+
+
+_index = None
+
+
+def get_index() -> PageIndex:
+    """프로세스 공용 페이지 인덱스"""
+    global _index
+    if _index is None:
+        _index = PageIndex()
+    return _index
+
+
+# ══════════════════════════════════════════════════════════
+# 메인
+# ══════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("pdf", nargs="*", help="페이지 해시를 확인할 PDF")
+    args = parser.parse_args()
+
+    index = get_index()
+    if not args.pdf:
+        s = index.stats()
+        print(f"페이지 {s['pages']}개 (dHash {s['dhashes']}개) / 재사용 {s['hits']}회 "
+              f"(OCR {s['ocr']}, 경계 {s['polygon']})")
+        return
+
+    try:
+        import fitz
+    except ImportError:
+        print("⚠️  PyMuPDF 미설치 (pip install PyMuPDF)")
+        return
+    for src in args.pdf:
+        doc = fitz.open(src)
+        print(f"{src} ({len(doc)}페이지)")
+        for page_num in range(len(doc)):
+            t0 = time.perf_counter()
+            key = page_key(doc.load_page(page_num))
+            ms = (time.perf_counter() - t0) * 1000
+            row = index._find(key)
+            if row:
+                known = ", ".join(k for k in ("ocr_text", "polygon") if row[k]) or "해시만"
+            else:
+                same_dhash = index.conn.execute("SELECT COUNT(*) FROM pages WHERE phash=?",
+                                                (key[0],)).fetchone()[0]
+                known = f"새 페이지 (dHash 같은 다른 내용 {same_dhash}개)" if same_dhash else "새 페이지"
+            print(f"  p{page_num + 1:>3}  {key[0][:16]}… {key[1][:12]}…  {ms:.1f}ms  [{known}]")
+        doc.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+rate_limit.py
+엔드포인트별 토큰 버킷 + 429/Retry-After 준수 HTTP 호출
+
+고시 사이마다 고정 time.sleep(3) 을 두던 것을 실제 호출 속도 제한으로 바꾼다.
+  - 엔드포인트(호스트+경로)마다 TokenBucket(초당 rate, 최대 burst) 하나
+    → 몰아서 온 20건도 burst 만큼은 바로, 이후는 rate 속도로 나간다
+  - 429 (또는 Retry-After 가 붙은 503) 를 받으면 그 버킷 전체를 Retry-After 만큼
+    멈추고 (헤더가 없으면 지수 백오프) 같은 요청을 다시 보낸다
+버킷은 스레드 안전하다 (병렬 업로드 / 전송 스레드가 같이 써도 됨).
+
+Usage:
+  from rate_limit import request
+  response = request("POST", url, headers=..., data=...)
+"""
+
+import time
+import threading
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+# 엔드포인트 → (초당 호출 수, 버스트)
+LIMITS = {
+    "kapi.kakao.com/v2/api/talk/memo/default/send": (5.0, 10),
+    "kauth.kakao.com/oauth/token": (1.0, 2),
+    "api.imgbb.com/1/upload": (4.0, 8),
+}
+DEFAULT_LIMIT = (5.0, 10)
+MAX_RETRIES = 3
+BACKOFF_BASE = 1.0      # Retry-After 가 없을 때 1, 2, 4초 …
+MAX_RETRY_AFTER = 120   # 이보다 긴 Retry-After 는 재시도하지 않고 응답을 그대로 반환
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self) -> float:
+        """토큰 하나 얻을 때까지 대기. 반환: 기다린 초"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    delay = self.paused_until - now
+                else:
+                    self._refill(now)
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return waited
+                    delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float):
+        """서버가 요청한 대기 (Retry-After) — 버킷을 비우고 그때까지 멈춤"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+_buckets: dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def endpoint(url: str) -> str:
+    parts = urlsplit(url)
+    return parts.netloc + parts.path
+
+
+def get_bucket(url: str) -> TokenBucket:
+    key = endpoint(url)
+    with _buckets_lock:
+        if key not in _buckets:
+            _buckets[key] = TokenBucket(*LIMITS.get(key, DEFAULT_LIMIT))
+        return _buckets[key]
+
+
+def retry_after(response) -> float | None:
+    """Retry-After 헤더 (초 또는 HTTP 날짜) → 초"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _rewind(files):
+    """재시도 전에 multipart 파일 객체를 처음으로 되돌린다"""
+    for value in (files or {}).values():
+        f = value[1] if isinstance(value, tuple) else value
+        if hasattr(f, "seek"):
+            f.seek(0)
+
+
+def request(method: str, url: str, session=None, max_retries: int = MAX_RETRIES, **kwargs):
+    """속도 제한을 지켜 HTTP 요청 (429/Retry-After 재시도). 반환: 마지막 응답"""
+    import requests
+    sender = session or requests
+    bucket = get_bucket(url)
+    kwargs.setdefault("timeout", 30)
+    for attempt in range(max_retries + 1):
+        bucket.acquire()
+        if attempt:
+            _rewind(kwargs.get("files"))
+        response = sender.request(method, url, **kwargs)
+        delay = retry_after(response)
+        throttled = response.status_code == 429 or (response.status_code == 503 and delay is not None)
+        if not throttled or attempt == max_retries:
+            return response
+        if delay is None:
+            delay = BACKOFF_BASE * 2 ** attempt
+        if delay > MAX_RETRY_AFTER:
+            return response
+        print(f"    ⏳ {endpoint(url)} 속도 제한 ({response.status_code}) → {delay:.1f}초 후 재시도")
+        bucket.pause(delay)
+    return response
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+reanalyze.py
+보관된 OCR 텍스트(downloaded_files/txt) 일괄 재분석
+
+추출 규칙(notice_extractor / title_classifier)이 바뀌었을 때 PDF 재다운로드·재OCR 없이
+저장된 텍스트만 프로세스 풀로 다시 분석해 열 형식 파일 하나로 쓰고,
+직전 결과와 필드 단위로 비교한다.
+
+  입력: {OUT_DIR}/txt/{YYYYMMDD}_{제목}.txt   (run_once 가 저장한 OCR 텍스트)
+  출력: {OUT_DIR}/reanalysis.parquet           (pyarrow 없으면 reanalysis.csv)
+        {OUT_DIR}/reanalysis_diff.csv          (직전 결과 대비 바뀐 값: 파일, 필드, 이전, 이후)
+
+Usage:
+  python reanalyze.py
+  python reanalyze.py --txt-dir C:/Users/me/downloaded_files/txt --workers 8
+"""
+
+import os
+import csv
+import hashlib
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from notice_extractor import extract
+from title_classifier import get_classifier
+
+TXT_DIR = Path(os.getcwd()) / "downloaded_files" / "txt"
+
+COLUMNS = [
+    "file", "date", "title", "sha1", "chars",
+    "stage", "is_designation", "zones", "type",
+    "location", "gu", "dong", "benji", "location_source", "location_confidence",
+    "area_m2", "households", "buildings", "floors_below", "floors_above",
+]
+KEY = "file"
+# 비교에서 뺄 열 (입력 자체 정보)
+DIFF_SKIP = {"file", "date", "title", "sha1", "chars"}
+
+
+def analyze_file(path: str) -> dict:
+    """txt 파일 하나 → 결과 행 (프로세스 풀 작업 단위)"""
+    raw = Path(path).read_bytes()
+    text = raw.decode("utf-8", errors="ignore")
+    stem = Path(path).stem
+    date, _, title = stem.partition("_")
+    if not (date.isdigit() and len(date) == 8):
+        date, title = "", stem
+
+    cls = get_classifier().classify(title)
+    fields = extract(text, title)
+    loc = fields.get("위치", {})
+    floors = fields.get("층수", {}).get("value") or {}
+    return {
+        "file": Path(path).name,
+        "date": date,
+        "title": title,
+        "sha1": hashlib.sha1(raw).hexdigest(),
+        "chars": len(text),
+        "stage": cls["stage"],
+        "is_designation": cls["is_designation"],
+        "zones": ",".join(cls["zones"]),
+        "type": fields["type"]["value"],
+        "location": loc.get("text"),
+        "gu": (loc.get("value") or {}).get("gu"),
+        "dong": (loc.get("value") or {}).get("dong"),
+        "benji": (loc.get("value") or {}).get("benji"),
+        "location_source": loc.get("source"),
+        "location_confidence": loc.get("confidence"),
+        "area_m2": fields.get("면적", {}).get("value"),
+        "households": fields.get("세대수", {}).get("value"),
+        "buildings": fields.get("동수", {}).get("value"),
+        "floors_below": floors.get("below"),
+        "floors_above": floors.get("above"),
+    }
+
+
+# ── 열 형식 저장 (pyarrow 선택) ─────────────────
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        return None
+
+
+def write_rows(rows: list[dict], out: Path) -> Path:
+    """parquet (pyarrow 없으면 같은 이름의 csv). 반환: 실제 경로"""
+    pa = _pyarrow()
+    if pa:
+        table = pa.Table.from_pylist(rows, schema=pa.schema([
+            ("file", pa.string()), ("date", pa.string()), ("title", pa.string()),
+            ("sha1", pa.string()), ("chars", pa.int64()),
+            ("stage", pa.string()), ("is_designation", pa.bool_()), ("zones", pa.string()),
+            ("type", pa.string()), ("location", pa.string()), ("gu", pa.string()),
+            ("dong", pa.string()), ("benji", pa.string()), ("location_source", pa.string()),
+            ("location_confidence", pa.float64()), ("area_m2", pa.float64()),
+            ("households", pa.int64()), ("buildings", pa.int64()),
+            ("floors_below", pa.int64()), ("floors_above", pa.int64()),
+        ]))
+        pa.parquet.write_table(table, out)
+        return out
+
+    out = out.with_suffix(".csv")
+    print("  ⚠️  pyarrow 미설치 → CSV 로 저장 (pip install pyarrow)")
+    with open(out, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+    return out
+
+
+def read_rows(out: Path) -> list[dict]:
+    """직전 결과 (parquet → csv 순으로 찾음). 없으면 빈 목록"""
+    pa = _pyarrow()
+    if pa and out.exists():
+        return pa.parquet.read_table(out).to_pylist()
+    csv_path = out.with_suffix(".csv")
+    if csv_path.exists():
+        with open(csv_path, encoding="utf-8-sig", newline="") as f:
+            return list(csv.DictReader(f))
+    return []
+
+
+def _norm(v) -> str:
+    """parquet(타입) / csv(문자열) 결과를 같은 기준으로 비교"""
+    if v is None or (isinstance(v, float) and v != v):
+        return ""
+    s = str(v)
+    try:
+        f = float(s)
+        return str(int(f)) if f.is_integer() else repr(f)
+    except ValueError:
+        return s
+
+
+def diff_rows(old: list[dict], new: list[dict]) -> tuple[list[tuple], dict]:
+    """(바뀐 값 목록 [(file, field, old, new)], 요약 카운트)"""
+    old_by = {r[KEY]: r for r in old}
+    new_by = {r[KEY]: r for r in new}
+    changes, per_field = [], {}
+    for key, row in new_by.items():
+        prev = old_by.get(key)
+        if prev is None:
+            continue
+        for col in COLUMNS:
+            if col in DIFF_SKIP:
+                continue
+            a, b = _norm(prev.get(col)), _norm(row.get(col))
+            if a != b:
+                changes.append((key, col, a, b))
+                per_field[col] = per_field.get(col, 0) + 1
+    summary = {
+        "added": len(new_by.keys() - old_by.keys()),
+        "removed": len(old_by.keys() - new_by.keys()),
+        "changed_files": len({c[0] for c in changes}),
+        "per_field": per_field,
+    }
+    return changes, summary
+
+
+def reanalyze(txt_dir: Path, out: Path, workers: int = None) -> dict:
+    paths = sorted(str(p) for p in txt_dir.glob("*.txt"))
+    print(f"재분석: {len(paths)}개 텍스트 ({txt_dir})")
+    previous = read_rows(out)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        rows = list(pool.map(analyze_file, paths, chunksize=32))
+
+    written = write_rows(rows, out)
+    print(f"  결과 저장: {written} ({len(rows)}행)")
+
+    changes, summary = diff_rows(previous, rows)
+    if previous:
+        diff_path = out.with_name("reanalysis_diff.csv")
+        with open(diff_path, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["file", "field", "old", "new"])
+            writer.writerows(changes)
+        print(f"  직전 대비: 추가 {summary['added']} / 삭제 {summary['removed']} / "
+              f"변경 {summary['changed_files']}개 파일 → {diff_path}")
+        for col, n in sorted(summary["per_field"].items(), key=lambda kv: -kv[1]):
+            print(f"    {col}: {n}")
+    else:
+        print("  직전 결과 없음 (비교 생략)")
+    return summary
+
+
+# ══════════════════════════════════════════════════════════
+# 메인
+# ══════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--txt-dir", default=str(TXT_DIR), help="OCR 텍스트 폴더")
+    parser.add_argument("--out", default=None,
+                        help="결과 parquet 경로 (기본: txt 폴더 옆 reanalysis.parquet)")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    args = parser.parse_args()
+
+    txt_dir = Path(args.txt_dir)
+    out = Path(args.out) if args.out else txt_dir.parent / "reanalysis.parquet"
+    reanalyze(txt_dir, out, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+"""
+state_store.py
+처리 상태 저장소 (SQLite WAL, dataNo 정수 키 + 소비자별 처리 표시)
+
+gosi_state.json (dataNo 문자열 목록, gosi_github_actions) 과
+gosi_stage_state.json (전체 URL 목록, gosi_to_stage) 을 대신한다.
+  - 키는 dataNo 정수 하나 (curPage 만 다른 URL 이 두 번 기록되지 않음)
+  - 소비자(consumer)별 처리 표시: "notify" (카톡 알림), "stage" (단계 갱신)
+  - 기록은 고시 한 건마다 바로 커밋 → 중간에 죽어도 처리분은 남는다
+
+처리된 dataNo 는 소비자별로 "floor 이하 전부" + 정렬된 닫힌 구간 [lo, hi] 목록으로 둔다.
+  - 이어지는 번호는 기록할 때 바로 이웃 구간과 합친다. 다만 dataNo 는 부산시 게시판
+    전체 번호라 연속된 고시가 한 구간으로 합쳐지는 일은 드물다 (대략 고시 한 건에 구간 하나)
+  - 그래서 구간 수는 floor 로 묶는다: 목록 페이지를 빠짐없이 읽은 실행마다
+    min(이번, 지난 실행에서 긁은 가장 오래된 dataNo) 바로 아래로 floor 를 올리고
+    (compact), 그 아래 구간은 지운다. 페이지 로드가 하나라도 실패한 실행이나
+    dry-run 에서는 floor 를 건드리지 않는다
+  - 확인은 메모리의 구간 목록에서 이진 탐색
+→ 남는 구간은 긁는 페이지 범위 안의 처리 고시뿐이라 시작 로드 / 메모리 / 커밋되는
+  파일 크기가 이력과 무관하게 작다.
+
+floor 의 대가: floor 아래 번호는 표시하지 않았어도 "처리됨" 이 된다.
+  - 재시도하려고 일부러 남겨 둔 고시(gosi_to_stage 의 단계 반영 실패 등)도, 두 번 연속
+    완전한 실행의 목록 페이지 밖으로 밀려나면 더는 재시도되지 않는다
+  - floor 는 내려가지 않고 그 아래 구간은 지워져 있어 되돌릴 수 없다. 긁는 페이지 수를
+    늘리면 늘어난 페이지의 미처리 고시는 이미 처리됨으로 보인다
+
+파일: 소비자마다 하나 — gosi_state_notify.sqlite, gosi_state_stage.sqlite (저장소 루트,
+각 워크플로가 자기 파일만 커밋). 바이너리 파일은 git 이 병합하지 못하므로 두 파이프라인이
+같은 파일을 커밋하지 않게 나눈다. 커밋 전에 close() 가 WAL 을 본 파일로 합쳐
+(-wal 파일 없이) 파일 하나만 커밋하면 된다.
+처음 열 때 그 소비자의 이전 상태가 있으면 한 번 가져온다 (원본 파일은 그대로 둠):
+  두 소비자가 같이 쓰던 gosi_state.sqlite, JSON 상태 파일
+
+Usage:
+  python state_store.py                 # 소비자별 floor / 구간 / 건수
+  python state_store.py --check 111234  # 처리 여부
+"""
+
+import re
+import json
+import bisect
+import argparse
+from pathlib import Path
+
+import local_db
+
+STATE_DIR = Path(__file__).parent
+CONSUMERS = ("notify", "stage")
+
+# 두 소비자가 같이 쓰던 이전 상태 DB
+SHARED_DB = STATE_DIR / "gosi_state.sqlite"
+
+# 이전 JSON 상태 파일 → (소비자, 목록 키)
+LEGACY_FILES = {
+    STATE_DIR / "gosi_state.json": ("notify", "processed"),
+    STATE_DIR / "gosi_stage_state.json": ("stage", "processed_urls"),
+}
+
+
+def state_path(consumer: str) -> Path:
+    """소비자별 상태 파일"""
+    return STATE_DIR / f"gosi_state_{consumer}.sqlite"
+
+_DATANO_RE = re.compile(r"dataNo=(\d+)")
+
+
+def data_no(key) -> int | None:
+    """dataNo 정수 / 숫자 문자열 / 상세 URL → dataNo (알 수 없으면 None)"""
+    if isinstance(key, int):
+        return key
+    key = str(key)
+    if key.isdigit():
+        return int(key)
+    m = _DATANO_RE.search(key)
+    return int(m.group(1)) if m else None
+
+
+class StateStore:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.conn = local_db.connect(str(path))
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS ranges (
+                consumer TEXT NOT NULL,
+                lo       INTEGER NOT NULL,
+                hi       INTEGER NOT NULL,
+                PRIMARY KEY (consumer, lo)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS floors (
+                consumer TEXT PRIMARY KEY,
+                floor    INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key   TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        self.conn.commit()
+        self._cache = {}    # consumer → (floor, [lo…], [hi…])
+        self._compacted = False
+        self._migrate_rows()
+
+    def _migrate_rows(self):
+        """이전 형식 (dataNo 한 건당 한 행) processed 테이블 → 구간"""
+        if not self.conn.execute("SELECT 1 FROM sqlite_master WHERE name='processed'").fetchone():
+            return
+        rows = self.conn.execute("SELECT consumer, data_no FROM processed ORDER BY consumer, data_no")
+        by_consumer = {}
+        for consumer, n in rows:
+            by_consumer.setdefault(consumer, []).append(n)
+        for consumer, numbers in by_consumer.items():
+            self._add_many(numbers, consumer)
+        with self.conn:
+            self.conn.execute("DROP TABLE processed")
+
+    def _load(self, consumer: str) -> tuple:
+        if consumer not in self._cache:
+            row = self.conn.execute("SELECT floor FROM floors WHERE consumer=?", (consumer,)).fetchone()
+            los, his = [], []
+            for lo, hi in self.conn.execute(
+                    "SELECT lo, hi FROM ranges WHERE consumer=? ORDER BY lo", (consumer,)):
+                los.append(lo)
+                his.append(hi)
+            self._cache[consumer] = (row[0] if row else None, los, his)
+        return self._cache[consumer]
+
+    def is_processed(self, key, consumer: str) -> bool:
+        n = data_no(key)
+        if n is None:
+            return False
+        floor, los, his = self._load(consumer)
+        if floor is not None and n <= floor:
+            return True
+        i = bisect.bisect_right(los, n) - 1
+        return i >= 0 and n <= his[i]
+
+    def mark(self, key, consumer: str) -> bool:
+        """처리 완료 기록 (바로 커밋). dataNo 를 알 수 없으면 False"""
+        n = data_no(key)
+        if n is None:
+            print(f"    ⚠️ dataNo 없는 고시는 상태에 기록하지 않음: {key}")
+            return False
+        if not self.is_processed(n, consumer):
+            self._add_many([n], consumer)
+        return True
+
+    def _add_many(self, numbers: list[int], consumer: str):
+        """번호들을 구간 목록에 합쳐 넣고 한 트랜잭션으로 반영"""
+        floor, los, his = self._load(consumer)
+        with self.conn:
+            for n in sorted(set(numbers)):
+                if (floor is not None and n <= floor) or self._contains(los, his, n):
+                    continue
+                i = bisect.bisect_right(los, n)      # n 이 들어갈 자리
+                lo = hi = n
+                # 왼쪽 구간이 n-1 에서 끝나면 합침
+                if i > 0 and his[i - 1] == n - 1:
+                    i -= 1
+                    lo = los[i]
+                    self.conn.execute("DELETE FROM ranges WHERE consumer=? AND lo=?", (consumer, lo))
+                    del los[i], his[i]
+                # 오른쪽 구간이 n+1 에서 시작하면 합침
+                if i < len(los) and los[i] == n + 1:
+                    hi = his[i]
+                    self.conn.execute("DELETE FROM ranges WHERE consumer=? AND lo=?", (consumer, los[i]))
+                    del los[i], his[i]
+                self.conn.execute("INSERT INTO ranges (consumer, lo, hi) VALUES (?, ?, ?)",
+                                  (consumer, lo, hi))
+                los.insert(i, lo)
+                his.insert(i, hi)
+
+    @staticmethod
+    def _contains(los, his, n) -> bool:
+        i = bisect.bisect_right(los, n) - 1
+        return i >= 0 and n <= his[i]
+
+    def compact(self, consumer: str, crawled, complete: bool = True) -> int:
+        """목록 수집 결과(dataNo / URL)로 floor 올리기. 반환: 지운 구간 수
+          complete=False (수집 중 실패한 페이지가 있음) 면 아무것도 하지 않는다.
+          floor 는 이번 실행과 지난 (완전한) 실행에서 긁은 가장 오래된 dataNo 중 작은 값
+          바로 아래 — 한 실행만큼 여유를 두어 이번에만 덜 긁힌 고시를 접지 않는다."""
+        numbers = [n for n in map(data_no, crawled) if n is not None]
+        if not complete or not numbers:
+            return 0
+        oldest = min(numbers)
+        key = f"oldest:{consumer}"
+        row = self.conn.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                              (key, str(oldest)))
+        if row is None:
+            return 0
+        new_floor = min(int(row[0]), oldest) - 1
+        floor, los, his = self._load(consumer)
+        if floor is not None and new_floor <= floor:
+            return 0
+        cut = bisect.bisect_right(his, new_floor)   # hi ≤ new_floor 인 구간 수
+        with self.conn:
+            self.conn.execute("DELETE FROM ranges WHERE consumer=? AND hi<=?", (consumer, new_floor))
+            if cut < len(los) and los[cut] <= new_floor:
+                # floor 에 걸친 구간은 floor 위쪽만 남김
+                self.conn.execute("UPDATE ranges SET lo=? WHERE consumer=? AND lo=?",
+                                  (new_floor + 1, consumer, los[cut]))
+                los[cut] = new_floor + 1
+            self.conn.execute("INSERT OR REPLACE INTO floors (consumer, floor) VALUES (?, ?)",
+                              (consumer, new_floor))
+        self._cache[consumer] = (new_floor, los[cut:], his[cut:])
+        if cut:
+            self._compacted = True
+        return cut
+
+    def summary(self, consumer: str) -> dict:
+        floor, los, his = self._load(consumer)
+        return {"floor": floor, "ranges": len(los),
+                "ids": sum(h - l + 1 for l, h in zip(los, his))}
+
+    def consumers(self) -> list[str]:
+        return [r[0] for r in self.conn.execute(
+            "SELECT consumer FROM ranges UNION SELECT consumer FROM floors ORDER BY 1")]
+
+    def _migrated(self, done_key: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM meta WHERE key=?", (done_key,)).fetchone() is not None
+
+    def migrate_shared(self, consumer: str, shared: Path = SHARED_DB) -> int:
+        """같이 쓰던 gosi_state.sqlite 에서 이 소비자의 구간 / floor 가져오기 (한 번).
+        반환: 가져온 구간 수"""
+        done_key = f"migrated:{shared.name}"
+        if not shared.exists() or self._migrated(done_key):
+            return 0
+        old = StateStore(shared)        # 한 행 한 건 형식이면 여기서 구간으로 바뀜
+        floor, los, his = old._load(consumer)
+        oldest = old.conn.execute("SELECT value FROM meta WHERE key=?",
+                                  (f"oldest:{consumer}",)).fetchone()
+        old.close()
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO ranges (consumer, lo, hi) VALUES (?, ?, ?)",
+                                  [(consumer, lo, hi) for lo, hi in zip(los, his)])
+            if floor is not None:
+                self.conn.execute("INSERT OR REPLACE INTO floors (consumer, floor) VALUES (?, ?)",
+                                  (consumer, floor))
+            if oldest:
+                self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                                  (f"oldest:{consumer}", oldest[0]))
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                              (done_key, str(len(los))))
+        self._cache.pop(consumer, None)
+        print(f"  상태 이전: {shared.name} → {self.path.name} 구간 {len(los)}개")
+        return len(los)
+
+    def migrate_legacy(self, consumer: str, files: dict = LEGACY_FILES) -> int:
+        """이 소비자의 JSON 상태 파일 가져오기 (파일별 한 번). 반환: 가져온 건수"""
+        total = 0
+        for path, (file_consumer, list_key) in files.items():
+            if file_consumer != consumer:
+                continue
+            done_key = f"migrated:{Path(path).name}"
+            if not Path(path).exists() or self._migrated(done_key):
+                continue
+            try:
+                items = json.loads(Path(path).read_text(encoding="utf-8")).get(list_key, [])
+            except (OSError, ValueError) as e:
+                print(f"    ⚠️ {Path(path).name} 읽기 실패: {e}")
+                continue
+            numbers = {n for n in map(data_no, items) if n is not None}
+            self._add_many(list(numbers), consumer)
+            with self.conn:
+                self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                                  (done_key, str(len(numbers))))
+            print(f"  상태 이전: {Path(path).name} → {consumer} {len(numbers)}건")
+            total += len(numbers)
+        return total
+
+    def close(self):
+        """WAL 을 본 파일로 합치고 닫기 (커밋 전 호출). 이번에 접었으면 VACUUM 도"""
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        if self._compacted:
+            self.vacuum()
+        self.conn.close()
+
+    def vacuum(self):
+        """접은 뒤 빈 페이지 정리 (커밋되는 파일 크기 축소)"""
+        self.conn.execute("VACUUM")
+
+
+_stores: dict[str, StateStore] = {}
+
+
+def get_state(consumer: str) -> StateStore:
+    """소비자별 공용 상태 저장소 (처음 열 때 이전 상태 가져오기)"""
+    if consumer not in _stores:
+        store = StateStore(state_path(consumer))
+        store.migrate_shared(consumer)
+        store.migrate_legacy(consumer)
+        _stores[consumer] = store
+    return _stores[consumer]
+
+
+def close_state():
+    """열어 둔 상태 저장소 모두 닫기"""
+    while _stores:
+        _stores.popitem()[1].close()
+
+
+# ══════════════════════════════════════════════════════════
+# 메인
+# ══════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--check", nargs="*", default=[], help="처리 여부를 볼 dataNo / URL")
+    args = parser.parse_args()
+
+    consumers = [c for c in CONSUMERS
+                 if state_path(c).exists() or SHARED_DB.exists()
+                 or any(fc == c and p.exists() for p, (fc, _) in LEGACY_FILES.items())]
+    try:
+        for consumer in consumers:
+            s = get_state(consumer).summary(consumer)
+            print(f"  {consumer}: floor {s['floor'] or '-'} + 구간 {s['ranges']}개 ({s['ids']}건)")
+        for key in args.check:
+            flags = {c: get_state(c).is_processed(key, c) for c in consumers}
+            print(f"  {key}: " + ", ".join(f"{c} {'✅' if v else '·'}" for c, v in flags.items()))
+    finally:
+        close_state()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+supabase_outbox.py
+Supabase 쓰기 지연 반영 큐 (SQLite outbox)
+
+projects / stage_changes / zone_boundaries 변경을 먼저 로컬 outbox 에 기록하고
+백그라운드 스레드가 묶음 단위로 보낸다. 실패한 묶음은 행 단위로 다시 시도해
+문제 행만 백오프 대기열에 남기고, 다음 실행 시작 시 남은 항목을 먼저 비운다.
+Supabase 가 느리거나 죽어 있어도 수집/추출은 계속되고 변경은 유실되지 않는다.
+
+작업 종류:
+  insert   payload = 행                         → 같은 테이블 행을 한 번에 insert
+  upsert   payload = 행, on_conflict = 키 컬럼  → 키 중복은 마지막 값만 남겨 한 번에 upsert
+  update   payload = {"set", "column", "ids", "touch"}
+           → 같은 set 값끼리 ids 를 합쳐 update ... in(column, ids) 한 번
+             (touch 컬럼은 전송 시각으로 채움, 예: updated_at)
+
+같은 대상 행(update 의 id, upsert 의 키 값)에 대한 변경은 기록 순서대로만 나간다.
+앞선 변경이 대기 중(백오프 포함)이면 뒤 변경도 기다린다 — 실패한 옛 stage 가 나중에
+재전송되어 새 stage 를 덮어쓰지 않도록. 한 번의 flush 에는 대상 행마다 한 건만 보낸다.
+
+파일: db/supabase_outbox.sqlite (local_db.DB_DIR)
+"""
+
+import json
+import time
+import threading
+from datetime import datetime
+
+import local_db
+
+OUTBOX_FILE = "supabase_outbox.sqlite"
+BATCH_SIZE = 200
+FLUSH_INTERVAL = 5        # 백그라운드 flush 주기 (초)
+MAX_BACKOFF = 3600        # 재시도 간격 상한 (초)
+
+
+def _dumps(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+class Outbox:
+    def __init__(self, filename: str = OUTBOX_FILE):
+        self._lock = threading.Lock()
+        self.conn = local_db.connect(filename)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id           INTEGER PRIMARY KEY AUTOINCREMENT,
+                target       TEXT NOT NULL,
+                op           TEXT NOT NULL,
+                payload      TEXT NOT NULL,
+                on_conflict  TEXT,
+                attempts     INTEGER NOT NULL DEFAULT 0,
+                next_attempt REAL NOT NULL DEFAULT 0,
+                last_error   TEXT,
+                created_at   REAL NOT NULL
+            )""")
+        self.conn.commit()
+
+    def enqueue(self, target: str, op: str, payload: dict, on_conflict: str = None):
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO outbox (target, op, payload, on_conflict, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (target, op, _dumps(payload), on_conflict, time.time()))
+            self.conn.commit()
+
+    def pending(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    # ── 전송 ──────────────────────────────────
+    def _pending_rows(self) -> list:
+        with self._lock:
+            return self.conn.execute("SELECT * FROM outbox ORDER BY id").fetchall()
+
+    @staticmethod
+    def _row_keys(row) -> set:
+        """행이 건드리는 원격 행 키 (순서를 지켜야 하는 단위). insert 는 없음"""
+        if row["op"] == "update":
+            p = json.loads(row["payload"])
+            return {(row["target"], p["column"], i) for i in p["ids"]}
+        if row["op"] == "upsert":
+            key = row["on_conflict"]
+            return {(row["target"], key, json.loads(row["payload"]).get(key))}
+        return set()
+
+    def _ready(self, force: bool) -> list:
+        """지금 보낼 행: 백오프가 끝났고, 같은 키의 앞선 행이 대기 중이 아닌 것 (키마다 최대 한 건)"""
+        now = time.time()
+        held, ready = set(), []
+        for row in self._pending_rows():
+            keys = self._row_keys(row)
+            if (force or row["next_attempt"] <= now) and not keys & held:
+                ready.append(row)
+            held |= keys
+        return ready
+
+    @staticmethod
+    def _group_key(row) -> tuple:
+        if row["op"] == "update":
+            p = json.loads(row["payload"])
+            return (row["target"], "update", _dumps([p["set"], p["column"], p.get("touch")]))
+        return (row["target"], row["op"], row["on_conflict"])
+
+    def _send(self, client, rows: list):
+        """같은 그룹의 행들을 한 요청으로 전송 (실패 시 예외)"""
+        target, op = rows[0]["target"], rows[0]["op"]
+        payloads = [json.loads(r["payload"]) for r in rows]
+        table = client.table(target)
+        if op == "insert":
+            table.insert(payloads).execute()
+        elif op == "upsert":
+            key = rows[0]["on_conflict"]
+            # 한 요청 안에서 같은 키가 두 번 나오면 PostgREST 오류 → 마지막 값만
+            latest = {p[key]: p for p in payloads}
+            table.upsert(list(latest.values()), on_conflict=key).execute()
+        elif op == "update":
+            p0 = payloads[0]
+            values = dict(p0["set"])
+            if p0.get("touch"):
+                values[p0["touch"]] = datetime.now().isoformat()
+            ids = list(dict.fromkeys(i for p in payloads for i in p["ids"]))
+            table.update(values).in_(p0["column"], ids).execute()
+        else:
+            raise ValueError(f"알 수 없는 outbox op: {op}")
+
+    def _done(self, rows: list):
+        with self._lock:
+            self.conn.executemany("DELETE FROM outbox WHERE id=?", [(r["id"],) for r in rows])
+            self.conn.commit()
+
+    def _failed(self, row, error: Exception):
+        attempts = row["attempts"] + 1
+        delay = min(MAX_BACKOFF, 5 * 2 ** attempts)
+        with self._lock:
+            self.conn.execute(
+                "UPDATE outbox SET attempts=?, next_attempt=?, last_error=? WHERE id=?",
+                (attempts, time.time() + delay, str(error)[:500], row["id"]))
+            self.conn.commit()
+
+    def flush(self, client, force: bool = False) -> tuple[int, int]:
+        """대기 항목 전송. force=True 면 백오프 무시 (실행 시작 시 비우기).
+        같은 키의 다음 변경은 앞 변경이 나간 뒤 다음 회차에 보낸다 (이번 flush 에서 시도한 행은 제외).
+        반환: (성공 건수, 실패 건수)"""
+        sent = failed = 0
+        tried = set()
+        while True:
+            rows = [r for r in self._ready(force) if r["id"] not in tried]
+            if not rows:
+                return sent, failed
+            tried.update(r["id"] for r in rows)
+            s, f = self._flush_rows(client, rows)
+            sent += s
+            failed += f
+
+    def _flush_rows(self, client, ready: list) -> tuple[int, int]:
+        groups = {}
+        for row in ready:
+            groups.setdefault(self._group_key(row), []).append(row)
+
+        sent = failed = 0
+        for rows in groups.values():
+            for i in range(0, len(rows), BATCH_SIZE):
+                batch = rows[i:i + BATCH_SIZE]
+                try:
+                    self._send(client, batch)
+                    self._done(batch)
+                    sent += len(batch)
+                except Exception as batch_error:
+                    if len(batch) == 1:
+                        self._failed(batch[0], batch_error)
+                        failed += 1
+                        continue
+                    # 묶음 실패 → 행 단위 재시도로 문제 행만 격리
+                    # (연속 2건 실패면 장애로 보고 나머지는 보내지 않고 백오프)
+                    streak = 0
+                    for row in batch:
+                        if streak >= 2:
+                            self._failed(row, batch_error)
+                            failed += 1
+                            continue
+                        try:
+                            self._send(client, [row])
+                            self._done([row])
+                            sent += 1
+                            streak = 0
+                        except Exception as e:
+                            self._failed(row, e)
+                            failed += 1
+                            streak += 1
+        return sent, failed
+
+
+class OutboxFlusher:
+    """백그라운드 스레드에서 FLUSH_INTERVAL 마다 outbox.flush()"""
+
+    def __init__(self, outbox: Outbox, client, interval: float = FLUSH_INTERVAL):
+        self.outbox = outbox
+        self.client = client
+        self.interval = interval
+        self.sent = 0
+        self.failed = 0
+        self._stop = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="outbox-flusher", daemon=True)
+
+    def start(self) -> "OutboxFlusher":
+        self._thread.start()
+        return self
+
+    def flush(self, force: bool = False):
+        with self._flush_lock:
+            try:
+                s, f = self.outbox.flush(self.client, force)
+            except Exception as e:
+                print(f"  ⚠️ outbox 전송 오류: {e}")
+                return
+            self.sent += s
+            self.failed += f
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def stop(self):
+        """스레드 종료 + 마지막 flush. 남은 항목은 다음 실행에서 재시도"""
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+        left = self.outbox.pending()
+        print(f"  outbox: 전송 {self.sent}건 / 실패 {self.failed}건 / 대기 {left}건")
+
+
+_outbox = None
+
+
+def get_outbox() -> Outbox:
+    """프로세스 공용 outbox"""
+    global _outbox
+    if _outbox is None:
+        _outbox = Outbox()
+    return _outbox
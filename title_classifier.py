@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+title_classifier.py
+고시 제목 분류기 (단계 / 구역명 / 구역지정 여부 / 수집 키워드)
+
+패턴은 모두 미리 컴파일해 두고, classify_many() 는 제목들을 줄바꿈으로 이어 붙인
+텍스트를 패턴 묶음별로 한 번씩만 훑는다 (finditer → 줄 번호 매핑):
+  - 키워드 패턴 하나 (collect_posts 수집 필터)
+  - 단계/구역지정 토큰 전체를 합친 게이트 패턴 하나 → 걸린 제목만 우선순위 판정
+  - 구역명 패턴 3개
+수만 건 과거 제목도 제목 × 패턴 수만큼의 re.search 없이 분류된다.
+
+결과 (dict):
+  stage           STAGE_PATTERNS 우선순위상 첫 단계 (없으면 None)
+  zones           구역명 목록 (gazetteer 가 있으면 DB 구역명으로 보정)
+  is_designation  구역지정/변경 고시 여부 (→ 폴리곤 추출 대상)
+  keyword         처음 걸린 수집 키워드 (없으면 None)
+
+Usage:
+  python title_classifier.py titles.txt          # 한 줄에 제목 하나
+  python title_classifier.py "광안5구역 사업시행인가 고시"
+"""
+
+import re
+import bisect
+import argparse
+from collections import Counter
+from pathlib import Path
+
+# 고시 제목 키워드 → stage 값 (우선순위 순)
+STAGE_PATTERNS = [
+    (r"준공|사용검사|완공",                         "준공완료"),
+    (r"착공",                                        "착공"),
+    (r"관리처분계획.*인가|관리처분.*인가",            "관리처분"),
+    (r"사업시행.*인가|시행인가",                      "시행인가"),
+    (r"조합설립.*인가|조합.*설립인가",               "조합설립"),
+    (r"추진위원회.*승인|추진위.*구성",               "추진위원회구성"),
+    (r"정비구역.*지정|구역.*지정|구역.*변경|정비계획.*결정", "구역지정"),
+]
+
+# 구역지정/변경 고시 (→ 폴리곤 추출 대상)
+DESIGNATION_PATTERN = r"정비구역.*지정|구역.*지정|구역.*변경|정비계획.*결정"
+
+# 구역명 추출 패턴 (고시 제목에서). 제목은 공백 하나로 정규화된 한 줄이라
+# 여러 제목을 이어 붙여도 줄을 넘지 않도록 \s 대신 " " / [^,\n] 을 쓴다
+ZONE_NAME_PATTERNS = [
+    # "광안5구역", "사직4 재개발", "남천2 재건축"
+    r"([가-힣]+\d+(?:-\d+)?) *(?:구역|재개발|재건축)",
+    # "제X호 광안5구역"
+    r"제\S+호[^,\n]*?([가-힣]+\d+(?:-\d+)?) *(?:구역|재개발|재건축)",
+    # 괄호 안 구역명
+    r"[（(]([가-힣]+\d+(?:-\d+)?(?:구역)?)[）)]",
+]
+
+DEFAULT_KEYWORDS = ["재개발", "재건축"]
+
+_ZONE_SUFFIX_RE = re.compile(r" *(재개발|재건축|정비구역|구역)$")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def _line_index(starts: list[int], pos: int) -> int:
+    return bisect.bisect_right(starts, pos) - 1
+
+
+class TitleClassifier:
+    def __init__(self, keywords: list[str] = None):
+        self.keywords = list(DEFAULT_KEYWORDS if keywords is None else keywords)
+        self.stage_res = [(re.compile(p), stage) for p, stage in STAGE_PATTERNS]
+        self.designation_re = re.compile(DESIGNATION_PATTERN)
+        # 단계/구역지정 패턴 중 하나라도 걸릴 수 있는 제목만 골라내는 게이트
+        self.gate_re = re.compile("|".join(p for p, _ in STAGE_PATTERNS + [(DESIGNATION_PATTERN, None)]))
+        self.keyword_re = None
+        if self.keywords:
+            # collect_posts 와 같이 소문자 + 공백 하나로 정규화한 제목에 대해 매칭
+            self.keyword_re = re.compile("|".join(
+                " ".join(map(re.escape, k.lower().split())) for k in self.keywords))
+        self.zone_res = [re.compile(p) for p in ZONE_NAME_PATTERNS]
+
+    @staticmethod
+    def _line(title: str) -> str:
+        return _SPACE_RE.sub(" ", title or "").strip()
+
+    def _stage(self, line: str) -> tuple[str | None, bool]:
+        stage = next((s for r, s in self.stage_res if r.search(line)), None)
+        return stage, bool(self.designation_re.search(line))
+
+    def classify_many(self, titles: list[str], gazetteer=None) -> list[dict]:
+        """제목 목록 → 분류 결과 목록 (이어 붙인 텍스트를 패턴 묶음별로 한 번씩 스캔)"""
+        lines = [self._line(t) for t in titles]
+        text = "\n".join(lines)
+        starts, pos = [], 0
+        for line in lines:
+            starts.append(pos)
+            pos += len(line) + 1
+
+        results = [{"title": t, "stage": None, "zones": [], "is_designation": False,
+                    "keyword": None} for t in titles]
+
+        if self.keyword_re:
+            for m in self.keyword_re.finditer(text.lower()):
+                r = results[_line_index(starts, m.start())]
+                if r["keyword"] is None:
+                    r["keyword"] = m.group(0)
+
+        gated = {_line_index(starts, m.start()) for m in self.gate_re.finditer(text)}
+        for i in gated:
+            results[i]["stage"], results[i]["is_designation"] = self._stage(lines[i])
+
+        for zone_re in self.zone_res:
+            for m in zone_re.finditer(text):
+                name = _ZONE_SUFFIX_RE.sub("", m.group(1).strip()).strip()
+                if name:
+                    results[_line_index(starts, m.start())]["zones"].append(name)
+
+        for r in results:
+            names = gazetteer.find(r["title"]) if gazetteer else []
+            for name in r["zones"]:
+                if gazetteer:
+                    name = gazetteer.resolve(name) or name
+                if name not in names:
+                    names.append(name)
+            r["zones"] = names
+        return results
+
+    def classify(self, title: str, gazetteer=None) -> dict:
+        return self.classify_many([title], gazetteer)[0]
+
+    def keyword(self, title: str) -> str | None:
+        """수집 키워드 확인만 (구역명 추출 생략)"""
+        if not self.keyword_re:
+            return None
+        m = self.keyword_re.search(self._line(title).lower())
+        return m.group(0) if m else None
+
+
+_classifier = None
+
+
+def get_classifier() -> TitleClassifier:
+    """기본 키워드 분류기 (프로세스 공용)"""
+    global _classifier
+    if _classifier is None:
+        _classifier = TitleClassifier()
+    return _classifier
+
+
+# ══════════════════════════════════════════════════════════
+# 메인
+# ══════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("src", nargs="+", help="제목 파일(한 줄에 하나) 또는 제목")
+    parser.add_argument("--quiet", action="store_true", help="요약만 출력")
+    args = parser.parse_args()
+
+    titles = []
+    for src in args.src:
+        path = Path(src)
+        if path.is_file():
+            titles.extend(l for l in path.read_text(encoding="utf-8").splitlines() if l.strip())
+        else:
+            titles.append(src)
+
+    results = get_classifier().classify_many(titles)
+    if not args.quiet:
+        for r in results:
+            flag = "✅" if r["keyword"] else "⊘"
+            zone_flag = " [구역지정]" if r["is_designation"] else ""
+            print(f"{flag} {r['stage'] or '-'}{zone_flag} {r['zones'] or ''}  {r['title'][:60]}")
+    stages = Counter(r["stage"] or "(없음)" for r in results)
+    print(f"\n제목 {len(results)}건 / 키워드 {sum(1 for r in results if r['keyword'])}건")
+    for stage, n in stages.most_common():
+        print(f"  {stage}: {n}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+zone_atlas.py
+전체 구역 경계 → 지도 한 장 (folium 아틀라스)
+
+구역마다 {name}_map.html 을 따로 만들던 미리보기를 대체한다.
+  - 현재 단계(stage)별 레이어 그룹 + 단계별 색상 (LayerControl 로 켜고 끄기)
+  - 기본 표시는 단순화 geometry (zone_tiles LOD 2, 약 8m)
+  - DETAIL_ZOOM 이상으로 확대하면 원본 경계를 별도 JS 파일에서 한 번만 지연 로드
+
+단계는 Supabase projects 테이블에서 가져오고, 없으면 경계 properties.stage 를 쓴다.
+
+Usage:
+  python zone_atlas.py                    # zone_atlas.html + zone_atlas_detail.js
+  python zone_atlas.py --out review.html --no-db
+"""
+
+import json
+import argparse
+from pathlib import Path
+
+import folium
+from branca.element import MacroElement
+from jinja2 import Template
+from shapely.geometry import shape, mapping
+
+from zone_tiles import build_lods
+
+OUT_FILE = Path(__file__).parent / "zone_atlas.html"
+DETAIL_ZOOM = 15
+COORD_DIGITS = 6  # 약 0.1m
+
+# 단계 → 색상 (title_classifier.STAGE_PATTERNS 순서)
+STAGE_COLORS = {
+    "구역지정":       "#3498db",
+    "추진위원회구성": "#1abc9c",
+    "조합설립":       "#2ecc71",
+    "시행인가":       "#f1c40f",
+    "관리처분":       "#e67e22",
+    "착공":           "#e74c3c",
+    "준공완료":       "#7f8c8d",
+}
+UNKNOWN_STAGE = "미상"
+UNKNOWN_COLOR = "#9b59b6"
+
+
+def _round_coords(c):
+    if c and isinstance(c[0], (int, float)):
+        return [round(v, COORD_DIGITS) for v in c]
+    return [_round_coords(cc) for cc in c]
+
+
+def _geometry(geom) -> dict:
+    g = mapping(geom)
+    return {"type": g["type"], "coordinates": _round_coords(g["coordinates"])}
+
+
+def load_stages() -> dict:
+    """Supabase projects → {구역명: stage}. 키 없거나 실패 시 빈 dict"""
+    try:
+        from gosi_to_stage import get_supabase, ProjectIndex, SUPABASE_KEY
+        if not SUPABASE_KEY:
+            return {}
+        index = ProjectIndex.load(get_supabase())
+        return {name: r["stage"] for name, r in index.by_name.items() if r.get("stage")}
+    except Exception as e:
+        print(f"  ⚠️ 단계 조회 실패 (properties.stage 사용): {e}")
+        return {}
+
+
+class DetailLoader(MacroElement):
+    """확대 시 원본 경계 JS 를 지연 로드 (지도 객체 정의 뒤에 렌더링되도록 지도의 자식으로 붙임).
+    file:// 에서도 동작하도록 fetch 대신 script 태그"""
+    _template = Template("""
+{% macro script(this, kwargs) %}
+(function () {
+  var map = {{ this._parent.get_name() }}, detail = null, loading = false;
+  function update() {
+    if (map.getZoom() < {{ this.detail_zoom }}) {
+      if (detail && map.hasLayer(detail)) map.removeLayer(detail);
+      return;
+    }
+    if (detail) { if (!map.hasLayer(detail)) detail.addTo(map); return; }
+    if (loading) return;
+    loading = true;
+    var s = document.createElement('script');
+    s.src = {{ this.src|tojson }};
+    s.onload = function () {
+      detail = L.geoJSON(window.ZONE_ATLAS_DETAIL, {
+        style: function (f) { return {color: f.properties.color, weight: 2, fill: false}; },
+        onEachFeature: function (f, l) { l.bindTooltip(f.properties.name + ' · ' + f.properties.stage); }
+      });
+      update();
+    };
+    document.head.appendChild(s);
+  }
+  map.on('zoomend', update);
+  update();
+})();
+{% endmacro %}
+""")
+
+    def __init__(self, src: str, detail_zoom: int = DETAIL_ZOOM):
+        super().__init__()
+        self._name = "DetailLoader"
+        self.src = src
+        self.detail_zoom = detail_zoom
+
+
+def build_atlas(features: list[dict], out_html: str, stages: dict = None,
+                detail_zoom: int = DETAIL_ZOOM) -> str:
+    """Feature 목록 → 아틀라스 HTML + 상세 경계 JS. 반환: HTML 경로"""
+    stages = stages or {}
+    out_html = Path(out_html)
+    detail_js = out_html.with_name(f"{out_html.stem}_detail.js")
+
+    groups, detail = {}, []
+    bounds = None
+    for ft in features:
+        props = ft.get("properties") or {}
+        name = props.get("name", "")
+        geom = shape(ft["geometry"])
+        if geom.is_empty:
+            continue
+        stage = stages.get(name) or props.get("stage") or UNKNOWN_STAGE
+        color = STAGE_COLORS.get(stage, UNKNOWN_COLOR)
+        p = {"name": name, "stage": stage, "color": color,
+             "check": "위치 보정 필요" if props.get("needs_position_check") else ""}
+        groups.setdefault(stage, []).append(
+            {"type": "Feature", "geometry": _geometry(build_lods(geom)[2]), "properties": p})
+        detail.append({"type": "Feature", "geometry": _geometry(geom), "properties": p})
+        b = geom.bounds
+        bounds = b if bounds is None else (min(bounds[0], b[0]), min(bounds[1], b[1]),
+                                           max(bounds[2], b[2]), max(bounds[3], b[3]))
+
+    if bounds is None:
+        center = [35.180, 129.075]  # 부산 중심
+    else:
+        center = [(bounds[1] + bounds[3]) / 2, (bounds[0] + bounds[2]) / 2]
+    m = folium.Map(location=center, zoom_start=12, tiles="CartoDB positron")
+
+    stage_order = list(STAGE_COLORS) + [UNKNOWN_STAGE]
+    for stage in sorted(groups, key=lambda s: stage_order.index(s) if s in stage_order else 99):
+        fg = folium.FeatureGroup(name=f"{stage} ({len(groups[stage])})")
+        folium.GeoJson(
+            {"type": "FeatureCollection", "features": groups[stage]},
+            style_function=lambda f: {"color": f["properties"]["color"], "weight": 2,
+                                      "fillColor": f["properties"]["color"], "fillOpacity": 0.3},
+            tooltip=folium.GeoJsonTooltip(fields=["name", "stage", "check"],
+                                          aliases=["구역", "단계", ""]),
+        ).add_to(fg)
+        fg.add_to(m)
+    folium.LayerControl(collapsed=False).add_to(m)
+    if bounds is not None:
+        m.fit_bounds([[bounds[1], bounds[0]], [bounds[3], bounds[2]]])
+
+    # 확대 시 원본 경계 지연 로드
+    with open(detail_js, "w", encoding="utf-8") as f:
+        f.write("window.ZONE_ATLAS_DETAIL = ")
+        json.dump({"type": "FeatureCollection", "features": detail}, f,
+                  ensure_ascii=False, separators=(",", ":"))
+        f.write(";\n")
+    DetailLoader(detail_js.name, detail_zoom).add_to(m)
+
+    m.save(str(out_html))
+    total = sum(len(v) for v in groups.values())
+    print(f"아틀라스 저장: {out_html} (구역 {total}개, 단계 {len(groups)}종)")
+    print(f"  상세 경계: {detail_js} (z{detail_zoom}+ 지연 로드)")
+    return str(out_html)
+
+
+# ══════════════════════════════════════════════════════════
+# 메인
+# ══════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", default=str(OUT_FILE), help="HTML 경로")
+    parser.add_argument("--detail-zoom", type=int, default=DETAIL_ZOOM)
+    parser.add_argument("--no-db", action="store_true", help="Supabase 단계 조회 생략")
+    args = parser.parse_args()
+
+    from boundary_store import get_store as get_boundary_store
+    features = get_boundary_store().features()
+    stages = {} if args.no_db else load_stages()
+    build_atlas(features, args.out, stages, args.detail_zoom)
+
+
+if __name__ == "__main__":
+    main()
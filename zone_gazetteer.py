@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+zone_gazetteer.py
+구역명 사전 (Aho-Corasick) + 정규화/유사도 보정
+
+projects 테이블 구역명(+ 별칭)을 정규화 키로 바꿔 Aho-Corasick 오토마톤 하나로 만들고,
+고시 제목을 한 번 훑어 알려진 구역명을 모두 찾는다.
+  - 정규화: 공백 제거, "제5" → "5", 끝의 구역/재개발/재건축/정비사업 등 제거
+            ("광안제5구역", "광안 5구역 재개발", "광안5" → 모두 "광안5")
+  - 경계: 키 뒤에 숫자가 이어지면 불일치 ("광안5" 는 "광안51구역" 에 걸리지 않음)
+  - 겹치는 후보는 긴 키 우선
+  - 사전에 없는 이름은 번호가 같은 키 중 difflib 유사도로 보정 ("광안동5" → "광안5")
+
+별칭: zone_aliases.json (선택) {"DB 구역명": ["별칭", ...]}
+pyahocorasick 이 설치돼 있으면 사용하고, 없으면 순수 Python 구현.
+
+Usage:
+  python zone_gazetteer.py "부산광역시 고시 제2024-12호 광안제5구역 주택재개발정비사업 ..."
+"""
+
+import re
+import json
+import difflib
+import argparse
+from pathlib import Path
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+ALIASES_FILE = Path(__file__).parent / "zone_aliases.json"
+FUZZY_CUTOFF = 0.8
+
+_SUFFIX_RE = re.compile(r"(?:주택|재개발|재건축|정비|사업|구역|지구)+$")
+_JE_RE = re.compile(r"제(?=\d)")
+_SPACE_RE = re.compile(r"\s+")
+_NUM_RE = re.compile(r"\d+(?:-\d+)?")
+
+
+def normalize_text(text: str) -> str:
+    """제목 정규화 (공백 제거, "제5" → "5")"""
+    return _JE_RE.sub("", _SPACE_RE.sub("", text))
+
+
+def normalize_zone(name: str) -> str:
+    """구역명 → 비교 키 ("광안제5구역 재개발" → "광안5")"""
+    key = normalize_text(name)
+    return _SUFFIX_RE.sub("", key) or key
+
+
+def _number(key: str) -> str:
+    m = _NUM_RE.findall(key)
+    return m[-1] if m else ""
+
+
+class _Automaton:
+    """순수 Python Aho-Corasick (키 → 값)"""
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+
+    def add_word(self, key: str, value):
+        node = 0
+        for ch in key:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            node = nxt
+        self.out[node].append(value)
+
+    def make_automaton(self):
+        queue = list(self.goto[0].values())
+        for node in queue:
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def iter(self, text: str):
+        """(끝 위치, 값) 생성"""
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            for value in self.out[node]:
+                yield i, value
+
+
+class Gazetteer:
+    def __init__(self, names: list[str], aliases: dict = None):
+        self.canonical = {}   # 키 → DB 구역명
+        for name in names:
+            self._add(normalize_zone(name), name)
+        for name, alias_list in (aliases or {}).items():
+            for alias in alias_list:
+                self._add(normalize_zone(alias), name)
+
+        self.by_number = {}   # 번호 → 키 목록 (유사도 보정 후보)
+        for key in self.canonical:
+            self.by_number.setdefault(_number(key), []).append(key)
+
+        self.automaton = ahocorasick.Automaton() if ahocorasick else _Automaton()
+        for key in self.canonical:
+            # 번호 없는 짧은 키는 제목 곳곳에 걸리므로 스캔 대상에서 제외
+            if len(key) >= 3 or _number(key):
+                self.automaton.add_word(key, key)
+        self.automaton.make_automaton()
+
+    def _add(self, key: str, name: str):
+        if len(key) >= 2:
+            self.canonical.setdefault(key, name)
+
+    @classmethod
+    def from_names(cls, names: list[str], aliases_file: Path = ALIASES_FILE) -> "Gazetteer":
+        aliases = {}
+        if aliases_file.exists():
+            aliases = json.loads(aliases_file.read_text(encoding="utf-8"))
+        return cls(names, aliases)
+
+    def __len__(self):
+        return len(self.canonical)
+
+    def find(self, title: str) -> list[str]:
+        """제목 한 번 스캔 → 등장 순서대로 DB 구역명 (긴 키 우선, 중복 제거)"""
+        text = normalize_text(title)
+        spans = []
+        for end, key in self.automaton.iter(text):
+            start = end - len(key) + 1
+            nxt = text[end + 1:end + 3]
+            if nxt[:1].isdigit() or (nxt[:1] == "-" and nxt[1:2].isdigit()):
+                continue
+            spans.append((start, -len(key), key))
+
+        names, covered_to = [], -1
+        for start, neg_len, key in sorted(spans):
+            if start <= covered_to:
+                continue
+            covered_to = start - neg_len - 1
+            name = self.canonical[key]
+            if name not in names:
+                names.append(name)
+        return names
+
+    def resolve(self, name: str) -> str | None:
+        """구역명 변형 → DB 구역명 (정규화 일치 → 같은 번호 내 유사도 보정)"""
+        key = normalize_zone(name)
+        if key in self.canonical:
+            return self.canonical[key]
+        close = difflib.get_close_matches(key, self.by_number.get(_number(key), []),
+                                          n=1, cutoff=FUZZY_CUTOFF)
+        return self.canonical[close[0]] if close else None
+
+
+# ══════════════════════════════════════════════════════════
+# 메인
+# ══════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("titles", nargs="+", help="고시 제목 또는 구역명")
+    args = parser.parse_args()
+
+    from gosi_to_stage import get_supabase, ProjectIndex
+    gazetteer = ProjectIndex.load(get_supabase()).gazetteer
+    print(f"구역 사전: 키 {len(gazetteer)}개")
+    for title in args.titles:
+        print(f"  {title}")
+        print(f"    제목 스캔: {gazetteer.find(title) or '-'}")
+        print(f"    이름 보정: {gazetteer.resolve(title) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+zone_store.py
+구역 경계 공간 인덱스 (Shapely STRtree + prepared geometry)
+
+경계 저장소(boundary_store) 또는 *.geojson 폴더를 한 번 읽어 STRtree 로 색인하고
+다음 질의에 응답한다 (폴리곤 전체 스캔 없음):
+  - 점 → 구역       zone_at(lng, lat) / zones_at(lng, lat)
+  - bbox → 구역     in_bbox(minx, miny, maxx, maxy)
+  - 폴리곤 중첩     overlaps(geom)      (신규 추출 경계가 기존 구역과 겹치는지)
+  - 중복 후보       duplicates()        (서로 대부분 겹치는 구역 쌍)
+  - 주소 → 구역     zone_for_address("부산 동래구 사직동 123")
+
+Usage:
+  python zone_store.py --point 129.065,35.188
+  python zone_store.py --address "부산광역시 동래구 사직동 123"
+  python zone_store.py --duplicates
+  python zone_store.py --dir ./geojson --duplicates   # 저장소 대신 GeoJSON 폴더
+"""
+
+import re
+import argparse
+from pathlib import Path
+
+from shapely.geometry import shape, box, Point
+from shapely.prepared import prep
+from shapely.strtree import STRtree
+
+from boundary_store import load_features
+
+ZONE_DIR = Path(__file__).parent
+
+# 겹침 비율 = 교집합 면적 / 작은 쪽 면적
+OVERLAP_MIN_RATIO = 0.05
+DUPLICATE_MIN_RATIO = 0.8
+
+
+_store = None
+
+
+def get_store() -> "ZoneStore":
+    """프로세스 공용 인덱스 (첫 호출 시 로드, invalidate() 후 재로드)"""
+    global _store
+    if _store is None:
+        _store = ZoneStore.load()
+    return _store
+
+
+def invalidate():
+    """경계가 추가/변경된 뒤 호출 → 다음 get_store() 에서 재색인"""
+    global _store
+    _store = None
+
+
+class ZoneStore:
+    def __init__(self, features: list[dict]):
+        self.names = []
+        self.props = []
+        self.geoms = []
+        for ft in features:
+            geom = shape(ft["geometry"])
+            if geom.is_empty:
+                continue
+            if not geom.is_valid:
+                geom = geom.buffer(0)
+            props = ft.get("properties") or {}
+            self.names.append(props.get("name", f"zone_{len(self.names)}"))
+            self.props.append(props)
+            self.geoms.append(geom)
+        self._index = {name: i for i, name in enumerate(self.names)}
+        self.prepared = [prep(g) for g in self.geoms]
+        self.tree = STRtree(self.geoms)
+
+    @classmethod
+    def load(cls) -> "ZoneStore":
+        """경계 저장소(db/zone_boundaries.sqlite) 전체 로드"""
+        from boundary_store import get_store as get_boundary_store
+        return cls(get_boundary_store().features())
+
+    @classmethod
+    def load_dir(cls, directory: Path = ZONE_DIR) -> "ZoneStore":
+        return cls(load_features(directory))
+
+    def __len__(self):
+        return len(self.geoms)
+
+    def __contains__(self, name: str):
+        return name in self._index
+
+    def geometry(self, name: str):
+        i = self._index.get(name)
+        return None if i is None else self.geoms[i]
+
+    def _candidates(self, geom) -> list[int]:
+        # shapely 2: STRtree.query → bbox 가 겹치는 인덱스 배열
+        return [int(i) for i in self.tree.query(geom)]
+
+    # ── 점 / bbox ──────────────────────────────
+    def zones_at(self, lng: float, lat: float) -> list[str]:
+        """점을 포함하는 구역명 (작은 구역 먼저)"""
+        pt = Point(lng, lat)
+        hits = [i for i in self._candidates(pt) if self.prepared[i].contains(pt)]
+        hits.sort(key=lambda i: self.geoms[i].area)
+        return [self.names[i] for i in hits]
+
+    def zone_at(self, lng: float, lat: float) -> str | None:
+        hits = self.zones_at(lng, lat)
+        return hits[0] if hits else None
+
+    def in_bbox(self, minx: float, miny: float, maxx: float, maxy: float) -> list[str]:
+        """bbox 와 실제로 교차하는 구역명"""
+        b = box(minx, miny, maxx, maxy)
+        return [self.names[i] for i in self._candidates(b) if self.prepared[i].intersects(b)]
+
+    # ── 중첩 / 중복 ────────────────────────────
+    def overlaps(self, geom, min_ratio: float = OVERLAP_MIN_RATIO,
+                 exclude: str = None) -> list[tuple[str, float]]:
+        """geom 과 겹치는 기존 구역 [(구역명, 겹침 비율)] (비율 큰 순)"""
+        if not geom.is_valid:
+            geom = geom.buffer(0)
+        result = []
+        for i in self._candidates(geom):
+            if self.names[i] == exclude or not self.prepared[i].intersects(geom):
+                continue
+            denom = min(geom.area, self.geoms[i].area)
+            ratio = self.geoms[i].intersection(geom).area / denom if denom else 0.0
+            if ratio >= min_ratio:
+                result.append((self.names[i], ratio))
+        result.sort(key=lambda x: -x[1])
+        return result
+
+    def duplicates(self, min_ratio: float = DUPLICATE_MIN_RATIO) -> list[tuple[str, str, float]]:
+        """서로 min_ratio 이상 겹치는 구역 쌍 (같은 구역의 이름 변형 / 중복 추출 후보)"""
+        pairs = []
+        for i, geom in enumerate(self.geoms):
+            for name, ratio in self.overlaps(geom, min_ratio, exclude=self.names[i]):
+                if self.names[i] < name:
+                    pairs.append((self.names[i], name, ratio))
+        return pairs
+
+    def zone_for_address(self, address: str) -> str | None:
+        """주소 → V-World 좌표 (geocode_cache) → 포함 구역명"""
+        from geocode_cache import vworld_geocode
+        addr = re.sub(r"\s*(?:번지|일원)", "", address).strip()
+        coord = vworld_geocode(addr)
+        return self.zone_at(*coord) if coord else None
+
+
+# ══════════════════════════════════════════════════════════
+# 메인
+# ══════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", default=None, help="GeoJSON 폴더 (기본: 경계 저장소)")
+    parser.add_argument("--point", default=None, help="lng,lat 이 속한 구역")
+    parser.add_argument("--address", default=None, help="주소가 속한 구역")
+    parser.add_argument("--bbox", default=None, help="minx,miny,maxx,maxy 와 겹치는 구역")
+    parser.add_argument("--duplicates", action="store_true", help="중복 의심 구역 쌍")
+    args = parser.parse_args()
+
+    store = ZoneStore.load_dir(Path(args.dir)) if args.dir else ZoneStore.load()
+    print(f"구역 {len(store)}개 로드")
+
+    if args.point:
+        lng, lat = map(float, args.point.split(","))
+        print(f"  {args.point} → {store.zones_at(lng, lat) or '(없음)'}")
+    if args.address:
+        print(f"  {args.address} → {store.zone_for_address(args.address) or '(없음)'}")
+    if args.bbox:
+        print(f"  bbox → {store.in_bbox(*map(float, args.bbox.split(','))) or '(없음)'}")
+    if args.duplicates:
+        for a, b, ratio in store.duplicates():
+            print(f"  ⚠️ {a} ↔ {b}  겹침 {ratio:.0%}")
+
+
+if __name__ == "__main__":
+    main()
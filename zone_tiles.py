@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+"""
+zone_tiles.py
+구역 경계 → 단순화 레벨(LOD) + 정적 벡터 타일(MBTiles) 빌드
+
+  1. 경계 저장소(boundary_store)의 폴리곤마다 LOD 단계별 단순화 (LOD_TOLERANCES_M)
+  2. 줌 레벨별로 해당 LOD 를 골라 타일 단위로 잘라냄
+  3. 타일 좌표(EXTENT=4096)로 양자화 → Mapbox Vector Tile(pbf, 레이어 "zones") 인코딩
+  4. gzip 후 MBTiles(SQLite) 한 파일로 저장
+
+지도 클라이언트는 화면에 보이는 타일 + 줌에 맞는 상세도만 내려받는다.
+MVT 인코딩은 외부 라이브러리 없이 직접 protobuf 로 쓴다 (shapely 만 필요).
+
+Usage:
+  python zone_tiles.py                                  # zone_tiles.mbtiles (z10~16)
+  python zone_tiles.py --min-zoom 8 --max-zoom 17 --out tiles.mbtiles
+"""
+
+import gzip
+import json
+import math
+import struct
+import sqlite3
+import argparse
+from pathlib import Path
+
+from shapely.geometry import shape, box, Polygon
+from shapely.ops import transform
+
+OUT_FILE = Path(__file__).parent / "zone_tiles.mbtiles"
+LAYER_NAME = "zones"
+EXTENT = 4096
+TILE_BUFFER = 64  # 타일 경계 바깥 여유 (타일 좌표 단위)
+
+# LOD 단계 → 단순화 허용오차 (m). 0 = 원본
+LOD_TOLERANCES_M = {0: 0.0, 1: 2.0, 2: 8.0, 3: 32.0}
+
+
+# ══════════════════════════════════════════════════════════
+# 1. LOD (단순화 레벨)
+# ══════════════════════════════════════════════════════════
+
+def build_lods(geom) -> dict:
+    """폴리곤 → {lod: 단순화 geometry}. 허용오차는 위도 기준 m → 도 환산"""
+    lods = {}
+    for lod, tol_m in LOD_TOLERANCES_M.items():
+        if tol_m == 0:
+            lods[lod] = geom
+            continue
+        simple = geom.simplify(tol_m / 111320, preserve_topology=True)
+        lods[lod] = simple if not simple.is_empty else geom
+    return lods
+
+
+def zoom_to_lod(zoom: int) -> int:
+    """줌 → LOD (z16+ 원본, z14~15: 2m, z12~13: 8m, 그 이하 32m)"""
+    if zoom >= 16:
+        return 0
+    if zoom >= 14:
+        return 1
+    if zoom >= 12:
+        return 2
+    return 3
+
+
+# ══════════════════════════════════════════════════════════
+# 2. 타일 좌표계 (Web Mercator)
+# ══════════════════════════════════════════════════════════
+
+def lnglat_to_world(lng: float, lat: float, zoom: int) -> tuple[float, float]:
+    """경위도 → 줌 레벨 전역 타일 좌표 (타일 1장 = EXTENT 단위)"""
+    n = (2 ** zoom) * EXTENT
+    x = (lng + 180.0) / 360.0 * n
+    lat_r = math.radians(max(min(lat, 85.05112878), -85.05112878))
+    y = (1.0 - math.asinh(math.tan(lat_r)) / math.pi) / 2.0 * n
+    return x, y
+
+
+def tile_range(bounds: tuple, zoom: int):
+    """bbox(minx, miny, maxx, maxy) 를 덮는 타일 (x, y) 목록"""
+    minx, miny, maxx, maxy = bounds
+    x0, y0 = lnglat_to_world(minx, maxy, zoom)
+    x1, y1 = lnglat_to_world(maxx, miny, zoom)
+    last = 2 ** zoom - 1
+    for tx in range(max(0, int(x0 // EXTENT)), min(last, int(x1 // EXTENT)) + 1):
+        for ty in range(max(0, int(y0 // EXTENT)), min(last, int(y1 // EXTENT)) + 1):
+            yield tx, ty
+
+
+# ══════════════════════════════════════════════════════════
+# 3. MVT (protobuf) 인코딩
+# ══════════════════════════════════════════════════════════
+
+def _varint(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return bytes(out)
+
+
+def _zigzag(n: int) -> int:
+    return (n << 1) ^ (n >> 31)
+
+
+def _field_varint(field: int, value: int) -> bytes:
+    return _varint(field << 3) + _varint(value)
+
+
+def _field_bytes(field: int, data: bytes) -> bytes:
+    return _varint((field << 3) | 2) + _varint(len(data)) + data
+
+
+def _packed(field: int, values: list[int]) -> bytes:
+    return _field_bytes(field, b"".join(_varint(v) for v in values))
+
+
+def _value(v) -> bytes:
+    """MVT Value 메시지 (string=1, double=3, sint=6, bool=7)"""
+    if isinstance(v, bool):
+        return _field_varint(7, int(v))
+    if isinstance(v, int):
+        return _field_varint(6, _zigzag(v))
+    if isinstance(v, float):
+        return _varint((3 << 3) | 1) + struct.pack("<d", v)
+    return _field_bytes(1, str(v).encode("utf-8"))
+
+
+def _ring_commands(coords: list[tuple[int, int]], cursor: list[int]) -> list[int]:
+    """링 → MoveTo / LineTo / ClosePath 명령 (닫는 점 제외, cursor 기준 델타)"""
+    cmds = [(1 & 7) | (1 << 3)]
+    x, y = coords[0]
+    cmds += [_zigzag(x - cursor[0]), _zigzag(y - cursor[1])]
+    cursor[:] = [x, y]
+    cmds.append((2 & 7) | ((len(coords) - 1) << 3))
+    for x, y in coords[1:]:
+        cmds += [_zigzag(x - cursor[0]), _zigzag(y - cursor[1])]
+        cursor[:] = [x, y]
+    cmds.append((7 & 7) | (1 << 3))
+    return cmds
+
+
+def _quantize_ring(ring, exterior: bool) -> list[tuple[int, int]] | None:
+    """링 좌표 → 정수 타일 좌표 (연속 중복 제거, 방향 보정). 퇴화 링은 None"""
+    pts = []
+    for x, y in list(ring.coords)[:-1]:
+        p = (int(round(x)), int(round(y)))
+        if not pts or pts[-1] != p:
+            pts.append(p)
+    if len(pts) > 1 and pts[0] == pts[-1]:
+        pts.pop()
+    if len(pts) < 3:
+        return None
+    area = sum(pts[i][0] * pts[(i + 1) % len(pts)][1] - pts[(i + 1) % len(pts)][0] * pts[i][1]
+               for i in range(len(pts)))
+    if area == 0:
+        return None
+    # MVT: 외곽 링 면적 양수, 내부 링 음수 (타일 좌표, y 아래 방향)
+    if (area > 0) != exterior:
+        pts.reverse()
+    return pts
+
+
+def _polygons(geom) -> list:
+    """교차 결과(Polygon / Multi / GeometryCollection) → Polygon 목록"""
+    if isinstance(geom, Polygon):
+        return [] if geom.is_empty else [geom]
+    return [p for g in getattr(geom, "geoms", []) for p in _polygons(g)]
+
+
+def encode_polygon(geom) -> list[int]:
+    """(Multi)Polygon (타일 좌표) → MVT geometry 명령열"""
+    cmds, cursor = [], [0, 0]
+    for poly in _polygons(geom):
+        outer = _quantize_ring(poly.exterior, exterior=True)
+        if outer is None:
+            continue
+        cmds += _ring_commands(outer, cursor)
+        for hole in poly.interiors:
+            inner = _quantize_ring(hole, exterior=False)
+            if inner:
+                cmds += _ring_commands(inner, cursor)
+    return cmds
+
+
+def encode_tile(features: list[tuple[int, dict, list[int]]]) -> bytes:
+    """[(feature id, properties, geometry 명령열)] → 레이어 1개짜리 MVT 바이트"""
+    keys, values = [], []
+    key_idx, value_idx = {}, {}
+    feats = b""
+    for fid, props, geometry in features:
+        tags = []
+        for k, v in props.items():
+            if v is None:
+                continue
+            if k not in key_idx:
+                key_idx[k] = len(keys)
+                keys.append(k)
+            vk = (type(v).__name__, v)
+            if vk not in value_idx:
+                value_idx[vk] = len(values)
+                values.append(v)
+            tags += [key_idx[k], value_idx[vk]]
+        body = (_field_varint(1, fid) + _packed(2, tags)
+                + _field_varint(3, 3) + _packed(4, geometry))
+        feats += _field_bytes(2, body)
+
+    layer = (_field_varint(15, 2) + _field_bytes(1, LAYER_NAME.encode("utf-8")) + feats
+             + b"".join(_field_bytes(3, k.encode("utf-8")) for k in keys)
+             + b"".join(_field_bytes(4, _value(v)) for v in values)
+             + _field_varint(5, EXTENT))
+    return _field_bytes(3, layer)
+
+
+# ══════════════════════════════════════════════════════════
+# 4. 빌드 → MBTiles
+# ══════════════════════════════════════════════════════════
+
+def _tile_properties(props: dict, lod: int) -> dict:
+    return {
+        "name": props.get("name"),
+        "stage": props.get("stage"),
+        "source": props.get("source"),
+        "version": props.get("version"),
+        "needs_position_check": bool(props.get("needs_position_check")),
+        "lod": lod,
+    }
+
+
+def build_tiles(features: list[dict], min_zoom: int = 10, max_zoom: int = 16) -> dict:
+    """Feature 목록 → {(z, x, y): MVT 바이트}"""
+    zones = []
+    for fid, ft in enumerate(features, 1):
+        geom = shape(ft["geometry"])
+        if geom.is_empty:
+            continue
+        if not geom.is_valid:
+            geom = geom.buffer(0)
+        zones.append((fid, ft.get("properties") or {}, build_lods(geom)))
+
+    tiles = {}
+    for z in range(min_zoom, max_zoom + 1):
+        lod = zoom_to_lod(z)
+        buckets = {}
+        for fid, props, lods in zones:
+            geom = lods[lod]
+            world = transform(lambda x, y, z=z: lnglat_to_world(x, y, z), geom)
+            for tx, ty in tile_range(geom.bounds, z):
+                ox, oy = tx * EXTENT, ty * EXTENT
+                clip = box(ox - TILE_BUFFER, oy - TILE_BUFFER,
+                           ox + EXTENT + TILE_BUFFER, oy + EXTENT + TILE_BUFFER)
+                part = world.intersection(clip)
+                if part.is_empty:
+                    continue
+                local = transform(lambda x, y, ox=ox, oy=oy: (x - ox, y - oy), part)
+                cmds = encode_polygon(local)
+                if cmds:
+                    buckets.setdefault((tx, ty), []).append(
+                        (fid, _tile_properties(props, lod), cmds))
+        for (tx, ty), feats in buckets.items():
+            tiles[(z, tx, ty)] = encode_tile(feats)
+        print(f"  z{z}: 타일 {len(buckets)}장 (LOD {lod})")
+    return tiles
+
+
+def write_mbtiles(tiles: dict, out_path: Path, features: list[dict],
+                  min_zoom: int, max_zoom: int):
+    out_path = Path(out_path)
+    if out_path.exists():
+        out_path.unlink()
+    conn = sqlite3.connect(str(out_path))
+    conn.executescript("""
+        CREATE TABLE metadata (name TEXT, value TEXT);
+        CREATE TABLE tiles (zoom_level INTEGER, tile_column INTEGER,
+                            tile_row INTEGER, tile_data BLOB);
+        CREATE UNIQUE INDEX tile_index ON tiles (zoom_level, tile_column, tile_row);
+    """)
+    bounds = [180.0, 90.0, -180.0, -90.0]
+    for ft in features:
+        b = shape(ft["geometry"]).bounds
+        bounds = [min(bounds[0], b[0]), min(bounds[1], b[1]),
+                  max(bounds[2], b[2]), max(bounds[3], b[3])]
+    center = [(bounds[0] + bounds[2]) / 2, (bounds[1] + bounds[3]) / 2, min_zoom]
+    vector_layers = [{
+        "id": LAYER_NAME, "minzoom": min_zoom, "maxzoom": max_zoom,
+        "fields": {"name": "String", "stage": "String", "source": "String",
+                   "version": "Number", "needs_position_check": "Boolean", "lod": "Number"},
+    }]
+    meta = {
+        "name": "busan_zones", "format": "pbf", "type": "overlay",
+        "minzoom": str(min_zoom), "maxzoom": str(max_zoom),
+        "bounds": ",".join(f"{v:.6f}" for v in bounds),
+        "center": ",".join(str(v) for v in center),
+        "json": json.dumps({"vector_layers": vector_layers}),
+    }
+    with conn:
+        conn.executemany("INSERT INTO metadata VALUES (?, ?)", meta.items())
+        # MBTiles 는 TMS 행 번호 (y 뒤집기)
+        conn.executemany("INSERT INTO tiles VALUES (?, ?, ?, ?)", [
+            (z, x, (2 ** z - 1) - y, gzip.compress(data))
+            for (z, x, y), data in tiles.items()
+        ])
+    conn.close()
+
+
+# ══════════════════════════════════════════════════════════
+# 메인
+# ══════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", default=str(OUT_FILE), help="MBTiles 경로")
+    parser.add_argument("--min-zoom", type=int, default=10)
+    parser.add_argument("--max-zoom", type=int, default=16)
+    args = parser.parse_args()
+
+    from boundary_store import get_store as get_boundary_store
+    features = get_boundary_store().features()
+    if not features:
+        print("저장된 구역 경계가 없습니다.")
+        return
+    print(f"구역 {len(features)}개 → 벡터 타일 z{args.min_zoom}~{args.max_zoom}")
+
+    tiles = build_tiles(features, args.min_zoom, args.max_zoom)
+    write_mbtiles(tiles, args.out, features, args.min_zoom, args.max_zoom)
+    size_kb = Path(args.out).stat().st_size / 1024
+    print(f"\nMBTiles 저장: {args.out} (타일 {len(tiles)}장, {size_kb:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()